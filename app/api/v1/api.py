@@ -8,6 +8,9 @@ from app.api.v1.endpoints.payments import router as payments_router
 from app.api.v1.endpoints.setting import router as setting_router
 from app.api.v1.endpoints.paymentMode import router as payment_mode_router
 from app.api.v1.endpoints.dashboard import router as dashboard_router
+from app.api.v1.endpoints.analytics import router as analytics_router
+from app.api.v1.endpoints.reports import router as reports_router
+from app.api.v1.endpoints.search import router as search_router
 
 api_router = APIRouter()
 
@@ -21,6 +24,9 @@ api_router.include_router(payments_router, prefix="/payments", tags=["payments"]
 api_router.include_router(setting_router, prefix="/setting", tags=["settings"])
 api_router.include_router(payment_mode_router, prefix="/paymentMode", tags=["payment-modes"])
 api_router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(analytics_router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(reports_router, prefix="/reports", tags=["reports"])
+api_router.include_router(search_router, prefix="/search", tags=["search"])
 
 # Add aliases for frontend compatibility
 api_router.include_router(customers_router, prefix="/client", tags=["clients (alias for customers)"])
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date, timedelta
+from typing import Optional
+from app.core.database import get_supabase_service, DatabaseClient
+from app.core.security import get_current_user
+from app.services.analytics import timeseries
+
+router = APIRouter()
+
+
+@router.get("/timeseries")
+async def get_timeseries(
+    metric: str = Query("invoiced", pattern="^(invoiced|collected|quoted|new_customers)$"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    compare: bool = False,
+    current_user: dict = Depends(get_current_user),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Get a metric bucketed by day, week or month (defaults to the last 30 days)"""
+    try:
+        to_date = to_date or date.today()
+        from_date = from_date or to_date - timedelta(days=29)
+        return {
+            "success": True,
+            "result": await timeseries(supabase, metric, from_date, to_date, granularity, status_filter, compare),
+            "message": f"Successfully get {metric} per {granularity} from {from_date} to {to_date}"
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -1,12 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from supabase import Client
-from app.core.database import get_supabase, get_supabase_service
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.database import get_supabase, get_supabase_service, DatabaseClient
+from app.core.security import get_password_hash_async
+from app.services.auth import login as login_user
 from app.schemas.auth import Token, UserCreate, UserLogin
 from app.schemas.user import User
-from datetime import timedelta
-from app.core.config import settings
 
 router = APIRouter()
 
@@ -14,12 +12,12 @@ router = APIRouter()
 @router.post("/register", response_model=dict)
 async def register(
     user_data: UserCreate,
-    supabase: Client = Depends(get_supabase_service)  # Use service client for registration
+    supabase: DatabaseClient = Depends(get_supabase_service)  # Use service client for registration
 ):
     """Register a new user"""
     try:
         # Check if user already exists
-        existing_user = supabase.table('users').select('*').eq('email', user_data.email).execute()
+        existing_user = await supabase.table('users').select('id').eq('email', user_data.email).execute()
         if existing_user.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -27,7 +25,7 @@ async def register(
             )
         
         # Hash password
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         
         # Create user - let PostgreSQL generate the UUID
         user_dict = {
@@ -38,7 +36,7 @@ async def register(
             "is_superuser": False
         }
         
-        response = supabase.table('users').insert(user_dict).execute()
+        response = await supabase.table('users').insert(user_dict).execute()
         
         if response.data:
             return {"message": "User created successfully", "user_id": response.data[0]['id']}
@@ -61,51 +59,11 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Login user and return access token"""
     try:
-        # Get user by email
-        response = supabase.table('users').select('*').eq('email', form_data.username).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password"
-            )
-        
-        user = response.data[0]
-        
-        # Verify password
-        if not verify_password(form_data.password, user['hashed_password']):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password"
-            )
-        
-        # Check if user is active
-        if not user.get('is_active', True):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user"
-            )
-        
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={
-                "sub": str(user['id']),
-                "email": user['email'],
-                "role": user.get('role', 'user'),
-                "is_superuser": user.get('is_superuser', 'user')
-            },
-            expires_delta=access_token_expires
-        )
-        
-        return {
-            "access_token": access_token,
-            "token_type": "bearer"
-        }
+        return await login_user(supabase, form_data.username, form_data.password)
         
     except HTTPException:
         raise
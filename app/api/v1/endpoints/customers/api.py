@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from typing import List, Optional
-from supabase import Client
-from app.core.database import get_supabase, get_supabase_service
+from app.core.database import get_supabase, get_supabase_service, DatabaseClient
 from app.core.security import get_current_user
-from app.schemas.customer import Customer, CustomerCreate, CustomerUpdate
-from datetime import datetime, timedelta
+from app.core.dataloader import get_loaders
+from app.core.pagination import TOTAL_MODE_PATTERN, execute_paginated
+from app.services.dashboard import customers_summary
+from app.services.customer_search import customer_index, as_client, MAX_LIMIT as MAX_SEARCH_LIMIT
+from app.core.events import publish_changes
+from app.schemas.customer import Customer, CustomerCreate, CustomerUpdate, CUSTOMER_COLUMNS
 
 router = APIRouter()
 
@@ -13,40 +16,13 @@ router = APIRouter()
 async def get_customers_summary(
     type: str = "month",
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Get customers summary statistics"""
     try:
-        # Calculate date range based on type
-        now = datetime.now()
-        if type == "week":
-            start_date = now - timedelta(weeks=1)
-        elif type == "year":
-            start_date = now - timedelta(days=365)
-        else:  # default to month
-            start_date = now - timedelta(days=30)
-
-        # Get total customers
-        total_response = supabase.table('customers').select('id').execute()
-        total_customers = len(total_response.data) if total_response.data else 0
-
-        # Get new customers in the period
-        new_response = supabase.table('customers').select('id').gte('created_at', start_date.isoformat()).execute()
-        new_customers = len(new_response.data) if new_response.data else 0
-
-        # Calculate active percentage (customers with recent activity)
-        # For now, we'll consider all customers as potentially active
-        active_customers = total_customers  # You can add more sophisticated logic here
-        active_percentage = round((active_customers / total_customers * 100) if total_customers > 0 else 0)
-
         return {
             "success": True,
-            "result": {
-                "total": total_customers,
-                "new": new_customers,
-                "active": active_customers,
-                "active_percentage": active_percentage
-            },
+            "result": await customers_summary(supabase, type),
             "message": f"Successfully get summary of customers for the last {type}"
         }
 
@@ -61,16 +37,17 @@ async def get_customers_summary(
 async def create_customer(
     customer_data: CustomerCreate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Create a new customer"""
     try:
         customer_dict = customer_data.dict()
         customer_dict['created_by'] = current_user['id']
         
-        response = supabase.table('customers').insert(customer_dict).execute()
+        response = await supabase.table('customers').insert(customer_dict).execute()
         
         if response.data:
+            publish_changes('customers')
             return response.data[0]
         else:
             raise HTTPException(
@@ -85,23 +62,36 @@ async def create_customer(
         )
 
 
-@router.get("/", response_model=List[Customer])
+@router.get("/", response_model=List[Customer], response_model_exclude_unset=True)
 async def get_customers(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
     search: Optional[str] = None,
+    sort: Optional[str] = Query(None, pattern="^(last_activity_at|lifetime_billed|lifetime_paid)$"),
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
-    """Get all customers"""
+    """Get all customers, newest first or by most recent activity / lifetime amounts (sort)"""
     try:
-        query = supabase.table('customers').select('*')
+        if sort:
+            if search or cursor:
+                raise ValueError("sort can't be combined with search or cursor, page with skip/limit")
+            # Read in index order from customer_activity; postgrest-py can't ask for nullslast itself
+            query = supabase.table('customer_activity').select(f"customer_id, customers!inner({CUSTOMER_COLUMNS['list']})")
+            query = query.order(f"{sort}.desc.nullslast").order('customer_id', desc=True)
+            result = await query.range(skip, skip + limit - 1).execute()
+            return [row['customers'] for row in result.data]
+
+        query = supabase.table('customers').select(CUSTOMER_COLUMNS['list'])
 
         if search:
             query = query.or_(f"name.ilike.%{search}%,email.ilike.%{search}%")
 
-        response = query.range(skip, skip + limit - 1).execute()
-        return response.data
+        result = await execute_paginated(supabase, 'customers', query, response, skip, limit, cursor, total)
+        return result.data
 
     except Exception as e:
         raise HTTPException(
@@ -111,36 +101,22 @@ async def get_customers(
 
 
 @router.get("/search")
-async def search_customers(supabase: Client = Depends(get_supabase_service)):
-    """Search customers - fetches real data from database"""
+async def search_customers(
+    q: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Typeahead search on name, email, phone and city, best matches first"""
     try:
-        print("=== CUSTOMER SEARCH ENDPOINT CALLED ===")
-        
-        # Fetch real data from database
-        response = supabase.table('customers').select('*').execute()
-        customers = response.data or []
-        
-        # Format data for frontend compatibility
-        formatted_customers = []
-        for customer in customers:
-            formatted_customers.append({
-                "_id": str(customer.get('id', '')),
-                "id": customer.get('id'),
-                "name": customer.get('name', ''),
-                "email": customer.get('email', ''),
-                "phone": customer.get('phone', ''),
-                "city": customer.get('city', ''),
-                "country": customer.get('country', ''),
-                "address": customer.get('address', ''),
-                "state": customer.get('state', ''),
-                "zipCode": customer.get('zip_code', '')
-            })
-        
-        print(f"Returning {len(formatted_customers)} customers from database")
+        # Served from the in-memory customer index, not the customers table
+        if q:
+            customers = await customer_index.search(supabase, q, limit)
+        else:
+            customers = await customer_index.customers(supabase, limit)
         
         return {
             "success": True,
-            "result": formatted_customers
+            "result": [as_client(customer) for customer in customers]
         }
         
     except Exception as e:
@@ -187,19 +163,19 @@ async def search_customers(supabase: Client = Depends(get_supabase_service)):
 async def get_customer(
     customer_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get a specific customer"""
     try:
-        response = supabase.table('customers').select('*').eq('id', customer_id).execute()
+        customer = await get_loaders().loader(supabase, 'customers', columns=CUSTOMER_COLUMNS['detail']).load(customer_id)
         
-        if not response.data:
+        if not customer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Customer not found"
             )
         
-        return response.data[0]
+        return customer
         
     except HTTPException:
         raise
@@ -215,15 +191,16 @@ async def update_customer(
     customer_id: int,
     customer_update: CustomerUpdate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Update a customer"""
     try:
         update_data = customer_update.dict(exclude_unset=True)
         
-        response = supabase.table('customers').update(update_data).eq('id', customer_id).execute()
+        response = await supabase.table('customers').update(update_data).eq('id', customer_id).execute()
         
         if response.data:
+            publish_changes('customers')
             return response.data[0]
         else:
             raise HTTPException(
@@ -244,13 +221,14 @@ async def update_customer(
 async def delete_customer(
     customer_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Delete a customer"""
     try:
-        response = supabase.table('customers').delete().eq('id', customer_id).execute()
+        response = await supabase.table('customers').delete().eq('id', customer_id).execute()
 
         if response.data:
+            publish_changes('customers')
             return {"message": "Customer deleted successfully"}
         else:
             raise HTTPException(
@@ -1,141 +1,150 @@
 """
 Dashboard API endpoints for public access
 """
-from fastapi import APIRouter, Depends
-from supabase import Client
-from app.core.database import get_supabase_service
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import json
+from app.core.config import settings
+from app.core.database import get_supabase_service, DatabaseClient
+from app.core.dataloader import get_loaders
+from app.core.events import publish_changes
+from app.core.pagination import TOTAL_MODE_PATTERN, execute_paginated
+from app.schemas.customer import CUSTOMER_COLUMNS
+from app.schemas.invoice import INVOICE_COLUMNS
+from app.schemas.quote import QUOTE_COLUMNS
+from app.services.dashboard import dashboard_summary, summary_type
+from app.services.dashboard_stream import dashboard_broadcaster
+from app.services.invoices import with_balances
 
 router = APIRouter()
 
 
+async def load_customer_names(supabase: DatabaseClient, rows: list) -> dict:
+    """Map customer_id -> name for a page of rows, fetching each customer once"""
+    customer_ids = {row.get('customer_id') for row in rows or [] if row.get('customer_id') is not None}
+    customers = await get_loaders().loader(supabase, 'customers', columns=CUSTOMER_COLUMNS['name']).load_many(customer_ids)
+    return {customer['id']: customer.get('name') for customer in customers if customer}
+
+
 @router.get("/summary")
 async def get_dashboard_summary(
     type: str = "month",
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Get dashboard summary data without authentication for demo purposes"""
-    try:
-        # Calculate date range based on type
-        now = datetime.now()
-        if type == "week":
-            start_date = now - timedelta(weeks=1)
-        elif type == "year":
-            start_date = now - timedelta(days=365)
-        else:  # default to month
-            start_date = now - timedelta(days=30)
-
-        # Mock user for internal API calls
-        mock_user = {"id": "admin", "email": "admin@admin.com"}
-
-        # Import the summary functions
-        from app.api.v1.endpoints.customers.api import get_customers_summary
-        from app.api.v1.endpoints.invoices.api import get_invoices_summary
-        from app.api.v1.endpoints.quotes.api import get_quotes_summary
-        from app.api.v1.endpoints.payments.api import get_payments_summary
-
-        # Fetch all summary data
-        customers_data = await get_customers_summary(type=type, current_user=mock_user, supabase=supabase)
-        invoices_data = await get_invoices_summary(type=type, current_user=mock_user, supabase=supabase)
-        quotes_data = await get_quotes_summary(type=type, current_user=mock_user, supabase=supabase)
-        payments_data = await get_payments_summary(type=type, current_user=mock_user, supabase=supabase)
+    summary = await dashboard_summary(supabase, type)
+    return {
+        "success": len(summary["errors"]) < len(summary["result"]),
+        "result": summary["result"],
+        "errors": summary["errors"],
+        "message": f"Successfully retrieved dashboard summary for the last {type}" if not summary["errors"]
+        else f"Partially retrieved dashboard summary for the last {type}"
+    }
 
-        return {
-            "success": True,
-            "result": {
-                "customers": customers_data.get("result", {}),
-                "invoices": invoices_data.get("result", {}),
-                "quotes": quotes_data.get("result", {}),
-                "payments": payments_data.get("result", {})
-            },
-            "message": f"Successfully retrieved dashboard summary for the last {type}"
-        }
 
-    except Exception as e:
-        print(f"Dashboard summary error: {e}")
-        return {
-            "success": False,
-            "result": {
-                "customers": {"new": 0, "active": 0},
-                "invoices": {"total": 0, "total_undue": 0, "performance": []},
-                "quotes": {"total": 0, "performance": []},
-                "payments": {"count": 0, "total": 0}
-            },
-            "message": f"Error retrieving dashboard data: {str(e)}"
-        }
+def server_sent_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/stream")
+async def stream_dashboard_summary(
+    request: Request,
+    type: str = "month",
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Server-sent events: the full summary, then the summaries that changed after each write"""
+    type = summary_type(type)
+    summary = await dashboard_summary(supabase, type)
+
+    async def events():
+        queue = dashboard_broadcaster.connect(type, summary["result"])
+        try:
+            yield server_sent_event("snapshot", {"type": type, "result": summary["result"]})
+            while not await request.is_disconnected():
+                try:
+                    update = await asyncio.wait_for(queue.get(), settings.DASHBOARD_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Comment line, keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield server_sent_event("summary", update)
+        finally:
+            dashboard_broadcaster.disconnect(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def get_single_summary(supabase: DatabaseClient, kind: str, type: str) -> dict:
+    """One dashboard card, through the same fan-out as the full summary"""
+    summary = await dashboard_summary(supabase, type, kinds=[kind])
+    error = summary["errors"].get(kind)
+    return {
+        "success": error is None,
+        "result": summary["result"][kind],
+        "message": error or f"Successfully get summary of {kind} for the last {type}"
+    }
 
 
 @router.get("/customers/summary")
 async def get_public_customers_summary(
     type: str = "month",
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public customers summary endpoint"""
-    try:
-        mock_user = {"id": "admin", "email": "admin@admin.com"}
-        from app.api.v1.endpoints.customers.api import get_customers_summary
-        return await get_customers_summary(type=type, current_user=mock_user, supabase=supabase)
-    except Exception as e:
-        return {"success": False, "result": {"new": 0, "active": 0}, "message": str(e)}
+    return await get_single_summary(supabase, "customers", type)
 
 
 @router.get("/invoices/summary")
 async def get_public_invoices_summary(
     type: str = "month",
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public invoices summary endpoint"""
-    try:
-        mock_user = {"id": "admin", "email": "admin@admin.com"}
-        from app.api.v1.endpoints.invoices.api import get_invoices_summary
-        return await get_invoices_summary(type=type, current_user=mock_user, supabase=supabase)
-    except Exception as e:
-        return {"success": False, "result": {"total": 0, "total_undue": 0, "performance": []}, "message": str(e)}
+    return await get_single_summary(supabase, "invoices", type)
 
 
 @router.get("/quotes/summary")
 async def get_public_quotes_summary(
     type: str = "month",
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public quotes summary endpoint"""
-    try:
-        mock_user = {"id": "admin", "email": "admin@admin.com"}
-        from app.api.v1.endpoints.quotes.api import get_quotes_summary
-        return await get_quotes_summary(type=type, current_user=mock_user, supabase=supabase)
-    except Exception as e:
-        return {"success": False, "result": {"total": 0, "performance": []}, "message": str(e)}
+    return await get_single_summary(supabase, "quotes", type)
 
 
 @router.get("/payments/summary")
 async def get_public_payments_summary(
     type: str = "month",
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public payments summary endpoint"""
-    try:
-        mock_user = {"id": "admin", "email": "admin@admin.com"}
-        from app.api.v1.endpoints.payments.api import get_payments_summary
-        return await get_payments_summary(type=type, current_user=mock_user, supabase=supabase)
-    except Exception as e:
-        return {"success": False, "result": {"count": 0, "total": 0}, "message": str(e)}
+    return await get_single_summary(supabase, "payments", type)
 
 
 @router.get("/customers")
 async def get_public_customers_list(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    supabase: Client = Depends(get_supabase_service)
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public customers list endpoint"""
     try:
-        query = supabase.table('customers').select('*')
-        response = query.range(skip, skip + limit - 1).execute()
+        query = supabase.table('customers').select(CUSTOMER_COLUMNS['list'])
+        customers_response = await execute_paginated(supabase, 'customers', query, response, skip, limit, cursor, total)
 
         # Clean up the data to handle None values
         customers = []
-        if response.data:
-            for customer in response.data:
+        if customers_response.data:
+            for customer in customers_response.data:
                 # Ensure created_by is either a valid UUID string or None
                 if customer.get('created_by') == '':
                     customer['created_by'] = None
@@ -149,32 +158,26 @@ async def get_public_customers_list(
 
 @router.get("/invoices")
 async def get_public_invoices_list(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    supabase: Client = Depends(get_supabase_service)
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public invoices list endpoint with customer and payment information"""
     try:
-        # Fetch invoices with customer information
-        invoices_query = supabase.table('invoices').select('*, customers(name)').order('created_at', desc=True)
-        invoices_response = invoices_query.range(skip, skip + limit - 1).execute()
-
-        # Fetch payments to calculate paid amounts
-        payments_query = supabase.table('payments').select('invoice_id, amount')
-        payments_response = payments_query.execute()
-
-        # Create a map of invoice_id to total paid amount
-        payments_map = {}
-        if payments_response.data:
-            for payment in payments_response.data:
-                invoice_id = payment['invoice_id']
-                amount = float(payment['amount'] or 0)
-                if invoice_id in payments_map:
-                    payments_map[invoice_id] += amount
-                else:
-                    payments_map[invoice_id] = amount
-
-        # Process invoices to add customer names and payment information
+        # Fetch one page of invoices
+        invoices_query = supabase.table('invoices').select(INVOICE_COLUMNS['list'])
+        invoices_response = await execute_paginated(supabase, 'invoices', invoices_query, response, skip, limit, cursor, total)
+
+        # Then each distinct customer once, and the paid amounts of this page only
+        customers_map, _ = await asyncio.gather(
+            load_customer_names(supabase, invoices_response.data),
+            with_balances(supabase, invoices_response.data)
+        )
+
+        # Process invoices to add customer names
         invoices = []
         if invoices_response.data:
             for invoice in invoices_response.data:
@@ -183,19 +186,7 @@ async def get_public_invoices_list(
                     invoice['created_by'] = None
 
                 # Add customer name
-                customer_name = 'Unknown Client'
-                if invoice.get('customers') and invoice['customers']:
-                    customer_name = invoice['customers']['name']
-                invoice['customer_name'] = customer_name
-
-                # Add paid amount
-                invoice_id = invoice['id']
-                paid_amount = payments_map.get(invoice_id, 0)
-                invoice['paid_amount'] = paid_amount
-
-                # Remove the nested customers object to keep response clean
-                if 'customers' in invoice:
-                    del invoice['customers']
+                invoice['customer_name'] = customers_map.get(invoice.get('customer_id'), 'Unknown Client')
 
                 invoices.append(invoice)
 
@@ -207,15 +198,19 @@ async def get_public_invoices_list(
 
 @router.get("/quotes")
 async def get_public_quotes_list(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    supabase: Client = Depends(get_supabase_service)
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public quotes list endpoint with customer information"""
     try:
-        # Fetch quotes with customer information
-        quotes_query = supabase.table('quotes').select('*, customers(name)').order('created_at', desc=True)
-        quotes_response = quotes_query.range(skip, skip + limit - 1).execute()
+        # Fetch quotes, then each distinct customer once
+        quotes_query = supabase.table('quotes').select(QUOTE_COLUMNS['list'])
+        quotes_response = await execute_paginated(supabase, 'quotes', quotes_query, response, skip, limit, cursor, total)
+        customers_map = await load_customer_names(supabase, quotes_response.data)
 
         # Process quotes to add customer names and calculate subtotal
         quotes = []
@@ -226,10 +221,7 @@ async def get_public_quotes_list(
                     quote['created_by'] = None
 
                 # Add customer name
-                customer_name = 'Unknown Client'
-                if quote.get('customers') and quote['customers']:
-                    customer_name = quote['customers']['name']
-                quote['customer_name'] = customer_name
+                quote['customer_name'] = customers_map.get(quote.get('customer_id'), 'Unknown Client')
 
                 # Calculate subtotal (total - tax)
                 total_amount = float(quote.get('total_amount', 0))
@@ -237,10 +229,6 @@ async def get_public_quotes_list(
                 subtotal = total_amount - tax_amount
                 quote['subtotal'] = subtotal
 
-                # Remove the nested customers object to keep response clean
-                if 'customers' in quote:
-                    del quote['customers']
-
                 quotes.append(quote)
 
         return quotes
@@ -253,7 +241,7 @@ async def get_public_quotes_list(
 async def update_public_customer(
     customer_id: int,
     customer_data: dict,
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public customer update endpoint"""
     try:
@@ -273,9 +261,10 @@ async def update_public_customer(
         # Remove None values
         update_data = {k: v for k, v in update_data.items() if v is not None}
 
-        response = supabase.table('customers').update(update_data).eq('id', customer_id).execute()
+        response = await supabase.table('customers').update(update_data).eq('id', customer_id).execute()
 
         if response.data:
+            publish_changes('customers')
             return {
                 "success": True,
                 "message": "Customer updated successfully",
@@ -298,7 +287,7 @@ async def update_public_customer(
 @router.post("/customers")
 async def create_public_customer(
     customer_data: dict,
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public customer create endpoint"""
     try:
@@ -319,9 +308,10 @@ async def create_public_customer(
         # Remove None values
         insert_data = {k: v for k, v in insert_data.items() if v is not None}
 
-        response = supabase.table('customers').insert(insert_data).execute()
+        response = await supabase.table('customers').insert(insert_data).execute()
 
         if response.data:
+            publish_changes('customers')
             return {
                 "success": True,
                 "message": "Customer created successfully",
@@ -344,11 +334,12 @@ async def create_public_customer(
 @router.delete("/customers/{customer_id}")
 async def delete_public_customer(
     customer_id: int,
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Public customer delete endpoint"""
     try:
-        response = supabase.table('customers').delete().eq('id', customer_id).execute()
+        await supabase.table('customers').delete().eq('id', customer_id).execute()
+        publish_changes('customers')
 
         return {
             "success": True,
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
-from supabase import Client
-from app.core.database import get_supabase
+from app.core.database import get_supabase, DatabaseClient
 from app.core.security import get_current_user
 
 router = APIRouter()
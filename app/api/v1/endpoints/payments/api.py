@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
 from typing import List, Optional
-from supabase import Client
-from app.core.database import get_supabase, get_supabase_service
+from app.core.database import get_supabase, get_supabase_service, DatabaseClient
 from app.core.security import get_current_user
-from app.schemas.payment import Payment, PaymentCreate, PaymentUpdate
-from datetime import datetime, timedelta
+from app.core.dataloader import get_loaders
+from app.core.pagination import TOTAL_MODE_PATTERN, execute_paginated
+from app.services.dashboard import payments_summary
+from app.core.events import publish_changes
+from app.schemas.payment import Payment, PaymentCreate, PaymentUpdate, PAYMENT_COLUMNS
+from app.schemas.invoice import INVOICE_COLUMNS
+import asyncio
 
 router = APIRouter()
 
@@ -13,33 +17,13 @@ router = APIRouter()
 async def get_payments_summary(
     type: str = "month",
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Get payments summary statistics"""
     try:
-        # Calculate date range based on type
-        now = datetime.now()
-        if type == "week":
-            start_date = now - timedelta(weeks=1)
-        elif type == "year":
-            start_date = now - timedelta(days=365)
-        else:  # default to month
-            start_date = now - timedelta(days=30)
-
-        # Get all payments in the period
-        response = supabase.table('payments').select('*').gte('created_at', start_date.isoformat()).execute()
-        payments = response.data
-
-        # Calculate totals
-        total_amount = sum(float(payment.get('amount', 0)) for payment in payments)
-        count = len(payments)
-
         return {
             "success": True,
-            "result": {
-                "count": count,
-                "total": total_amount
-            },
+            "result": await payments_summary(supabase, type),
             "message": f"Successfully get summary of payments for the last {type}"
         }
 
@@ -54,7 +38,7 @@ async def get_payments_summary(
 async def create_payment(
     payment_data: PaymentCreate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Create a new payment"""
     try:
@@ -62,25 +46,28 @@ async def create_payment(
         payment_dict['created_by'] = current_user['id']
         payment_dict['status'] = 'pending'
         
-        response = supabase.table('payments').insert(payment_dict).execute()
+        response = await supabase.table('payments').insert(payment_dict).execute()
         
         if response.data:
             # Update invoice payment status if applicable
             if payment_data.invoice_id:
-                # Get current invoice
-                invoice_response = supabase.table('invoices').select('*').eq('id', payment_data.invoice_id).execute()
-                if invoice_response.data:
-                    invoice = invoice_response.data[0]
+                # Get current invoice and its completed payments in one go
+                invoice, payments_response = await asyncio.gather(
+                    get_loaders().loader(supabase, 'invoices', columns=INVOICE_COLUMNS['detail']).load(payment_data.invoice_id),
+                    supabase.table('payments').select('amount').eq('invoice_id', payment_data.invoice_id).eq('status', 'completed').execute()
+                )
+                if invoice:
                     # Calculate total payments for this invoice
-                    payments_response = supabase.table('payments').select('amount').eq('invoice_id', payment_data.invoice_id).eq('status', 'completed').execute()
-                    total_paid = sum(p['amount'] for p in payments_response.data) + payment_data.amount
+                    total_paid = sum(float(p['amount'] or 0) for p in payments_response.data) + float(payment_data.amount)
                     
                     # Update invoice status based on payment
-                    if total_paid >= invoice['total_amount']:
-                        supabase.table('invoices').update({'status': 'paid'}).eq('id', payment_data.invoice_id).execute()
+                    if total_paid >= float(invoice['total_amount']):
+                        await supabase.table('invoices').update({'status': 'paid'}).eq('id', payment_data.invoice_id).execute()
                     else:
-                        supabase.table('invoices').update({'status': 'partially_paid'}).eq('id', payment_data.invoice_id).execute()
+                        await supabase.table('invoices').update({'status': 'partially_paid'}).eq('id', payment_data.invoice_id).execute()
             
+            # Only once the invoice status is written, so recomputed summaries see it
+            publish_changes('payments', 'invoices')
             return response.data[0]
         else:
             raise HTTPException(
@@ -95,22 +82,25 @@ async def create_payment(
         )
 
 
-@router.get("/", response_model=List[Payment])
+@router.get("/", response_model=List[Payment], response_model_exclude_unset=True)
 async def get_payments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    status_filter: Optional[str] = Query(None, alias="status"),
     invoice_id: Optional[int] = None,
     customer_id: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get all payments"""
     try:
-        query = supabase.table('payments').select('*, invoices(*), customers(*)')
+        query = supabase.table('payments').select(PAYMENT_COLUMNS['list'])
         
-        if status:
-            query = query.eq('status', status)
+        if status_filter:
+            query = query.eq('status', status_filter)
         
         if invoice_id:
             query = query.eq('invoice_id', invoice_id)
@@ -118,8 +108,8 @@ async def get_payments(
         if customer_id:
             query = query.eq('customer_id', customer_id)
         
-        response = query.range(skip, skip + limit - 1).execute()
-        return response.data
+        result = await execute_paginated(supabase, 'payments', query, response, skip, limit, cursor, total)
+        return result.data
         
     except Exception as e:
         raise HTTPException(
@@ -132,19 +122,19 @@ async def get_payments(
 async def get_payment(
     payment_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get a specific payment"""
     try:
-        response = supabase.table('payments').select('*, invoices(*), customers(*)').eq('id', payment_id).execute()
+        payment = await get_loaders().loader(supabase, 'payments', columns=PAYMENT_COLUMNS['detail']).load(payment_id)
         
-        if not response.data:
+        if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Payment not found"
             )
         
-        return response.data[0]
+        return payment
         
     except HTTPException:
         raise
@@ -160,15 +150,16 @@ async def update_payment(
     payment_id: int,
     payment_update: PaymentUpdate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Update a payment"""
     try:
         update_data = payment_update.dict(exclude_unset=True)
         
-        response = supabase.table('payments').update(update_data).eq('id', payment_id).execute()
+        response = await supabase.table('payments').update(update_data).eq('id', payment_id).execute()
         
         if response.data:
+            publish_changes('payments', 'invoices')
             return response.data[0]
         else:
             raise HTTPException(
@@ -189,13 +180,14 @@ async def update_payment(
 async def confirm_payment(
     payment_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Confirm a payment"""
     try:
-        response = supabase.table('payments').update({'status': 'completed'}).eq('id', payment_id).execute()
+        response = await supabase.table('payments').update({'status': 'completed'}).eq('id', payment_id).execute()
         
         if response.data:
+            publish_changes('payments', 'invoices')
             return {"message": "Payment confirmed successfully"}
         else:
             raise HTTPException(
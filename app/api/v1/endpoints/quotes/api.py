@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
 from typing import List, Optional
-from supabase import Client
-from app.core.database import get_supabase, get_supabase_service
+from app.core.database import get_supabase, get_supabase_service, DatabaseClient
 from app.core.security import get_current_user
-from app.schemas.quote import Quote, QuoteCreate, QuoteUpdate
-from datetime import datetime, timedelta
+from app.core.dataloader import get_loaders
+from app.core.pagination import TOTAL_MODE_PATTERN, execute_paginated
+from app.services.dashboard import quotes_summary
+from app.core.events import publish_changes
+from app.schemas.quote import Quote, QuoteCreate, QuoteUpdate, QUOTE_COLUMNS
 
 router = APIRouter()
 
@@ -13,46 +15,13 @@ router = APIRouter()
 async def get_quotes_summary(
     type: str = "month",
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_service)
+    supabase: DatabaseClient = Depends(get_supabase_service)
 ):
     """Get quotes summary statistics"""
     try:
-        # Calculate date range based on type
-        now = datetime.now()
-        if type == "week":
-            start_date = now - timedelta(weeks=1)
-        elif type == "year":
-            start_date = now - timedelta(days=365)
-        else:  # default to month
-            start_date = now - timedelta(days=30)
-
-        # Get all quotes in the period
-        response = supabase.table('quotes').select('*').gte('created_at', start_date.isoformat()).execute()
-        quotes = response.data
-
-        # Calculate totals and status counts
-        total_amount = sum(float(quote.get('total', 0)) for quote in quotes)
-
-        # Count by status
-        status_counts = {}
-        statuses = ['draft', 'pending', 'sent', 'accepted', 'declined', 'expired']
-
-        for status_name in statuses:
-            count = len([quote for quote in quotes if quote.get('status') == status_name])
-            total_quotes = len(quotes) if quotes else 1
-            percentage = round((count / total_quotes) * 100)
-            status_counts[status_name] = percentage
-
         return {
             "success": True,
-            "result": {
-                "total": total_amount,
-                "type": type,
-                "performance": [
-                    {"status": status, "percentage": status_counts.get(status, 0)}
-                    for status in statuses
-                ]
-            },
+            "result": await quotes_summary(supabase, type),
             "message": f"Successfully get summary of quotes for the last {type}"
         }
 
@@ -67,7 +36,7 @@ async def get_quotes_summary(
 async def create_quote(
     quote_data: QuoteCreate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Create a new quote"""
     try:
@@ -75,9 +44,10 @@ async def create_quote(
         quote_dict['created_by'] = current_user['id']
         quote_dict['status'] = 'draft'
         
-        response = supabase.table('quotes').insert(quote_dict).execute()
+        response = await supabase.table('quotes').insert(quote_dict).execute()
         
         if response.data:
+            publish_changes('quotes')
             return response.data[0]
         else:
             raise HTTPException(
@@ -92,27 +62,30 @@ async def create_quote(
         )
 
 
-@router.get("/", response_model=List[Quote])
+@router.get("/", response_model=List[Quote], response_model_exclude_unset=True)
 async def get_quotes(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    status_filter: Optional[str] = Query(None, alias="status"),
     customer_id: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get all quotes"""
     try:
-        query = supabase.table('quotes').select('*, customers(*)')
+        query = supabase.table('quotes').select(QUOTE_COLUMNS['list'])
         
-        if status:
-            query = query.eq('status', status)
+        if status_filter:
+            query = query.eq('status', status_filter)
         
         if customer_id:
             query = query.eq('customer_id', customer_id)
         
-        response = query.range(skip, skip + limit - 1).execute()
-        return response.data
+        result = await execute_paginated(supabase, 'quotes', query, response, skip, limit, cursor, total)
+        return result.data
         
     except Exception as e:
         raise HTTPException(
@@ -125,19 +98,19 @@ async def get_quotes(
 async def get_quote(
     quote_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get a specific quote"""
     try:
-        response = supabase.table('quotes').select('*, customers(*)').eq('id', quote_id).execute()
+        quote = await get_loaders().loader(supabase, 'quotes', columns=QUOTE_COLUMNS['detail']).load(quote_id)
         
-        if not response.data:
+        if not quote:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Quote not found"
             )
         
-        return response.data[0]
+        return quote
         
     except HTTPException:
         raise
@@ -153,15 +126,16 @@ async def update_quote(
     quote_id: int,
     quote_update: QuoteUpdate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Update a quote"""
     try:
         update_data = quote_update.dict(exclude_unset=True)
         
-        response = supabase.table('quotes').update(update_data).eq('id', quote_id).execute()
+        response = await supabase.table('quotes').update(update_data).eq('id', quote_id).execute()
         
         if response.data:
+            publish_changes('quotes')
             return response.data[0]
         else:
             raise HTTPException(
@@ -182,21 +156,19 @@ async def update_quote(
 async def convert_quote_to_invoice(
     quote_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Convert a quote to an invoice"""
     try:
         # Get the quote
-        quote_response = supabase.table('quotes').select('*').eq('id', quote_id).execute()
+        quote = await get_loaders().loader(supabase, 'quotes', columns=QUOTE_COLUMNS['detail']).load(quote_id)
         
-        if not quote_response.data:
+        if not quote:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Quote not found"
             )
         
-        quote = quote_response.data[0]
-        
         # Create invoice from quote
         invoice_data = {
             'customer_id': quote['customer_id'],
@@ -210,11 +182,12 @@ async def convert_quote_to_invoice(
             'status': 'draft'
         }
         
-        invoice_response = supabase.table('invoices').insert(invoice_data).execute()
+        invoice_response = await supabase.table('invoices').insert(invoice_data).execute()
         
         if invoice_response.data:
             # Update quote status to converted
-            supabase.table('quotes').update({'status': 'converted'}).eq('id', quote_id).execute()
+            await supabase.table('quotes').update({'status': 'converted'}).eq('id', quote_id).execute()
+            publish_changes('quotes', 'invoices')
             
             return {
                 "message": "Quote converted to invoice successfully",
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date
+from typing import Optional
+from app.core.database import get_supabase_service, DatabaseClient
+from app.core.security import get_current_user
+from app.services.aging import aging_report
+
+router = APIRouter()
+
+
+@router.get("/aging")
+async def get_aging_report(
+    as_of: Optional[date] = None,
+    customer_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: dict = Depends(get_current_user),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Get receivables aging (current, 1-30, 31-60, 61-90, 90+ days past due) per customer and overall"""
+    try:
+        report = await aging_report(supabase, as_of, customer_id)
+        if limit:
+            report["customers"] = report["customers"][:limit]
+        return {
+            "success": True,
+            "result": report,
+            "message": f"Successfully get receivables aging as of {report['as_of']}"
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional
+from app.core.database import get_supabase_service, DatabaseClient
+from app.core.security import get_current_user
+from app.services.search import global_search, MAX_LIMIT
+
+router = APIRouter()
+
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(None, description="Comma-separated: customers, invoices, quotes, payments"),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT),
+    skip: int = Query(0, ge=0),
+    current_user: dict = Depends(get_current_user),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Search customers, invoices, quotes and payments, ranked hits grouped by type"""
+    try:
+        entity_types = [entity.strip() for entity in types.split(",") if entity.strip()] if types else None
+        result = await global_search(supabase, q, entity_types, limit, skip)
+        found = sum(group["total"] or 0 for group in result["groups"].values())
+        return {
+            "success": True,
+            "result": result,
+            "message": f"Found {found} matches for '{q}'"
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
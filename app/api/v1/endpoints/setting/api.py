@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import List, Dict, Any
-from supabase import Client
-from app.core.database import get_supabase
+from app.core.database import get_supabase, DatabaseClient
 from app.core.security import get_current_user
 import json
 
@@ -96,7 +95,7 @@ async def list_settings(
     limit: int = 100,
     category: str = None,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get settings with pagination"""
     try:
@@ -132,7 +131,7 @@ async def list_settings(
 async def get_setting(
     setting_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get a specific setting by ID"""
     try:
@@ -165,7 +164,7 @@ async def get_setting(
 async def create_setting(
     setting_data: Dict[str, Any],
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Create a new setting (admin only)"""
     if not current_user.get('is_superuser', False):
@@ -264,7 +263,7 @@ async def update_setting(
     setting_id: int,
     setting_data: Dict[str, Any],
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Update a specific setting (admin only)"""
     if not current_user.get('is_superuser', False):
@@ -298,7 +297,7 @@ async def update_setting(
 async def delete_setting(
     setting_id: int,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Delete a specific setting (admin only)"""
     if not current_user.get('is_superuser', False):
@@ -327,7 +326,7 @@ async def filter_settings(
     filter: str = None,
     equal: str = None,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Filter settings based on criteria"""
     try:
@@ -360,7 +359,7 @@ async def filter_settings(
 async def search_settings(
     q: str = None,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Search settings"""
     try:
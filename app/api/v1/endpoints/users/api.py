@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from supabase import Client
-from app.core.database import get_supabase
-from app.core.security import get_current_user
-from app.schemas.user import User, UserUpdate
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from typing import List, Optional
+from uuid import UUID
+from app.core.database import get_supabase, DatabaseClient
+from app.core.security import get_current_user, get_current_admin_user
+from app.core.cache import user_cache
+from app.core.revocation import revocation_list
+from app.core.pagination import TOTAL_MODE_PATTERN, execute_paginated
+from app.schemas.user import User, UserUpdate, USER_COLUMNS
 
 router = APIRouter()
 
@@ -20,15 +23,18 @@ async def get_current_user_info(
 async def update_current_user(
     user_update: UserUpdate,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Update current user information"""
     try:
         update_data = user_update.dict(exclude_unset=True)
         
-        response = supabase.table('users').update(update_data).eq('id', current_user['id']).execute()
+        response = await supabase.table('users').update(update_data).eq('id', current_user['id']).execute()
+        # Role or is_active may have changed, the next request must see the new row
+        user_cache.invalidate(str(current_user['id']))
         
         if response.data:
+            revocation_list.record(response.data[0])
             return response.data[0]
         else:
             raise HTTPException(
@@ -45,10 +51,13 @@ async def update_current_user(
 
 @router.get("/", response_model=List[User])
 async def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get all users (admin only)"""
     # Check if user is admin/superuser
@@ -59,11 +68,74 @@ async def get_users(
         )
     
     try:
-        response = supabase.table('users').select('*').range(skip, skip + limit - 1).execute()
-        return response.data
+        query = supabase.table('users').select(USER_COLUMNS['detail'])
+        result = await execute_paginated(supabase, 'users', query, response, skip, limit, cursor, total)
+        return result.data
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+
+
+@router.put("/{user_id}", response_model=User)
+async def update_user(
+    user_id: UUID,
+    user_update: UserUpdate,
+    current_user: dict = Depends(get_current_admin_user),
+    supabase: DatabaseClient = Depends(get_supabase)
+):
+    """Update a user, e.g. deactivate or change their role (admin only)"""
+    try:
+        update_data = user_update.dict(exclude_unset=True)
+
+        response = await supabase.table('users').update(update_data).eq('id', str(user_id)).execute()
+        # Their cached row must not keep authenticating them with the old role or status
+        user_cache.invalidate(str(user_id))
+
+        if response.data:
+            revocation_list.record(response.data[0])
+            return response.data[0]
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.delete("/{user_id}")
+async def delete_user(
+    user_id: UUID,
+    current_user: dict = Depends(get_current_admin_user),
+    supabase: DatabaseClient = Depends(get_supabase)
+):
+    """Delete a user (admin only)"""
+    try:
+        response = await supabase.table('users').delete().eq('id', str(user_id)).execute()
+        user_cache.invalidate(str(user_id))
+
+        if response.data:
+            revocation_list.record_deleted(str(user_id))
+            return {"message": "User deleted successfully"}
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -0,0 +1,66 @@
+"""
+Bounded in-process caches with per-entry expiry.
+
+``user_cache`` holds the user row behind each JWT ``sub`` so that resolving
+the current user (API bearer tokens and frontend cookies alike) costs no
+database round trip once a user has been seen. Handlers that change a user
+call ``user_cache.invalidate(user_id)``; changes made outside this process
+(other workers, SQL scripts) are picked up when the entry expires.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """Least recently used cache whose entries expire ttl seconds after being set"""
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value, None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
@@ -15,11 +15,67 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: str
 
+    # Database HTTP connection pool (shared by every PostgREST client)
+    DB_POOL_MAX_CONNECTIONS: int = 50
+    DB_POOL_MAX_KEEPALIVE: int = 20
+    DB_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    DB_POOL_WARM_CONNECTIONS: int = 4
+    DB_HTTP2: bool = True
+    DB_CONNECT_TIMEOUT: float = 5.0
+    DB_READ_TIMEOUT: float = 30.0
+    DB_POOL_TIMEOUT: float = 10.0
+
+    # Local PostgREST stand-in backed by SQLite ("supabase" or "local")
+    DATABASE_BACKEND: str = "supabase"
+    LOCAL_DB_PATH: str = ":memory:"
+    LOCAL_DB_LATENCY_MS: float = 0.0
+    LOCAL_DB_LATENCY_JITTER_MS: float = 0.0
+    LOCAL_DB_SEED_CUSTOMERS: int = 0
+
+    # Per-request database query accounting (Server-Timing header)
+    QUERY_LOG_ENABLED: bool = True
+    QUERY_LOG_SLOW_MS: float = 500.0
+
+    # Dashboard summaries (seconds each summary may take before its card is blanked)
+    DASHBOARD_BRANCH_TIMEOUT: float = 5.0
+
+    # Dashboard summary cache (seconds fresh, seconds served stale while refreshing; 0 TTL disables)
+    SUMMARY_CACHE_TTL: float = 60.0
+    SUMMARY_CACHE_MAX_STALE: float = 3600.0
+    SUMMARY_CACHE_DIR: str = ""
+
+    # Live dashboard stream (seconds between checks for other workers' writes, between keep-alive comments)
+    DASHBOARD_STREAM_POLL_INTERVAL: float = 2.0
+    DASHBOARD_STREAM_KEEPALIVE: float = 15.0
+
+    # Customer typeahead index (seconds before it checks for changes made outside the app, between full reloads)
+    CUSTOMER_SEARCH_MAX_AGE: float = 300.0
+    CUSTOMER_SEARCH_FULL_SYNC_INTERVAL: float = 3600.0
+
     # JWT settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing (bcrypt cost, threads hashing passwords, operations allowed to wait for one)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_QUEUE: int = 32
+
+    # Authenticated user cache (seconds a user row is trusted, users kept per worker; 0 TTL disables)
+    USER_CACHE_TTL: float = 60.0
+    USER_CACHE_SIZE: int = 10000
+
+    # "database" re-reads the user behind each token, "claims" trusts the token until exp
+    AUTH_MODE: str = "database"
+    AUTH_REVOCATION_REFRESH_INTERVAL: float = 30.0
+
+    # Backend of the frontend /api proxy (empty: this process, called in-process without a network hop)
+    FRONTEND_BACKEND_URL: str = ""
+    # Connection pool of the proxy when FRONTEND_BACKEND_URL is set
+    FRONTEND_PROXY_MAX_CONNECTIONS: int = 50
+    FRONTEND_PROXY_MAX_KEEPALIVE: int = 20
+
     # CORS settings
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:8080"
 
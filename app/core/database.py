@@ -1,137 +1,283 @@
 try:
-    from supabase import create_client, Client
+    from postgrest import AsyncPostgrestClient
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
-    Client = None
+    AsyncPostgrestClient = None
 
 from app.core.config import settings
+from app.core import query_log
+from app.core.local_database import LOCAL_SUPABASE_URL, LocalDatabase, LocalPostgrestTransport, seed_local_database
+from typing import Optional, Union
 import asyncio
+import httpx
+import re
 
+# Prefer: count=... modes; planned and estimated come from the query planner
+# (estimated is exact up to db-max-rows) and stay cheap on huge tables
+COUNT_MODES = ("exact", "planned", "estimated")
 
-class MockSupabaseClient:
-    """Mock client for when Supabase is not available"""
-    def table(self, table_name: str):
-        return MockTable(table_name)
-
-
-class MockTable:
-    """Mock table for testing without database"""
-    def __init__(self, table_name: str):
-        self.table_name = table_name
-
-    def select(self, *args):
-        return MockQuery(self.table_name, "select")
-
-    def insert(self, data):
-        return MockQuery(self.table_name, "insert", data)
-
-    def update(self, data):
-        return MockQuery(self.table_name, "update", data)
+# Query parameters that shape a result rather than filter it
+NON_FILTER_PARAMS = ("select", "order", "limit", "offset", "on_conflict", "columns")
 
-    def delete(self):
-        return MockQuery(self.table_name, "delete")
 
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """Keep-alive HTTP transport shared by every DatabaseClient.
 
-class MockQuery:
-    """Mock query for testing without database"""
-    def __init__(self, table_name: str, operation: str, data=None):
-        self.table_name = table_name
-        self.operation = operation
-        self.data = data
-
-    def eq(self, column, value):
-        return self
-
-    def limit(self, count):
-        return self
-
-    def range(self, start, end):
-        return self
+    Wraps httpx's connection pool with the limits from settings and keeps a
+    few counters so the pool can be sized from real traffic (see ``stats()``).
+    """
+    def __init__(self):
+        self.limits = httpx.Limits(
+            max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY
+        )
+        super().__init__(http2=settings.DB_HTTP2, limits=self.limits)
+        self.requests = 0
+        self.waits = 0
+        self.in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        connections = self.connections()
+        if (len(connections) >= self.limits.max_connections
+                and not any(connection.is_available() for connection in connections)):
+            # Every connection is busy, this request has to queue for one
+            self.waits += 1
+        self.in_flight += 1
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+
+    def connections(self) -> list:
+        """Connections currently held by httpcore's pool (its public ``connections`` list)"""
+        pool = getattr(self, "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def stats(self) -> dict:
+        """Current pool usage"""
+        connections = self.connections()
+        idle = len([connection for connection in connections if connection.is_idle()])
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "http2": settings.DB_HTTP2,
+            "connections": len(connections),
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "waits": self.waits
+        }
+
+
+def get_db_timeout() -> httpx.Timeout:
+    """Per-request timeouts for PostgREST calls"""
+    return httpx.Timeout(
+        connect=settings.DB_CONNECT_TIMEOUT,
+        read=settings.DB_READ_TIMEOUT,
+        write=settings.DB_READ_TIMEOUT,
+        pool=settings.DB_POOL_TIMEOUT
+    )
+
+
+def create_session(base_url: str, headers: dict, timeout, transport: httpx.AsyncBaseTransport = None) -> httpx.AsyncClient:
+    """PostgREST session on the shared pool, recording each round trip in the current request's query log"""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=timeout,
+        transport=transport,
+        follow_redirects=True,
+        event_hooks={"request": [query_log.on_request], "response": [query_log.on_response]}
+    )
+
+
+if SUPABASE_AVAILABLE:
+    class PooledPostgrestClient(AsyncPostgrestClient):
+        """AsyncPostgrestClient built with our session instead of a private one of its own"""
+        def __init__(self, base_url: str, transport: httpx.AsyncBaseTransport = None, **kwargs):
+            # create_session() runs inside the base __init__
+            self.transport = transport
+            super().__init__(base_url, **kwargs)
+
+        def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+            return create_session(base_url, headers, timeout, self.transport)
+
+
+class DatabaseClient:
+    """Awaitable PostgREST client with the supabase-py table()/rpc() query shape.
+
+    Queries are built exactly like with supabase-py, but ``execute()`` is a
+    coroutine so a database round trip never blocks the event loop:
+
+        response = await supabase.table('invoices').select('*').eq('id', 1).execute()
+    """
+    def __init__(self, supabase_url: str, supabase_key: str, transport: httpx.AsyncBaseTransport = None):
+        if not supabase_url or not re.match(r"^(https?)://.+", supabase_url):
+            raise ValueError("SUPABASE_URL must be an http(s) URL")
+        if not supabase_key:
+            raise ValueError("Supabase key is required")
+
+        self.rest_url = f"{supabase_url.rstrip('/')}/rest/v1"
+        # Every query goes through the shared pool instead of a private one
+        self.postgrest = PooledPostgrestClient(
+            self.rest_url,
+            transport=transport,
+            headers={"apiKey": supabase_key, "Authorization": f"Bearer {supabase_key}"},
+            timeout=get_db_timeout()
+        )
 
-    def execute(self):
-        # Return mock response
-        if self.operation == "select":
-            return type('MockResponse', (), {'data': []})()
-        elif self.operation == "insert":
-            return type('MockResponse', (), {'data': [{'id': 1, **self.data}] if self.data else [{'id': 1}]})()
-        else:
-            return type('MockResponse', (), {'data': []})()
+    def table(self, table_name: str):
+        """Start a query on a table"""
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str):
+        """Alias of table(), as in supabase-py"""
+        return self.table(table_name)
+
+    def rpc(self, fn: str, params: dict = None):
+        """Call a Postgres function"""
+        return self.postgrest.rpc(fn, params or {})
+
+    async def count(self, table_name: str, filters: Union[dict, httpx.QueryParams, list] = None,
+                    mode: str = "exact") -> Optional[int]:
+        """Number of rows matching filters, from a HEAD request that transfers no rows.
+
+        ``filters`` are PostgREST query parameters, e.g. ``{"status": "eq.paid"}``,
+        or the ``params`` of a query builder to count what it would return.
+        Returns None if the server didn't report a count.
+        """
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Count mode must be one of {', '.join(COUNT_MODES)}")
+        params = [
+            (key, value) for key, value in httpx.QueryParams(filters or {}).multi_items()
+            if key not in NON_FILTER_PARAMS
+        ]
+        response = await self.postgrest.session.head(
+            f"/{table_name}", params=params, headers={"Prefer": f"count={mode}"}
+        )
+        response.raise_for_status()
+        # Content-Range: 0-24/3573, */3573 with no rows, or */* without a count
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+
+    async def aclose(self):
+        """Close the underlying HTTP connections"""
+        await self.postgrest.aclose()
 
 
 class SupabaseClient:
     def __init__(self):
-        self.client: Client = None
-        self.service_client: Client = None
+        self.client: DatabaseClient = None
+        self.service_client: DatabaseClient = None
+        self.transport: httpx.AsyncBaseTransport = None
         self._connection_attempted = False
 
-    def get_client(self) -> Client:
+    @property
+    def is_local(self) -> bool:
+        """Whether queries go to the SQLite stand-in instead of Supabase"""
+        return isinstance(self.transport, LocalPostgrestTransport)
+
+    def get_transport(self) -> PooledTransport:
+        """Get the connection pool shared by the regular and service clients"""
+        if not self.transport:
+            self.transport = PooledTransport()
+        return self.transport
+
+    def get_local_transport(self) -> LocalPostgrestTransport:
+        """Get the SQLite-backed PostgREST stand-in, seeding it on first use"""
+        if not self.is_local:
+            database = LocalDatabase(settings.LOCAL_DB_PATH)
+            customers = database.conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+            if settings.LOCAL_DB_SEED_CUSTOMERS > 0 and customers == 0:
+                seed_local_database(database, settings.LOCAL_DB_SEED_CUSTOMERS)
+                print(f"🌱 Seeded local database with {settings.LOCAL_DB_SEED_CUSTOMERS} customers")
+            self.transport = LocalPostgrestTransport(database)
+        return self.transport
+
+    def _create_client(self, key: str, name: str) -> DatabaseClient:
+        if not SUPABASE_AVAILABLE:
+            raise RuntimeError(f"Cannot create Supabase {name}: the postgrest package is not installed "
+                               "(pip install -r requirements.txt)")
+
+        if settings.DATABASE_BACKEND == "local":
+            return DatabaseClient(LOCAL_SUPABASE_URL, key or "local", self.get_local_transport())
+
+        try:
+            client = DatabaseClient(settings.SUPABASE_URL, key, self.get_transport())
+            print(f"✅ Supabase {name} created successfully")
+            return client
+        except Exception as e:
+            print(f"❌ Error creating Supabase {name}: {e}")
+            print("🔄 Using local database stand-in for development")
+            return DatabaseClient(LOCAL_SUPABASE_URL, key or "local", self.get_local_transport())
+
+    def get_client(self) -> DatabaseClient:
         """Get the regular Supabase client (with anon key)"""
         if not self.client and not self._connection_attempted:
             self._connection_attempted = True
-            if not SUPABASE_AVAILABLE:
-                print("⚠️  Supabase library not available, using mock client")
-                self.client = MockSupabaseClient()
-                return self.client
-
-            try:
-                # Create client using simple positional arguments
-                self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-                print("✅ Supabase client created successfully")
-            except Exception as e:
-                print(f"❌ Error creating Supabase client: {e}")
-                print("🔄 Using mock client for development")
-                self.client = MockSupabaseClient()
+            self.client = self._create_client(settings.SUPABASE_KEY, "client")
         return self.client
 
-    def get_service_client(self) -> Client:
+    def get_service_client(self) -> DatabaseClient:
         """Get the service role Supabase client (with service key)"""
         if not self.service_client:
-            if not SUPABASE_AVAILABLE:
-                print("⚠️  Supabase library not available, using mock service client")
-                self.service_client = MockSupabaseClient()
-                return self.service_client
-
-            try:
-                # Create service client using simple positional arguments
-                self.service_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
-                print("✅ Supabase service client created successfully")
-            except Exception as e:
-                print(f"❌ Error creating Supabase service client: {e}")
-                print("🔄 Using mock service client for development")
-                self.service_client = MockSupabaseClient()
+            self.service_client = self._create_client(settings.SUPABASE_SERVICE_KEY, "service client")
         return self.service_client
 
+    def pool_stats(self) -> dict:
+        """Connection pool (or local stand-in) statistics, empty when none is in use"""
+        if not self.transport:
+            return {}
+        return self.transport.stats()
+
+    async def close(self):
+        """Close the shared connection pool"""
+        if self.transport:
+            await self.transport.aclose()
+        self.client = None
+        self.service_client = None
+        self.transport = None
+        self._connection_attempted = False
+
 
 # Global instance
 supabase_client = SupabaseClient()
 
 
-def get_supabase() -> Client:
+def get_supabase() -> DatabaseClient:
     """Dependency to get Supabase client"""
     return supabase_client.get_client()
 
 
-def get_supabase_service() -> Client:
+def get_supabase_service() -> DatabaseClient:
     """Dependency to get Supabase service client"""
     return supabase_client.get_service_client()
 
 
 async def init_db():
     """Initialize database connection"""
+    if not SUPABASE_AVAILABLE:
+        # Both backends speak PostgREST through postgrest-py, fail startup instead of every request
+        raise RuntimeError("The postgrest package is required for every DATABASE_BACKEND "
+                           "(pip install -r requirements.txt)")
+
     try:
         client = get_supabase()
         if client is None:
             print("❌ Database connection failed: Could not create Supabase client")
             return
 
-        # Test connection (this will work with both real and mock clients)
-        response = client.table('users').select('id').limit(1).execute()
+        # Test connection (this will work with both Supabase and the local stand-in)
+        response = await client.table('users').select('id').limit(1).execute()
 
-        if isinstance(client, MockSupabaseClient):
-            print("🔄 Using mock database client for development")
+        if supabase_client.is_local:
+            print(f"🔄 Using local database stand-in ({settings.LOCAL_DB_PATH}) for development")
             print("📝 To use real database:")
-            print("   1. Fix the Supabase client dependency issue")
+            print("   1. Set DATABASE_BACKEND=supabase and a valid SUPABASE_URL")
             print("   2. Run the database_setup.sql script in your Supabase project")
         else:
             print("✅ Database connection established")
@@ -139,3 +285,31 @@ async def init_db():
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         print("Note: Make sure you have run the database_setup.sql script in your Supabase project")
+
+
+async def warm_db_pool():
+    """Open keep-alive connections up front so the first requests don't pay for TLS.
+
+    Over HTTP/2 concurrent requests share one multiplexed connection, so only
+    one is opened; over HTTP/1.1 each concurrent HEAD opens its own.
+    """
+    client = get_supabase_service()
+    if client is None or supabase_client.is_local or settings.DB_POOL_WARM_CONNECTIONS <= 0:
+        return
+
+    warm = 1 if settings.DB_HTTP2 else min(settings.DB_POOL_WARM_CONNECTIONS, settings.DB_POOL_MAX_CONNECTIONS)
+    try:
+        await asyncio.gather(*[
+            client.table('users').select('id', head=True).limit(1).execute()
+            for _ in range(warm)
+        ])
+        stats = supabase_client.pool_stats()
+        print(f"✅ Database pool warmed: {stats['connections']} connection(s) open "
+              f"({'HTTP/2, multiplexed' if settings.DB_HTTP2 else 'HTTP/1.1'})")
+    except Exception as e:
+        print(f"⚠️  Could not warm database pool: {e}")
+
+
+async def close_db():
+    """Close database connections"""
+    await supabase_client.close()
@@ -0,0 +1,134 @@
+"""
+Request-scoped batching and caching of lookups by key.
+
+Instead of issuing one ``.eq('id', x)`` query per entity, endpoints ask a
+DataLoader for the entities they need. Every key requested in the same event
+loop tick is fetched with a single ``.in_()`` query and the result is memoized
+for the rest of the request, so asking twice for the same row never costs a
+second round trip:
+
+    users = get_loaders().loader(supabase, 'users')
+    user = await users.load(user_id)
+"""
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+
+# PostgREST puts in_() values in the URL, keep batches well below URL limits
+MAX_BATCH_SIZE = 200
+
+
+class DataLoader:
+    """Coalesces lookups on one table into batched ``in_()`` queries"""
+    def __init__(self, client, table: str, key: str = 'id', columns: str = '*'):
+        self.client = client
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self._cache: Dict[str, asyncio.Future] = {}
+        self._queue: List[Any] = []
+
+    def load(self, key_value: Any) -> "asyncio.Future[Optional[dict]]":
+        """Get the row for a key (None if it doesn't exist)"""
+        cache_key = str(key_value)
+        future = self._cache.get(cache_key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[cache_key] = future
+        self._queue.append(key_value)
+
+        if len(self._queue) == 1:
+            # First key of this tick, dispatch once every caller has queued theirs
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, key_values: Iterable[Any]) -> List[Optional[dict]]:
+        """Get the rows for several keys, in the same order"""
+        return list(await asyncio.gather(*[self.load(key_value) for key_value in key_values]))
+
+    def prime(self, row: dict):
+        """Seed the cache with a row we already have, e.g. after a write"""
+        cache_key = str(row[self.key])
+        future = self._cache.get(cache_key)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._cache[cache_key] = future
+        future.set_result(row)
+
+    def clear(self, key_value: Any = None):
+        """Forget one key, or everything when no key is given"""
+        if key_value is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(str(key_value), None)
+
+    async def _dispatch(self):
+        keys, self._queue = self._queue, []
+        unique_keys = list({str(key_value): key_value for key_value in keys}.values())
+
+        for start in range(0, len(unique_keys), MAX_BATCH_SIZE):
+            batch = unique_keys[start:start + MAX_BATCH_SIZE]
+            try:
+                response = await self.client.table(self.table).select(self.columns).in_(self.key, batch).execute()
+                rows = {str(row.get(self.key)): row for row in response.data or []}
+                for key_value in batch:
+                    future = self._cache.get(str(key_value))
+                    if future is not None and not future.done():
+                        future.set_result(rows.get(str(key_value)))
+            except Exception as e:
+                for key_value in batch:
+                    future = self._cache.pop(str(key_value), None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+
+class RequestLoaders:
+    """The DataLoaders of one request, one per (client, table, key, columns)"""
+    def __init__(self):
+        self._loaders: Dict[tuple, DataLoader] = {}
+
+    def loader(self, client, table: str, key: str = 'id', columns: str = '*') -> DataLoader:
+        """Get (or create) the loader for a table"""
+        loader_key = (id(client), table, key, columns)
+        loader = self._loaders.get(loader_key)
+        if loader is None:
+            loader = DataLoader(client, table, key=key, columns=columns)
+            self._loaders[loader_key] = loader
+        return loader
+
+    def clear(self, table: str, key_value: Any = None):
+        """Invalidate cached rows of a table after it was written to"""
+        for loader in self._loaders.values():
+            if loader.table == table:
+                loader.clear(key_value)
+
+
+_request_loaders: ContextVar[Optional[RequestLoaders]] = ContextVar("request_loaders", default=None)
+
+
+def get_loaders() -> RequestLoaders:
+    """Loaders of the current request (a throwaway set outside of a request)"""
+    loaders = _request_loaders.get()
+    if loaders is None:
+        loaders = RequestLoaders()
+    return loaders
+
+
+class DataLoaderMiddleware:
+    """Gives every HTTP request its own set of DataLoaders"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _request_loaders.set(RequestLoaders())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_loaders.reset(token)
@@ -0,0 +1,35 @@
+"""
+In-process publish/subscribe of data changes.
+
+Write handlers call ``publish_changes('invoices', ...)`` with the tables they
+just wrote to. Subscribers (the summary cache, the live dashboard stream) are
+called synchronously on the event loop, so they should only record the
+change and return.
+"""
+from typing import Callable, List, Set
+
+ChangeSubscriber = Callable[[Set[str]], None]
+
+_subscribers: List[ChangeSubscriber] = []
+
+
+def subscribe(subscriber: ChangeSubscriber) -> ChangeSubscriber:
+    """Call subscriber with the set of changed tables after every write"""
+    _subscribers.append(subscriber)
+    return subscriber
+
+
+def unsubscribe(subscriber: ChangeSubscriber):
+    if subscriber in _subscribers:
+        _subscribers.remove(subscriber)
+
+
+def publish_changes(*tables: str):
+    """Announce that rows of these tables were created, updated or deleted"""
+    changed = set(tables)
+    for subscriber in list(_subscribers):
+        try:
+            subscriber(changed)
+        except Exception as e:
+            # A broken subscriber must not fail the write that was already committed
+            print(f"⚠️  Change subscriber failed: {e}")
@@ -0,0 +1,1181 @@
+"""
+Local PostgREST stand-in backed by SQLite.
+
+``LocalPostgrestTransport`` plugs into DatabaseClient in place of the network
+transport and answers the same HTTP requests PostgREST would: filters
+(eq, neq, gt(e), lt(e), like, ilike, is, in, fts and or/and/not groups),
+ordering, limit/offset, exact counts via ``Prefer: count=...``, single-object
+responses, embedded relations such as ``customers(name)`` and ``.rpc()`` calls.
+
+Every query goes through the real postgrest-py request builders, so endpoints
+run unmodified against it. A configurable latency is injected per round trip
+so the whole API can be load-tested on a laptop with no network:
+
+    DATABASE_BACKEND=local LOCAL_DB_LATENCY_MS=5 LOCAL_DB_SEED_CUSTOMERS=1000
+"""
+import asyncio
+import json
+import random
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+LOCAL_SUPABASE_URL = "http://local.postgrest"
+
+# Mirrors database_setup.sql
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email VARCHAR UNIQUE NOT NULL,
+    full_name VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    is_superuser VARCHAR DEFAULT 'user',
+    role VARCHAR DEFAULT 'user',
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR NOT NULL,
+    email VARCHAR,
+    phone VARCHAR,
+    address TEXT,
+    city VARCHAR,
+    state VARCHAR,
+    country VARCHAR,
+    postal_code VARCHAR,
+    tax_number VARCHAR,
+    notes TEXT,
+    created_by TEXT REFERENCES users(id),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER REFERENCES customers(id),
+    quote_number VARCHAR,
+    issue_date DATE,
+    expiry_date DATE,
+    total_amount DECIMAL(10,2) NOT NULL,
+    tax_amount DECIMAL(10,2) DEFAULT 0,
+    discount_amount DECIMAL(10,2) DEFAULT 0,
+    items JSONB,
+    notes TEXT,
+    terms TEXT,
+    status VARCHAR DEFAULT 'draft',
+    created_by TEXT REFERENCES users(id),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER REFERENCES customers(id),
+    quote_id INTEGER REFERENCES quotes(id),
+    invoice_number VARCHAR,
+    issue_date DATE,
+    due_date DATE,
+    total_amount DECIMAL(10,2) NOT NULL,
+    tax_amount DECIMAL(10,2) DEFAULT 0,
+    discount_amount DECIMAL(10,2) DEFAULT 0,
+    items JSONB,
+    notes TEXT,
+    terms TEXT,
+    status VARCHAR DEFAULT 'draft',
+    created_by TEXT REFERENCES users(id),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER REFERENCES customers(id),
+    invoice_id INTEGER REFERENCES invoices(id),
+    amount DECIMAL(10,2) NOT NULL,
+    payment_method VARCHAR NOT NULL,
+    payment_date DATE,
+    reference_number VARCHAR,
+    notes TEXT,
+    status VARCHAR DEFAULT 'pending',
+    created_by TEXT REFERENCES users(id),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
+CREATE INDEX IF NOT EXISTS idx_customers_created_at ON customers(created_at);
+CREATE INDEX IF NOT EXISTS idx_invoices_customer_id ON invoices(customer_id);
+CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices(status);
+CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices(created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_customer_id ON quotes(customer_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_status ON quotes(status);
+CREATE INDEX IF NOT EXISTS idx_quotes_created_at ON quotes(created_at);
+CREATE INDEX IF NOT EXISTS idx_payments_invoice_id ON payments(invoice_id);
+CREATE INDEX IF NOT EXISTS idx_payments_customer_id ON payments(customer_id);
+CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status);
+CREATE INDEX IF NOT EXISTS idx_payments_created_at ON payments(created_at);
+"""
+
+# Daily rollups kept up by triggers, mirrors database_summary_functions.sql
+# rollup table -> (base table, amount column)
+STATUS_ROLLUPS = {
+    "invoice_daily": ("invoices", "total_amount"),
+    "quote_daily": ("quotes", "total_amount"),
+    "payment_daily": ("payments", "amount"),
+}
+
+
+def _rollup_schema() -> str:
+    """DDL of the rollup tables and the triggers maintaining them"""
+    statements = []
+    for rollup, (table, amount) in STATUS_ROLLUPS.items():
+        add = (
+            f"INSERT INTO {rollup} (day, status, count, total)"
+            " VALUES (substr({row}.created_at, 1, 10), COALESCE({row}.status, 'draft'), {sign}1, {sign}COALESCE({row}." + amount + ", 0))"
+            " ON CONFLICT (day, status) DO UPDATE SET count = count + excluded.count, total = total + excluded.total;"
+        )
+        remove = add.format(row="OLD", sign="-") + (
+            f" DELETE FROM {rollup} WHERE day = substr(OLD.created_at, 1, 10) AND status = COALESCE(OLD.status, 'draft') AND count = 0;"
+        )
+        insert = add.format(row="NEW", sign="")
+        statements.append(f"""
+CREATE TABLE IF NOT EXISTS {rollup} (
+    day DATE NOT NULL,
+    status VARCHAR NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    total DECIMAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status)
+);
+CREATE TRIGGER IF NOT EXISTS {table}_daily_rollup_insert AFTER INSERT ON {table} BEGIN {insert} END;
+CREATE TRIGGER IF NOT EXISTS {table}_daily_rollup_delete AFTER DELETE ON {table} BEGIN {remove} END;
+CREATE TRIGGER IF NOT EXISTS {table}_daily_rollup_update AFTER UPDATE OF status, {amount}, created_at ON {table}
+BEGIN {remove} {insert} END;""")
+
+    insert = (
+        "INSERT INTO customer_daily (day, count) VALUES (substr(NEW.created_at, 1, 10), 1)"
+        " ON CONFLICT (day) DO UPDATE SET count = count + 1;"
+    )
+    remove = (
+        "UPDATE customer_daily SET count = count - 1 WHERE day = substr(OLD.created_at, 1, 10);"
+        " DELETE FROM customer_daily WHERE day = substr(OLD.created_at, 1, 10) AND count = 0;"
+    )
+    statements.append(f"""
+CREATE TABLE IF NOT EXISTS customer_daily (
+    day DATE PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TRIGGER IF NOT EXISTS customers_daily_rollup_insert AFTER INSERT ON customers BEGIN {insert} END;
+CREATE TRIGGER IF NOT EXISTS customers_daily_rollup_delete AFTER DELETE ON customers BEGIN {remove} END;
+CREATE TRIGGER IF NOT EXISTS customers_daily_rollup_update AFTER UPDATE OF created_at ON customers
+BEGIN {remove} {insert} END;""")
+    return "\n".join(statements)
+
+
+ROLLUP_SCHEMA = _rollup_schema()
+
+
+# Invoice balances kept up by triggers, mirrors database_summary_functions.sql
+REFRESH_INVOICE_BALANCE = """
+INSERT INTO invoice_balances (invoice_id, customer_id, status, due_date, created_at, total_amount, paid)
+SELECT i.id, i.customer_id, i.status, i.due_date, i.created_at, COALESCE(i.total_amount, 0),
+       COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.invoice_id = i.id), 0)
+FROM invoices i WHERE i.id = {invoice_id}
+ON CONFLICT (invoice_id) DO UPDATE SET
+    customer_id = excluded.customer_id, status = excluded.status, due_date = excluded.due_date,
+    created_at = excluded.created_at, total_amount = excluded.total_amount, paid = excluded.paid;
+"""
+
+BALANCE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS invoice_balances (
+    invoice_id INTEGER PRIMARY KEY REFERENCES invoices(id) ON DELETE CASCADE,
+    customer_id INTEGER,
+    status VARCHAR,
+    due_date DATE,
+    created_at TIMESTAMP,
+    total_amount DECIMAL NOT NULL DEFAULT 0,
+    paid DECIMAL NOT NULL DEFAULT 0,
+    balance DECIMAL GENERATED ALWAYS AS (ROUND(total_amount - paid, 2)) STORED
+);
+CREATE INDEX IF NOT EXISTS idx_invoice_balances_due_date ON invoice_balances(due_date);
+
+CREATE TRIGGER IF NOT EXISTS invoices_balance_insert AFTER INSERT ON invoices
+BEGIN {REFRESH_INVOICE_BALANCE.format(invoice_id="NEW.id")} END;
+CREATE TRIGGER IF NOT EXISTS invoices_balance_update
+AFTER UPDATE OF customer_id, status, due_date, total_amount, created_at ON invoices
+BEGIN {REFRESH_INVOICE_BALANCE.format(invoice_id="NEW.id")} END;
+CREATE TRIGGER IF NOT EXISTS payments_balance_insert AFTER INSERT ON payments
+BEGIN {REFRESH_INVOICE_BALANCE.format(invoice_id="NEW.invoice_id")} END;
+CREATE TRIGGER IF NOT EXISTS payments_balance_delete AFTER DELETE ON payments
+BEGIN {REFRESH_INVOICE_BALANCE.format(invoice_id="OLD.invoice_id")} END;
+CREATE TRIGGER IF NOT EXISTS payments_balance_update AFTER UPDATE OF invoice_id, amount ON payments
+BEGIN {REFRESH_INVOICE_BALANCE.format(invoice_id="OLD.invoice_id")} {REFRESH_INVOICE_BALANCE.format(invoice_id="NEW.invoice_id")} END;
+"""
+
+# Customer activity kept up by triggers, mirrors database_summary_functions.sql
+# (SQLite's multi-argument MAX() is NULL if any argument is, unlike GREATEST())
+CUSTOMER_ACTIVITY_SELECT = """
+SELECT c.id, i.last_at, q.last_at, p.last_at,
+       NULLIF(MAX(COALESCE(i.last_at, ''), COALESCE(q.last_at, ''), COALESCE(p.last_at, '')), ''),
+       COALESCE(i.billed, 0), COALESCE(p.paid, 0)
+FROM customers c
+LEFT JOIN (
+    SELECT customer_id, MAX(created_at) AS last_at, SUM(CASE WHEN status <> 'draft' THEN total_amount END) AS billed
+    FROM invoices {where} GROUP BY customer_id
+) i ON i.customer_id = c.id
+LEFT JOIN (SELECT customer_id, MAX(created_at) AS last_at FROM quotes {where} GROUP BY customer_id) q ON q.customer_id = c.id
+LEFT JOIN (
+    SELECT customer_id, MAX(created_at) AS last_at, SUM(amount) AS paid FROM payments {where} GROUP BY customer_id
+) p ON p.customer_id = c.id
+"""
+
+CUSTOMER_ACTIVITY_COLUMNS = (
+    "customer_id, last_invoice_at, last_quote_at, last_payment_at, last_activity_at, lifetime_billed, lifetime_paid"
+)
+
+REFRESH_CUSTOMER_ACTIVITY = (
+    f"INSERT INTO customer_activity ({CUSTOMER_ACTIVITY_COLUMNS})"
+    + CUSTOMER_ACTIVITY_SELECT.replace("{where}", "WHERE customer_id = {customer_id}")
+    + " WHERE c.id = {customer_id}"
+    " ON CONFLICT (customer_id) DO UPDATE SET"
+    " last_invoice_at = excluded.last_invoice_at, last_quote_at = excluded.last_quote_at,"
+    " last_payment_at = excluded.last_payment_at, last_activity_at = excluded.last_activity_at,"
+    " lifetime_billed = excluded.lifetime_billed, lifetime_paid = excluded.lifetime_paid;"
+)
+
+
+def _activity_triggers(table: str, columns: str) -> str:
+    refresh_new = REFRESH_CUSTOMER_ACTIVITY.format(customer_id="NEW.customer_id")
+    refresh_old = REFRESH_CUSTOMER_ACTIVITY.format(customer_id="OLD.customer_id")
+    return f"""
+CREATE TRIGGER IF NOT EXISTS {table}_activity_insert AFTER INSERT ON {table} BEGIN {refresh_new} END;
+CREATE TRIGGER IF NOT EXISTS {table}_activity_delete AFTER DELETE ON {table} BEGIN {refresh_old} END;
+CREATE TRIGGER IF NOT EXISTS {table}_activity_update AFTER UPDATE OF {columns} ON {table}
+BEGIN {refresh_old} {refresh_new} END;"""
+
+
+ACTIVITY_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS customer_activity (
+    customer_id INTEGER PRIMARY KEY REFERENCES customers(id) ON DELETE CASCADE,
+    last_invoice_at TIMESTAMP,
+    last_quote_at TIMESTAMP,
+    last_payment_at TIMESTAMP,
+    last_activity_at TIMESTAMP,
+    lifetime_billed DECIMAL NOT NULL DEFAULT 0,
+    lifetime_paid DECIMAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_customer_activity_last_activity ON customer_activity(last_activity_at);
+CREATE INDEX IF NOT EXISTS idx_customer_activity_lifetime_billed ON customer_activity(lifetime_billed);
+
+CREATE TRIGGER IF NOT EXISTS customers_activity_insert AFTER INSERT ON customers
+BEGIN {REFRESH_CUSTOMER_ACTIVITY.format(customer_id="NEW.id")} END;
+{_activity_triggers("invoices", "customer_id, status, total_amount, created_at")}
+{_activity_triggers("quotes", "customer_id, created_at")}
+{_activity_triggers("payments", "customer_id, amount, created_at")}
+"""
+
+# Full-text search, mirrors the weighted *_search_vector() indexes of
+# database_summary_functions.sql: one contentless FTS5 table per entity whose
+# columns a-d carry the A-D weights, kept in step by triggers
+SEARCH_DOCUMENTS = {
+    "customers": (
+        "COALESCE({row}.name, '')",
+        "COALESCE({row}.email, '') || ' ' || COALESCE({row}.phone, '')",
+        "COALESCE({row}.city, '') || ' ' || COALESCE({row}.country, '') || ' ' || COALESCE({row}.tax_number, '')",
+        "COALESCE({row}.notes, '')",
+    ),
+    "invoices": (
+        "COALESCE({row}.invoice_number, '')",
+        "''",
+        "COALESCE({row}.status, '')",
+        "COALESCE({row}.notes, '') || ' ' || COALESCE({row}.terms, '')",
+    ),
+    "quotes": (
+        "COALESCE({row}.quote_number, '')",
+        "''",
+        "COALESCE({row}.status, '')",
+        "COALESCE({row}.notes, '') || ' ' || COALESCE({row}.terms, '')",
+    ),
+    "payments": (
+        "COALESCE({row}.reference_number, '')",
+        "COALESCE({row}.payment_method, '')",
+        "COALESCE({row}.status, '')",
+        "COALESCE({row}.notes, '')",
+    ),
+}
+
+
+def _search_document(table: str, row: str) -> str:
+    return ", ".join(expression.format(row=row) for expression in SEARCH_DOCUMENTS[table])
+
+
+def _search_schema() -> str:
+    statements = []
+    for table in SEARCH_DOCUMENTS:
+        index = f"{table}_search"
+        add = f"INSERT INTO {index} (rowid, a, b, c, d) VALUES (NEW.id, {_search_document(table, 'NEW')});"
+        remove = (
+            f"INSERT INTO {index} ({index}, rowid, a, b, c, d)"
+            f" VALUES ('delete', OLD.id, {_search_document(table, 'OLD')});"
+        )
+        statements.append(f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(a, b, c, d, content='');
+CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {add} END;
+CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {remove} END;
+CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN {remove} {add} END;""")
+    return "".join(statements)
+
+
+SEARCH_SCHEMA = _search_schema()
+
+COMPARISON_OPERATORS = {
+    "eq": "=",
+    "neq": "!=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+SINGLE_OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+
+
+class LocalDatabaseError(Exception):
+    """An error answered with PostgREST's JSON error shape"""
+    def __init__(self, status_code: int, message: str, code: str = "PGRST100", details: str = None, hint: str = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = {"message": message, "code": code, "details": details, "hint": hint}
+
+
+# name -> function(database, **params), the local equivalents of Postgres functions
+local_rpc_functions: Dict[str, Callable] = {}
+
+
+def local_rpc(name: str):
+    """Register the local implementation of a Postgres function called through .rpc()"""
+    def decorator(func: Callable) -> Callable:
+        local_rpc_functions[name] = func
+        return func
+    return decorator
+
+
+def now_iso() -> str:
+    return datetime.now().isoformat()
+
+
+def _like_to_regex(pattern: str, flags: int = 0) -> "re.Pattern":
+    regex = "".join(
+        ".*" if char in "%*" else "." if char == "_" else re.escape(char)
+        for char in pattern
+    )
+    return re.compile(f"^{regex}$", flags | re.DOTALL)
+
+
+def _sql_like(value, pattern) -> int:
+    if value is None or pattern is None:
+        return 0
+    return int(bool(_like_to_regex(pattern).match(str(value))))
+
+
+def _sql_ilike(value, pattern) -> int:
+    if value is None or pattern is None:
+        return 0
+    return int(bool(_like_to_regex(pattern, re.IGNORECASE).match(str(value))))
+
+
+def _sql_fts(value, query) -> int:
+    """Every search term appears in the text (to_tsvector @@ plainto_tsquery, roughly)"""
+    if value is None or not query:
+        return 0
+    words = set(re.findall(r"\w+", str(value).lower()))
+    terms = re.findall(r"\w+", str(query).lower())
+    return int(all(any(word.startswith(term) for word in words) for term in terms))
+
+
+def split_top_level(text: str, separator: str = ",") -> List[str]:
+    """Split on separators that are not inside parentheses or double quotes"""
+    parts, current, depth, quoted = [], [], 0, False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == separator and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current or parts:
+        parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_list(value: str) -> List[str]:
+    """Parse PostgREST's ``(a,b,"c,d")`` list syntax"""
+    value = value.strip()
+    if value.startswith("(") and value.endswith(")"):
+        value = value[1:-1]
+    return [item[1:-1] if item.startswith('"') and item.endswith('"') else item
+            for item in split_top_level(value)]
+
+
+def parse_select(select: str) -> List[dict]:
+    """Parse a select parameter into columns and embedded resources"""
+    items = []
+    for part in split_top_level(select or "*"):
+        alias = None
+        match = re.match(r'^([A-Za-z_][\w]*):(.*)$', part)
+        if match and not part.startswith("*"):
+            alias, part = match.group(1), match.group(2)
+
+        if "(" in part and part.endswith(")"):
+            name, _, inner = part.partition("(")
+            name, _, hint = name.partition("!")
+            items.append({
+                "type": "embed",
+                "name": name.strip(),
+                "alias": alias or name.strip(),
+                "inner": hint.strip() == "inner",
+                "items": parse_select(inner[:-1])
+            })
+        elif part == "*":
+            items.append({"type": "star"})
+        else:
+            column = part.split("::")[0].strip()
+            items.append({"type": "column", "name": column, "alias": alias or column})
+    return items
+
+
+class LocalDatabase:
+    """SQLite database that executes PostgREST requests"""
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.create_function("pg_like", 2, _sql_like, deterministic=True)
+        self.conn.create_function("pg_ilike", 2, _sql_ilike, deterministic=True)
+        self.conn.create_function("pg_fts", 2, _sql_fts, deterministic=True)
+        self.conn.executescript(SCHEMA)
+        self.conn.executescript(ROLLUP_SCHEMA)
+        self.conn.executescript(BALANCE_SCHEMA)
+        self.conn.executescript(ACTIVITY_SCHEMA)
+        self.conn.executescript(SEARCH_SCHEMA)
+        self._index_existing_rows()
+        self._load_catalog()
+
+    def _index_existing_rows(self):
+        """Fill search tables created over a database file that already had rows"""
+        with self.conn:
+            for table in SEARCH_DOCUMENTS:
+                if self.conn.execute(f"SELECT COUNT(*) FROM {table}_search").fetchone()[0] == 0:
+                    self.conn.execute(
+                        f"INSERT INTO {table}_search (rowid, a, b, c, d)"
+                        f" SELECT t.id, {_search_document(table, 't')} FROM {table} t"
+                    )
+
+    def _load_catalog(self):
+        """Read column types, primary keys and foreign keys of every table"""
+        self.columns: Dict[str, Dict[str, str]] = {}
+        self.primary_keys: Dict[str, str] = {}
+        self.foreign_keys: List[Tuple[str, str, str, str]] = []
+
+        tables = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+        for (table,) in tables:
+            # table_xinfo also lists generated columns
+            info = self.conn.execute(f'PRAGMA table_xinfo("{table}")').fetchall()
+            self.columns[table] = {row["name"]: (row["type"] or "").upper() for row in info}
+            for row in info:
+                if row["pk"]:
+                    self.primary_keys[table] = row["name"]
+            for fk in self.conn.execute(f'PRAGMA foreign_key_list("{table}")').fetchall():
+                self.foreign_keys.append((table, fk["from"], fk["table"], fk["to"] or "id"))
+
+    # Request handling
+
+    def handle(self, method: str, path: str, params: List[Tuple[str, str]], headers: httpx.Headers,
+               body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Execute one PostgREST request, returns (status, headers, body)"""
+        try:
+            with self.lock, self.conn:
+                return self._dispatch(method, path.strip("/"), params, headers, body)
+        except LocalDatabaseError as e:
+            return e.status_code, {"content-type": "application/json"}, json.dumps(e.body).encode()
+        except sqlite3.IntegrityError as e:
+            code = "23503" if "FOREIGN KEY" in str(e) else "23505" if "UNIQUE" in str(e) else "23502"
+            error = {"message": str(e), "code": code, "details": None, "hint": None}
+            return 409, {"content-type": "application/json"}, json.dumps(error).encode()
+        except sqlite3.Error as e:
+            error = {"message": str(e), "code": "42000", "details": None, "hint": None}
+            return 400, {"content-type": "application/json"}, json.dumps(error).encode()
+
+    def _dispatch(self, method, path, params, headers, body):
+        prefer = {}
+        for preference in headers.get("prefer", "").split(","):
+            key, _, value = preference.strip().partition("=")
+            if key:
+                prefer[key] = value
+        payload = json.loads(body) if body else None
+
+        if path.startswith("rpc/"):
+            result = self.call_function(path[len("rpc/"):], payload or {})
+            return 200, {"content-type": "application/json"}, json.dumps(result, default=str).encode()
+
+        table = path
+        if table not in self.columns:
+            raise LocalDatabaseError(404, f'relation "public.{table}" does not exist', "42P01")
+
+        query = dict(params)
+        count = None
+        status = 200
+
+        if method == "HEAD":
+            # Only the count goes back, so no rows are read
+            rows, count = [], self.count(table, params) if "count" in prefer else None
+        elif method == "GET":
+            rows, count = self.select(table, params, count_rows="count" in prefer)
+        elif method == "POST":
+            rows = self.insert(table, payload, prefer, query.get("on_conflict"))
+            status = 201
+        elif method == "PATCH":
+            rows = self.update(table, payload or {}, params)
+        elif method == "DELETE":
+            rows = self.delete(table, params)
+        else:
+            raise LocalDatabaseError(405, f"Unsupported method {method}", "PGRST117")
+
+        if method not in ("GET", "HEAD"):
+            if prefer.get("return") == "minimal":
+                return 204 if method != "POST" else 201, {}, b""
+            rows = self.project(table, rows, parse_select(query.get("select", "*")))
+            if "count" in prefer:
+                count = len(rows)
+
+        start = int(query.get("offset", 0) or 0)
+        response_headers = {
+            "content-type": "application/json",
+            "content-range": (f"{start}-{start + len(rows) - 1}" if rows else "*") + f"/{'*' if count is None else count}"
+        }
+
+        if SINGLE_OBJECT_MEDIA_TYPE in headers.get("accept", ""):
+            if len(rows) != 1:
+                raise LocalDatabaseError(
+                    406, "JSON object requested, multiple (or no) rows returned", "PGRST116",
+                    f"The result contains {len(rows)} rows"
+                )
+            return status, response_headers, json.dumps(rows[0], default=str).encode()
+
+        if method == "HEAD":
+            return status, response_headers, b""
+        return status, response_headers, json.dumps(rows, default=str).encode()
+
+    # Operations
+
+    def select(self, table: str, params: List[Tuple[str, str]], count_rows: bool = False) -> Tuple[List[dict], Optional[int]]:
+        query = dict(params)
+        where, args = self.where_clause(table, params)
+
+        count = self.count(table, params) if count_rows else None
+
+        sql = f'SELECT * FROM "{table}"{where}{self.order_clause(table, query.get("order"))}'
+        if query.get("limit") is not None or query.get("offset") is not None:
+            sql += " LIMIT ? OFFSET ?"
+            args = args + [int(query.get("limit", -1)), int(query.get("offset", 0))]
+
+        rows = [self.decode_row(table, row) for row in self.conn.execute(sql, args).fetchall()]
+        return self.project(table, rows, parse_select(query.get("select", "*"))), count
+
+    def count(self, table: str, params: List[Tuple[str, str]]) -> int:
+        where, args = self.where_clause(table, params)
+        return self.conn.execute(f'SELECT COUNT(*) FROM "{table}"{where}', args).fetchone()[0]
+
+    def insert(self, table: str, payload, prefer: dict, on_conflict: str = None) -> List[dict]:
+        records = payload if isinstance(payload, list) else [payload or {}]
+        resolution = prefer.get("resolution")
+        inserted = []
+
+        for record in records:
+            values = self.encode_record(table, record)
+            primary_key = self.primary_keys.get(table)
+            if primary_key and values.get(primary_key) is None and self.columns[table][primary_key] == "TEXT":
+                values[primary_key] = str(uuid.uuid4())
+            for column in ("created_at", "updated_at"):
+                if column in self.columns[table] and values.get(column) is None:
+                    values[column] = now_iso()
+
+            columns = ", ".join(f'"{column}"' for column in values)
+            placeholders = ", ".join("?" for _ in values)
+            sql = f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})'
+
+            if resolution in ("merge-duplicates", "ignore-duplicates"):
+                conflict = ", ".join(f'"{self.check_column(table, c.strip())}"' for c in (on_conflict or primary_key).split(","))
+                if resolution == "ignore-duplicates":
+                    sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+                else:
+                    updates = ", ".join(f'"{column}" = excluded."{column}"' for column in values)
+                    sql += f" ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+
+            row = self.conn.execute(sql + " RETURNING *", list(values.values())).fetchone()
+            if row is not None:
+                inserted.append(self.decode_row(table, row))
+        return inserted
+
+    def update(self, table: str, payload: dict, params: List[Tuple[str, str]]) -> List[dict]:
+        values = self.encode_record(table, payload)
+        if "updated_at" in self.columns[table] and "updated_at" not in values:
+            values["updated_at"] = now_iso()
+        if not values:
+            return []
+
+        where, args = self.where_clause(table, params)
+        assignments = ", ".join(f'"{column}" = ?' for column in values)
+        rows = self.conn.execute(
+            f'UPDATE "{table}" SET {assignments}{where} RETURNING *', list(values.values()) + args
+        ).fetchall()
+        return [self.decode_row(table, row) for row in rows]
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[dict]:
+        where, args = self.where_clause(table, params)
+        rows = self.conn.execute(f'DELETE FROM "{table}"{where} RETURNING *', args).fetchall()
+        return [self.decode_row(table, row) for row in rows]
+
+    def call_function(self, name: str, params: dict):
+        func = local_rpc_functions.get(name)
+        if func is None:
+            raise LocalDatabaseError(
+                404, f"Could not find the function public.{name} in the schema cache", "PGRST202"
+            )
+        return func(self, **params)
+
+    # SQL building
+
+    def check_column(self, table: str, column: str) -> str:
+        if column not in self.columns[table]:
+            raise LocalDatabaseError(400, f"column {table}.{column} does not exist", "42703")
+        return column
+
+    def where_clause(self, table: str, params: List[Tuple[str, str]]) -> Tuple[str, list]:
+        conditions, args = [], []
+        for key, value in params:
+            if key in ("select", "order", "limit", "offset", "on_conflict", "columns"):
+                continue
+            if key in ("or", "and", "not.or", "not.and"):
+                sql, condition_args = self.logic_condition(table, key, value)
+            elif "." in key:
+                # Filters on embedded resources (customers.name=...) are not supported
+                continue
+            else:
+                sql, condition_args = self.condition(table, key, value)
+            conditions.append(sql)
+            args.extend(condition_args)
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", args
+
+    def logic_condition(self, table: str, operator: str, expression: str) -> Tuple[str, list]:
+        negate = operator.startswith("not.")
+        joiner = " OR " if operator.endswith("or") else " AND "
+        expression = expression.strip()
+        if expression.startswith("(") and expression.endswith(")"):
+            expression = expression[1:-1]
+
+        parts, args = [], []
+        for part in split_top_level(expression):
+            match = re.match(r"^(not\.)?(and|or)\((.*)\)$", part, re.DOTALL)
+            if match:
+                sql, part_args = self.logic_condition(table, f"{match.group(1) or ''}{match.group(2)}", f"({match.group(3)})")
+            else:
+                column, _, filter_expression = part.partition(".")
+                sql, part_args = self.condition(table, column, filter_expression, quoted_values=True)
+            parts.append(sql)
+            args.extend(part_args)
+
+        sql = "(" + joiner.join(parts) + ")" if parts else "1"
+        return (f"NOT {sql}" if negate else sql), args
+
+    def condition(self, table: str, column: str, expression: str, quoted_values: bool = False) -> Tuple[str, list]:
+        column_sql = f'"{self.check_column(table, column)}"'
+        negate = expression.startswith("not.")
+        if negate:
+            expression = expression[len("not."):]
+        operator, _, value = expression.partition(".")
+        operator = operator.split("(")[0]
+        if quoted_values and len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+            # Values with reserved characters are double quoted inside or/and groups
+            value = value[1:-1]
+
+        if operator in COMPARISON_OPERATORS:
+            sql, args = f"{column_sql} {COMPARISON_OPERATORS[operator]} ?", [self.filter_value(table, column, value)]
+        elif operator in ("like", "ilike"):
+            sql, args = f"pg_{operator}({column_sql}, ?)", [value]
+        elif operator == "is":
+            checks = {"null": "IS NULL", "true": "= 1", "false": "= 0", "unknown": "IS NULL"}
+            if value.lower() not in checks:
+                raise LocalDatabaseError(400, f'failed to parse filter (is.{value})', "PGRST100")
+            sql, args = f"{column_sql} {checks[value.lower()]}", []
+        elif operator == "in":
+            values = [self.filter_value(table, column, item) for item in parse_list(value)]
+            sql = f"{column_sql} IN ({', '.join('?' for _ in values)})" if values else "0"
+            args = values
+        elif operator in ("fts", "plfts", "phfts", "wfts"):
+            sql, args = f"pg_fts({column_sql}, ?)", [value]
+        else:
+            raise LocalDatabaseError(400, f'failed to parse filter ({operator}.{value})', "PGRST100")
+
+        return (f"NOT ({sql})" if negate else sql), args
+
+    def order_clause(self, table: str, order: Optional[str]) -> str:
+        if not order:
+            return ""
+        terms = []
+        for term in split_top_level(order):
+            column, *modifiers = term.split(".")
+            descending = "desc" in modifiers
+            nulls = "FIRST" if "nullsfirst" in modifiers else "LAST" if "nullslast" in modifiers else (
+                "FIRST" if descending else "LAST"
+            )
+            terms.append(f'"{self.check_column(table, column)}" {"DESC" if descending else "ASC"} NULLS {nulls}')
+        return " ORDER BY " + ", ".join(terms)
+
+    # Values
+
+    def filter_value(self, table: str, column: str, value: str):
+        if "BOOL" in self.columns[table].get(column, ""):
+            return {"true": 1, "false": 0}.get(value.lower(), value)
+        return value
+
+    def encode_record(self, table: str, record: dict) -> Dict[str, Any]:
+        values = {}
+        for column, value in record.items():
+            column_type = self.columns[table].get(self.check_column(table, column), "")
+            if value == "now()":
+                value = now_iso()
+            elif "JSON" in column_type and value is not None:
+                value = json.dumps(value, default=str)
+            elif isinstance(value, bool):
+                value = int(value)
+            values[column] = value
+        return values
+
+    def decode_row(self, table: str, row: sqlite3.Row) -> dict:
+        decoded = {}
+        column_types = self.columns[table]
+        for column in row.keys():
+            value = row[column]
+            column_type = column_types.get(column, "")
+            if value is not None and "BOOL" in column_type:
+                value = bool(value)
+            elif value is not None and "JSON" in column_type:
+                value = json.loads(value)
+            decoded[column] = value
+        return decoded
+
+    # Embedding
+
+    def project(self, table: str, rows: List[dict], items: List[dict]) -> List[dict]:
+        """Apply a parsed select list to full rows, resolving embedded resources"""
+        embeds = {}
+        for item in items:
+            if item["type"] == "embed":
+                embeds[item["alias"]] = (item, self.embed(table, rows, item))
+
+        projected = []
+        for row in rows:
+            output = {}
+            for item in items:
+                if item["type"] == "star":
+                    output.update(row)
+                elif item["type"] == "column":
+                    self.check_column(table, item["name"])
+                    output[item["alias"]] = row.get(item["name"])
+                else:
+                    item, related = embeds[item["alias"]]
+                    output[item["alias"]] = related(row)
+            if any(item["inner"] and not output.get(alias) for alias, (item, _) in embeds.items()):
+                continue
+            projected.append(output)
+        return projected
+
+    def embed(self, table: str, rows: List[dict], item: dict) -> Callable[[dict], Any]:
+        """Fetch an embedded resource for all rows at once, returns a per-row getter"""
+        related_table = item["name"]
+        if related_table not in self.columns:
+            raise LocalDatabaseError(
+                400, f"Could not find a relationship between '{table}' and '{related_table}' in the schema cache", "PGRST200"
+            )
+
+        # Many-to-one: invoices.customer_id -> customers.id
+        for source, column, target, target_column in self.foreign_keys:
+            if source == table and target == related_table:
+                keys = list({row[column] for row in rows if row.get(column) is not None})
+                related = self.fetch_related(related_table, target_column, keys, item["items"])
+                by_key = {str(related_row["__key__"]): related_row["__row__"] for related_row in related}
+                return lambda row: by_key.get(str(row.get(column)))
+
+        # One-to-many: customers.id <- invoices.customer_id
+        for source, column, target, target_column in self.foreign_keys:
+            if source == related_table and target == table:
+                keys = list({row[target_column] for row in rows if row.get(target_column) is not None})
+                related = self.fetch_related(related_table, column, keys, item["items"])
+                grouped: Dict[str, List[dict]] = {}
+                for related_row in related:
+                    grouped.setdefault(str(related_row["__key__"]), []).append(related_row["__row__"])
+                return lambda row: grouped.get(str(row.get(target_column)), [])
+
+        raise LocalDatabaseError(
+            400, f"Could not find a relationship between '{table}' and '{related_table}' in the schema cache", "PGRST200"
+        )
+
+    def fetch_related(self, table: str, column: str, keys: list, items: List[dict]) -> List[dict]:
+        if not keys:
+            return []
+        rows = [
+            self.decode_row(table, row) for row in self.conn.execute(
+                f'SELECT * FROM "{table}" WHERE "{column}" IN ({", ".join("?" for _ in keys)})', keys
+            ).fetchall()
+        ]
+        projected = self.project(table, rows, items)
+        return [{"__key__": row[column], "__row__": output} for row, output in zip(rows, projected)]
+
+
+# Local equivalents of database_summary_functions.sql
+
+@local_rpc("rebuild_daily_rollups")
+def rebuild_daily_rollups(database: LocalDatabase) -> List[dict]:
+    conn = database.conn
+    for rollup, (table, amount) in STATUS_ROLLUPS.items():
+        conn.execute(f"DELETE FROM {rollup}")
+        conn.execute(
+            f"INSERT INTO {rollup} (day, status, count, total)"
+            f" SELECT substr(created_at, 1, 10), COALESCE(status, 'draft'), COUNT(*), COALESCE(SUM({amount}), 0)"
+            f" FROM {table} GROUP BY 1, 2"
+        )
+    conn.execute("DELETE FROM customer_daily")
+    conn.execute(
+        "INSERT INTO customer_daily (day, count) SELECT substr(created_at, 1, 10), COUNT(*) FROM customers GROUP BY 1"
+    )
+    return [
+        {"rollup": rollup, "rows": conn.execute(f"SELECT COUNT(*) FROM {rollup}").fetchone()[0]}
+        for rollup in [*STATUS_ROLLUPS, "customer_daily"]
+    ]
+
+
+# created_at from since up to the end of its day, the part of the first day a rollup can't answer
+FIRST_DAY = "created_at >= ? AND created_at < date(?, '+1 day')"
+
+
+def _status_summary(database: LocalDatabase, rollup: str, since: str) -> List[dict]:
+    table, amount = STATUS_ROLLUPS[rollup]
+    rows = database.conn.execute(
+        "SELECT status, SUM(count) AS count, SUM(total) AS total FROM ("
+        f" SELECT status, count, total FROM {rollup} WHERE day > ?"
+        f" UNION ALL SELECT COALESCE(status, 'draft'), COUNT(*), COALESCE(SUM({amount}), 0)"
+        f" FROM {table} WHERE {FIRST_DAY} GROUP BY 1"
+        ") GROUP BY status",
+        (since[:10], since, since[:10])
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@local_rpc("invoice_status_summary")
+def invoice_status_summary(database: LocalDatabase, since: str) -> List[dict]:
+    return _status_summary(database, "invoice_daily", since)
+
+
+@local_rpc("quote_status_summary")
+def quote_status_summary(database: LocalDatabase, since: str) -> List[dict]:
+    return _status_summary(database, "quote_daily", since)
+
+
+@local_rpc("payment_summary")
+def payment_summary(database: LocalDatabase, since: str) -> List[dict]:
+    row = database.conn.execute(
+        "SELECT COALESCE(SUM(count), 0) AS count, COALESCE(SUM(total), 0) AS total FROM ("
+        " SELECT count, total FROM payment_daily WHERE day > ?"
+        f" UNION ALL SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM payments WHERE {FIRST_DAY})",
+        (since[:10], since, since[:10])
+    ).fetchone()
+    return [dict(row)]
+
+
+@local_rpc("customer_summary")
+def customer_summary(database: LocalDatabase, since: str) -> List[dict]:
+    row = database.conn.execute(
+        "SELECT COALESCE(SUM(count), 0) AS total,"
+        " COALESCE(SUM(CASE WHEN day > ? THEN count END), 0)"
+        f" + (SELECT COUNT(*) FROM customers WHERE {FIRST_DAY}) AS new,"
+        " (SELECT COUNT(*) FROM customer_activity WHERE last_activity_at >= ?) AS active"
+        " FROM customer_daily", (since[:10], since, since[:10], since)
+    ).fetchone()
+    return [dict(row)]
+
+
+@local_rpc("rebuild_invoice_balances")
+def rebuild_invoice_balances(database: LocalDatabase) -> List[dict]:
+    conn = database.conn
+    conn.execute("DELETE FROM invoice_balances")
+    conn.execute(
+        "INSERT INTO invoice_balances (invoice_id, customer_id, status, due_date, created_at, total_amount, paid)"
+        " SELECT i.id, i.customer_id, i.status, i.due_date, i.created_at, COALESCE(i.total_amount, 0), COALESCE(p.paid, 0)"
+        " FROM invoices i LEFT JOIN (SELECT invoice_id, SUM(amount) AS paid FROM payments GROUP BY invoice_id) p"
+        " ON p.invoice_id = i.id"
+    )
+    return [{"rollup": "invoice_balances", "rows": conn.execute("SELECT COUNT(*) FROM invoice_balances").fetchone()[0]}]
+
+
+@local_rpc("receivable_summary")
+def receivable_summary(database: LocalDatabase, since: str) -> List[dict]:
+    row = database.conn.execute(
+        "SELECT COUNT(*) AS count, COALESCE(SUM(balance), 0) AS total FROM invoice_balances"
+        " WHERE balance > 0 AND status NOT IN ('draft', 'paid') AND created_at >= ?", (since,)
+    ).fetchone()
+    return [dict(row)]
+
+
+@local_rpc("receivables_aging")
+def receivables_aging(database: LocalDatabase, as_of: str = None, aging_customer_id: int = None) -> List[dict]:
+    days = "(julianday(?) - julianday(due_date))"
+    sql = (
+        "SELECT b.customer_id, c.name AS customer_name, COUNT(*) AS invoices,"
+        f" COALESCE(SUM(CASE WHEN due_date IS NULL OR {days} <= 0 THEN balance END), 0) AS current,"
+        f" COALESCE(SUM(CASE WHEN {days} BETWEEN 1 AND 30 THEN balance END), 0) AS days_1_30,"
+        f" COALESCE(SUM(CASE WHEN {days} BETWEEN 31 AND 60 THEN balance END), 0) AS days_31_60,"
+        f" COALESCE(SUM(CASE WHEN {days} BETWEEN 61 AND 90 THEN balance END), 0) AS days_61_90,"
+        f" COALESCE(SUM(CASE WHEN {days} > 90 THEN balance END), 0) AS days_over_90,"
+        " SUM(b.balance) AS total"
+        " FROM invoice_balances b LEFT JOIN customers c ON c.id = b.customer_id"
+        " WHERE balance > 0 AND status NOT IN ('draft', 'paid')"
+        " AND (b.created_at IS NULL OR substr(b.created_at, 1, 10) <= ?)"
+    )
+    as_of = (as_of or datetime.now().date().isoformat())[:10]
+    args = [as_of] * 6
+    if aging_customer_id is not None:
+        sql += " AND b.customer_id = ?"
+        args.append(aging_customer_id)
+    rows = database.conn.execute(sql + " GROUP BY b.customer_id, c.name", args).fetchall()
+    return [dict(row) for row in rows]
+
+
+@local_rpc("rebuild_customer_activity")
+def rebuild_customer_activity(database: LocalDatabase) -> List[dict]:
+    conn = database.conn
+    conn.execute("DELETE FROM customer_activity")
+    conn.execute(
+        f"INSERT INTO customer_activity ({CUSTOMER_ACTIVITY_COLUMNS})" + CUSTOMER_ACTIVITY_SELECT.replace("{where}", "")
+    )
+    return [{"rollup": "customer_activity", "rows": conn.execute("SELECT COUNT(*) FROM customer_activity").fetchone()[0]}]
+
+
+# title, detail, status, amount, customer_id and customer_name of a hit, like search_<table>()
+SEARCH_HITS = {
+    "customers": (
+        "t.name, substr(COALESCE(' · ' || t.email, '') || COALESCE(' · ' || t.phone, '')"
+        " || COALESCE(' · ' || t.city, ''), 4), NULL, NULL, t.id, t.name"
+    ),
+    "invoices": "t.invoice_number, t.notes, t.status, t.total_amount, t.customer_id, c.name",
+    "quotes": "t.quote_number, t.notes, t.status, t.total_amount, t.customer_id, c.name",
+    "payments": "COALESCE(t.reference_number, t.payment_method), t.notes, t.status, t.amount, t.customer_id, c.name",
+}
+
+
+def _fts5_query(query: str) -> str:
+    """'inv:* & 2024:*' (to_tsquery prefix terms) as an FTS5 query"""
+    terms = re.findall(r"(\w+):\*", query or "")
+    if not terms:
+        raise LocalDatabaseError(400, f"syntax error in tsquery: \"{query}\"", "42601")
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+def _search(database: LocalDatabase, table: str, query: str, max_results: int, skip: int) -> List[dict]:
+    join = "" if table == "customers" else " LEFT JOIN customers c ON c.id = t.customer_id"
+    rows = database.conn.execute(
+        # bm25() only works in the plain FTS5 query, so matches are ranked before the window count
+        f"WITH matches AS MATERIALIZED ("
+        f"SELECT rowid, -bm25({table}_search, 1.0, 0.4, 0.2, 0.1) AS rank FROM {table}_search WHERE {table}_search MATCH ?)"
+        f" SELECT t.id, {SEARCH_HITS[table]}, t.created_at, m.rank, COUNT(*) OVER () AS total"
+        f" FROM matches m JOIN {table} t ON t.id = m.rowid{join}"
+        f" ORDER BY m.rank DESC, t.id DESC LIMIT ? OFFSET ?",
+        (_fts5_query(query), max_results, skip)
+    ).fetchall()
+    columns = ["id", "title", "detail", "status", "amount", "customer_id", "customer_name", "created_at", "rank", "total"]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+@local_rpc("search_customers")
+def search_customers(database: LocalDatabase, query: str, max_results: int = 10, skip: int = 0) -> List[dict]:
+    return _search(database, "customers", query, max_results, skip)
+
+
+@local_rpc("search_invoices")
+def search_invoices(database: LocalDatabase, query: str, max_results: int = 10, skip: int = 0) -> List[dict]:
+    return _search(database, "invoices", query, max_results, skip)
+
+
+@local_rpc("search_quotes")
+def search_quotes(database: LocalDatabase, query: str, max_results: int = 10, skip: int = 0) -> List[dict]:
+    return _search(database, "quotes", query, max_results, skip)
+
+
+@local_rpc("search_payments")
+def search_payments(database: LocalDatabase, query: str, max_results: int = 10, skip: int = 0) -> List[dict]:
+    return _search(database, "payments", query, max_results, skip)
+
+
+# SQLite expressions truncating a day to the start of its bucket, like date_trunc()
+PERIOD_START = {
+    "day": "day",
+    "week": "date(day, '-' || ((CAST(strftime('%w', day) AS INTEGER) + 6) % 7) || ' days')",
+    "month": "substr(day, 1, 7) || '-01'",
+}
+
+
+@local_rpc("rollup_timeseries")
+def rollup_timeseries(database: LocalDatabase, rollup: str, since: str, until: str, granularity: str,
+                      status_filter: str = None) -> List[dict]:
+    if rollup not in STATUS_ROLLUPS and rollup != "customer_daily":
+        raise LocalDatabaseError(400, f"Unknown rollup {rollup}", "P0001")
+    if granularity not in PERIOD_START:
+        raise LocalDatabaseError(400, f"Unknown granularity {granularity}", "P0001")
+    total = "0" if rollup == "customer_daily" else "SUM(total)"
+    sql = (
+        f"SELECT {PERIOD_START[granularity]} AS period, SUM(count) AS count, {total} AS total"
+        f" FROM {rollup} WHERE day BETWEEN ? AND ?"
+    )
+    args = [since[:10], until[:10]]
+    if status_filter and rollup != "customer_daily":
+        sql += " AND status = ?"
+        args.append(status_filter)
+    rows = database.conn.execute(sql + " GROUP BY 1 ORDER BY 1", args).fetchall()
+    return [dict(row) for row in rows]
+
+
+class LocalPostgrestTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers PostgREST requests from a LocalDatabase"""
+    def __init__(self, database: LocalDatabase):
+        self.database = database
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        latency = settings.LOCAL_DB_LATENCY_MS + random.uniform(0, settings.LOCAL_DB_LATENCY_JITTER_MS)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+        path = request.url.path
+        if path.startswith("/rest/v1"):
+            path = path[len("/rest/v1"):]
+        body = await request.aread()
+
+        # SQLite work runs off the event loop, like a round trip to a real database
+        status, headers, content = await asyncio.to_thread(
+            self.database.handle, request.method, path, list(request.url.params.multi_items()), request.headers, body
+        )
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "path": self.database.path,
+            "latency_ms": settings.LOCAL_DB_LATENCY_MS,
+            "latency_jitter_ms": settings.LOCAL_DB_LATENCY_JITTER_MS,
+            "requests": self.requests
+        }
+
+
+def seed_local_database(database: LocalDatabase, customers: int, seed: int = 42):
+    """Fill the local database with realistic-looking data for benchmarking"""
+    from app.core.security import get_password_hash
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    cities = ["New York", "Chicago", "Austin", "Denver", "Seattle", "Boston", "Miami", "Portland"]
+    first_names = ["John", "Jane", "Bob", "Alice", "Maria", "Lester", "Sheila", "Omar", "Priya", "Chen"]
+    last_names = ["Doe", "Smith", "Johnson", "Sible", "Chambers", "Garcia", "Nguyen", "Patel", "Okafor"]
+    invoice_statuses = ["draft", "pending", "sent", "paid", "overdue", "partially"]
+    quote_statuses = ["draft", "pending", "sent", "accepted", "declined", "expired"]
+    methods = ["Cash", "Credit Card", "Bank Transfer", "Check"]
+
+    def timestamp(days_ago: float) -> str:
+        return (now - timedelta(days=days_ago)).isoformat()
+
+    def items(count: int) -> Tuple[list, float]:
+        lines = []
+        for index in range(count):
+            quantity = rng.randint(1, 10)
+            unit_price = round(rng.uniform(5, 500), 2)
+            lines.append({
+                "name": f"Item {index + 1}",
+                "description": "Professional services",
+                "quantity": quantity,
+                "unit_price": unit_price,
+                "total_price": round(quantity * unit_price, 2)
+            })
+        return lines, round(sum(line["total_price"] for line in lines), 2)
+
+    with database.lock, database.conn:
+        conn = database.conn
+        admin_id = str(uuid.uuid4())
+        conn.execute(
+            "INSERT OR IGNORE INTO users (id, email, full_name, hashed_password, is_active, is_superuser, role, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, 1, 'admin', 'admin', ?, ?)",
+            (admin_id, "admin@admin.com", "Admin User", get_password_hash("admin123"), now_iso(), now_iso())
+        )
+        admin_id = conn.execute("SELECT id FROM users WHERE email = 'admin@admin.com'").fetchone()[0]
+
+        for _ in range(customers):
+            first, last = rng.choice(first_names), rng.choice(last_names)
+            created = timestamp(rng.uniform(0, 730))
+            customer_id = conn.execute(
+                "INSERT INTO customers (name, email, phone, city, country, created_by, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, 'USA', ?, ?, ?)",
+                (f"{first} {last}", f"{first}.{last}{rng.randint(1, 99999)}@example.com".lower(),
+                 f"+1{rng.randint(2000000000, 9999999999)}", rng.choice(cities), admin_id, created, created)
+            ).lastrowid
+
+            for _ in range(2):
+                lines, total = items(rng.randint(1, 5))
+                days_ago = rng.uniform(0, 730)
+                conn.execute(
+                    "INSERT INTO quotes (customer_id, quote_number, issue_date, expiry_date, total_amount, tax_amount,"
+                    " items, notes, status, created_by, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (customer_id, f"Q-{rng.randint(1000, 99999)}", timestamp(days_ago)[:10], timestamp(days_ago - 30)[:10],
+                     total, round(total * 0.1, 2), json.dumps(lines), "Quote for services",
+                     rng.choice(quote_statuses), admin_id, timestamp(days_ago), timestamp(days_ago))
+                )
+
+            for _ in range(3):
+                lines, total = items(rng.randint(1, 8))
+                days_ago = rng.uniform(0, 730)
+                status = rng.choice(invoice_statuses)
+                invoice_id = conn.execute(
+                    "INSERT INTO invoices (customer_id, invoice_number, issue_date, due_date, total_amount, tax_amount,"
+                    " items, notes, terms, status, created_by, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (customer_id, f"INV-{rng.randint(1000, 99999)}", timestamp(days_ago)[:10], timestamp(days_ago - 30)[:10],
+                     total, round(total * 0.1, 2), json.dumps(lines), "Invoice for services", "Net 30",
+                     status, admin_id, timestamp(days_ago), timestamp(days_ago))
+                ).lastrowid
+
+                if status in ("paid", "partially"):
+                    amount = total if status == "paid" else round(total * rng.uniform(0.2, 0.8), 2)
+                    paid_days_ago = max(days_ago - rng.uniform(0, 30), 0)
+                    conn.execute(
+                        "INSERT INTO payments (customer_id, invoice_id, amount, payment_method, payment_date,"
+                        " reference_number, status, created_by, created_at, updated_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, 'completed', ?, ?, ?)",
+                        (customer_id, invoice_id, amount, rng.choice(methods), timestamp(paid_days_ago)[:10],
+                         f"REF-{rng.randint(100000, 999999)}", admin_id, timestamp(paid_days_ago), timestamp(paid_days_ago))
+                    )
@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination on (created_at, id).
+
+List endpoints return newest rows first. Passing the ``X-Next-Cursor`` header
+of one page back as ``?cursor=`` fetches the next page with an index range
+scan, so every page costs the same however deep it is and rows inserted in
+the meantime don't shift pages. ``skip``/``limit`` keep working for clients
+that page by offset.
+
+Passing ``?total=exact`` (or ``planned``/``estimated`` on huge tables) also
+returns the number of matching rows in ``X-Total-Count``, counted by a HEAD
+request that runs alongside the page query.
+"""
+import asyncio
+import base64
+import json
+from typing import List, Optional
+
+from fastapi import Response
+
+from app.core.database import DatabaseClient
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+# Query(pattern=...) of the ?total= parameter
+TOTAL_MODE_PATTERN = "^(exact|planned|estimated)$"
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque cursor pointing just after a row"""
+    payload = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created_at, id) of a cursor, raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(row_id, (int, str)):
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def paginate(query, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Order a query newest first and apply the cursor, or skip/limit without one"""
+    query = query.order('created_at', desc=True).order('id', desc=True)
+    if not cursor:
+        return query.range(skip, skip + limit - 1)
+
+    created_at, row_id = decode_cursor(cursor)
+    row_id = json.dumps(row_id) if isinstance(row_id, str) else row_id
+    return query.or_(
+        f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+    ).limit(limit)
+
+
+def next_cursor(rows: List[dict], limit: int) -> Optional[str]:
+    """Cursor of the page after these rows, None on the last page"""
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1])
+
+
+def set_next_cursor(response: Response, rows: List[dict], limit: int):
+    """Expose the next page's cursor in the X-Next-Cursor header"""
+    cursor = next_cursor(rows, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+async def execute_paginated(supabase: DatabaseClient, table: str, query, response: Response, skip: int = 0,
+                            limit: int = 100, cursor: Optional[str] = None, total: Optional[str] = None):
+    """Execute one page of a query and set its X-Next-Cursor (and X-Total-Count) headers"""
+    filters = query.params
+    page_query = paginate(query, skip, limit, cursor)
+    if total:
+        result, count = await asyncio.gather(page_query.execute(), supabase.count(table, filters, total))
+        if count is not None:
+            response.headers[TOTAL_COUNT_HEADER] = str(count)
+    else:
+        result = await page_query.execute()
+    set_next_cursor(response, result.data, limit)
+    return result
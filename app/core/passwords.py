@@ -0,0 +1,85 @@
+"""
+Password hashing off the event loop.
+
+A bcrypt hash or verify costs a few hundred milliseconds of CPU. Run inline in
+an async handler it stalls every other request on the worker, so login and
+register hand it to a small dedicated thread pool instead (bcrypt releases the
+GIL while it works). At most PASSWORD_POOL_QUEUE operations may wait for a
+thread; beyond that ``PasswordPoolBusy`` is raised at once so a login burst
+gets fast 503s instead of an ever-growing backlog.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+
+class PasswordPoolBusy(Exception):
+    """Every password thread is busy and the wait queue is full"""
+
+
+class PasswordPool:
+    """Bounded thread pool for password hashing, with cost accounting"""
+    def __init__(self, workers: int, queue: int):
+        self.workers = workers
+        self.queue = queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_cost_ms = 0.0
+        self.max_cost_ms = 0.0
+        self.total_wait_ms = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    def _timed(self, submitted: float, work: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return work(*args)
+        finally:
+            finished = time.perf_counter()
+            cost_ms = (finished - started) * 1000
+            self.completed += 1
+            self.total_cost_ms += cost_ms
+            self.max_cost_ms = max(self.max_cost_ms, cost_ms)
+            self.total_wait_ms += (started - submitted) * 1000
+
+    async def run(self, work: Callable, *args):
+        """Run work(*args) on a password thread, or raise PasswordPoolBusy"""
+        if self.in_flight >= self.workers + self.queue:
+            self.rejected += 1
+            raise PasswordPoolBusy("Too many password checks in progress")
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self._timed, time.perf_counter(), work, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "rounds": settings.BCRYPT_ROUNDS,
+            "workers": self.workers,
+            "queue": self.queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_cost_ms": round(self.total_cost_ms / self.completed, 1) if self.completed else None,
+            "max_cost_ms": round(self.max_cost_ms, 1),
+            "avg_wait_ms": round(self.total_wait_ms / self.completed, 1) if self.completed else None
+        }
+
+
+password_pool = PasswordPool(settings.PASSWORD_POOL_WORKERS, settings.PASSWORD_POOL_QUEUE)
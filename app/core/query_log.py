@@ -0,0 +1,214 @@
+"""
+Per-request accounting of database round trips.
+
+Every PostgREST call made by a DatabaseClient is recorded (table, operation,
+rows, bytes, wall time) in the log of the request that made it. When the
+response starts, the totals go out in a ``Server-Timing`` header:
+
+    Server-Timing: db;dur=41.7;desc="5 queries", app;dur=48.2
+
+and once the request is done the full log is handed to every registered
+sink (see ``add_query_sink``), e.g. the in-memory per-endpoint ``query_stats``.
+"""
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+class QueryLog:
+    """The database round trips made while handling one request"""
+    def __init__(self):
+        self.queries: List[dict] = []
+        self.started = time.perf_counter()
+
+    def record(self, table: str, operation: str, rows: int, size: int, duration_ms: float, status_code: int):
+        self.queries.append({
+            "table": table,
+            "operation": operation,
+            "rows": rows,
+            "bytes": size,
+            "duration_ms": round(duration_ms, 2),
+            "status_code": status_code
+        })
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_time_ms(self) -> float:
+        return sum(query["duration_ms"] for query in self.queries)
+
+    @property
+    def rows(self) -> int:
+        return sum(query["rows"] for query in self.queries)
+
+    @property
+    def bytes(self) -> int:
+        return sum(query["bytes"] for query in self.queries)
+
+    def server_timing(self) -> str:
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        return f'db;dur={self.db_time_ms:.1f};desc="{self.count} queries", app;dur={elapsed_ms:.1f}'
+
+
+_query_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+def get_query_log() -> Optional[QueryLog]:
+    """Log of the current request (None outside of a request)"""
+    return _query_log.get()
+
+
+# Operation of a PostgREST request by HTTP method
+OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def _rows_in_response(response: httpx.Response) -> int:
+    """Rows returned, from Content-Range ("0-24/*") when PostgREST sends it"""
+    # A count's Content-Range describes the rows counted, none are returned
+    if response.request.method == "HEAD":
+        return 0
+    content_range = response.headers.get("content-range", "")
+    returned = content_range.split("/")[0]
+    if "-" in returned:
+        first, _, last = returned.partition("-")
+        return int(last) - int(first) + 1
+    if returned == "*" or not response.content:
+        return 0
+    try:
+        data = response.json()
+    except ValueError:
+        return 0
+    return len(data) if isinstance(data, list) else 1
+
+
+async def on_request(request: httpx.Request):
+    """httpx request hook, stamps the start time"""
+    request.extensions["query_started"] = time.perf_counter()
+
+
+async def on_response(response: httpx.Response):
+    """httpx response hook, records the round trip in the current request's log"""
+    log = _query_log.get()
+    if log is None:
+        return
+
+    await response.aread()
+    request = response.request
+    path = request.url.path.split("/rest/v1/", 1)[-1]
+    if path.startswith("rpc/"):
+        table, operation = path[len("rpc/"):], "rpc"
+    else:
+        table, operation = path, OPERATIONS.get(request.method, request.method.lower())
+        if operation == "insert" and "resolution=" in request.headers.get("prefer", ""):
+            operation = "upsert"
+
+    started = request.extensions.get("query_started", time.perf_counter())
+    log.record(
+        table,
+        operation,
+        _rows_in_response(response),
+        len(response.content),
+        (time.perf_counter() - started) * 1000,
+        response.status_code
+    )
+
+
+# Sinks receive (method, endpoint, log) once a request is done
+_query_sinks: List[Callable[[str, str, QueryLog], None]] = []
+
+
+def add_query_sink(sink: Callable[[str, str, QueryLog], None]):
+    """Register a metrics sink for per-request query logs"""
+    _query_sinks.append(sink)
+
+
+class QueryStats:
+    """In-memory sink aggregating query logs per endpoint, to find hot paths"""
+    def __init__(self):
+        self.endpoints: Dict[str, dict] = {}
+
+    def __call__(self, method: str, endpoint: str, log: QueryLog):
+        stats = self.endpoints.setdefault(f"{method} {endpoint}", {
+            "requests": 0, "queries": 0, "rows": 0, "bytes": 0, "db_time_ms": 0.0, "max_queries": 0
+        })
+        stats["requests"] += 1
+        stats["queries"] += log.count
+        stats["rows"] += log.rows
+        stats["bytes"] += log.bytes
+        stats["db_time_ms"] = round(stats["db_time_ms"] + log.db_time_ms, 2)
+        stats["max_queries"] = max(stats["max_queries"], log.count)
+
+    def snapshot(self) -> List[dict]:
+        """Endpoints by total database time, with per-request averages"""
+        rows = []
+        for name, stats in self.endpoints.items():
+            requests = stats["requests"] or 1
+            rows.append({
+                "endpoint": name,
+                **stats,
+                "avg_queries": round(stats["queries"] / requests, 2),
+                "avg_db_time_ms": round(stats["db_time_ms"] / requests, 2),
+                "avg_bytes": stats["bytes"] // requests
+            })
+        return sorted(rows, key=lambda row: row["db_time_ms"], reverse=True)
+
+    def reset(self):
+        self.endpoints.clear()
+
+
+query_stats = QueryStats()
+add_query_sink(query_stats)
+
+
+def log_slow_requests(method: str, endpoint: str, log: QueryLog):
+    """Print requests whose database time exceeds QUERY_LOG_SLOW_MS"""
+    if settings.QUERY_LOG_SLOW_MS > 0 and log.db_time_ms >= settings.QUERY_LOG_SLOW_MS:
+        tables = ", ".join(f"{query['operation']} {query['table']}" for query in log.queries)
+        print(f"🐢 {method} {endpoint}: {log.count} queries, {log.db_time_ms:.1f}ms in database ({tables})")
+
+
+add_query_sink(log_slow_requests)
+
+
+# Stats key of requests no route matched
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+
+class QueryLogMiddleware:
+    """Gives every HTTP request a query log and reports it via Server-Timing"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_LOG_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = _query_log.set(log)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", log.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _query_log.reset(token)
+            endpoint = scope.get("endpoint")
+            # Not the path, or probing random URLs would add an entry per URL
+            name = getattr(endpoint, "__name__", None) or UNMATCHED_ENDPOINT
+            for sink in _query_sinks:
+                try:
+                    sink(scope.get("method", ""), name, log)
+                except Exception as e:
+                    print(f"⚠️  Query log sink failed: {e}")
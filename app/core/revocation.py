@@ -0,0 +1,104 @@
+"""
+Users whose signed claims can no longer be trusted.
+
+With ``AUTH_MODE=claims`` a token's ``sub``, ``role`` and ``is_superuser``
+are trusted until it expires, without reading ``users``. The only users that
+can make such a token wrong are the ones deactivated, or changed since the
+oldest token still valid was minted, so this list keeps just those rows.
+It is reloaded in the background every AUTH_REVOCATION_REFRESH_INTERVAL
+seconds, and updated at once when this worker changes a user, so checking a
+token never waits for the database.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.database import get_supabase_service
+
+# Claims a changed user row must still agree with
+TRUSTED_CLAIMS = ("role", "is_superuser")
+
+REVOCATION_COLUMNS = "id, full_name, role, is_superuser, is_active, updated_at"
+
+
+class RevocationList:
+    """Deactivated and recently changed users, keyed by id"""
+    def __init__(self):
+        self._users: Dict[str, dict] = {}
+        # Users deleted by this worker, kept until their last token expired
+        self._deleted: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed_at: Optional[datetime] = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def record(self, user: dict):
+        """Apply a user row this worker just wrote, ahead of the next refresh"""
+        if user and user.get('id') is not None:
+            self._users[str(user['id'])] = user
+
+    def record_deleted(self, user_id: str):
+        """Revoke a deleted user's tokens; refreshes can't see the row anymore"""
+        self._deleted[str(user_id)] = datetime.utcnow()
+        self._users[str(user_id)] = {"id": str(user_id), "is_active": False}
+
+    def revoked(self, claims: dict) -> bool:
+        """Whether a token's claims disagree with what is known about its user"""
+        user = self._users.get(str(claims.get('sub')))
+        if user is None:
+            return False
+        if user.get('is_active') is False:
+            return True
+        return any(claims.get(claim) is not None and claims.get(claim) != user.get(claim)
+                   for claim in TRUSTED_CLAIMS)
+
+    def get(self, user_id: str) -> Optional[dict]:
+        return self._users.get(str(user_id))
+
+    async def refresh(self):
+        """Reload deactivated users and users changed within one token lifetime"""
+        supabase = get_supabase_service()
+        since = datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        inactive, changed = await asyncio.gather(
+            supabase.table('users').select(REVOCATION_COLUMNS).eq('is_active', False).execute(),
+            supabase.table('users').select(REVOCATION_COLUMNS).gte('updated_at', since.isoformat()).execute()
+        )
+        users = {str(user['id']): user for user in (inactive.data or []) + (changed.data or [])}
+        self._deleted = {user_id: deleted_at for user_id, deleted_at in self._deleted.items() if deleted_at >= since}
+        for user_id in self._deleted:
+            users[user_id] = {"id": user_id, "is_active": False}
+        self._users = users
+        self.refreshed_at = datetime.utcnow()
+        self.refreshes += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.AUTH_REVOCATION_REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep the last list, tokens stay checked against it until the next refresh
+                self.failures += 1
+                print(f"⚠️  Revocation list refresh failed: {e}")
+
+    async def start(self):
+        await self.refresh()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures
+        }
+
+
+revocation_list = RevocationList()
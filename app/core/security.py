@@ -5,15 +5,22 @@ from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
-from app.core.database import get_supabase
-from supabase import Client
+from app.core.cache import user_cache
+from app.core.revocation import revocation_list
+from app.core.passwords import password_pool, PasswordPoolBusy
+from app.core.database import get_supabase, DatabaseClient
+from app.core.dataloader import get_loaders
+from app.schemas.user import USER_COLUMNS
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # JWT token scheme
 security = HTTPBearer()
 
+# Claims AUTH_MODE=claims builds the user from, see issue_token()
+USER_CLAIMS = ("sub", "role", "is_superuser", "is_active")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -25,6 +32,28 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def run_password_work(work, *args):
+    """Run a password hash or check on the password pool, 503 when it is saturated"""
+    try:
+        return await password_pool.run(work, *args)
+    except PasswordPoolBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await run_password_work(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await run_password_work(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -47,9 +76,48 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
+async def load_user(supabase: DatabaseClient, user_id: str) -> Optional[dict]:
+    """Active user behind a token subject, from the user cache when it was seen recently"""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await get_loaders().loader(supabase, 'users', columns=USER_COLUMNS['auth']).load(user_id)
+        if not user:
+            return None
+        user_cache.set(user_id, user)
+    if user.get('is_active') is False:
+        return None
+    # Handlers may modify the user they are given, never the cached row
+    return dict(user)
+
+
+def user_from_claims(claims: dict) -> Optional[dict]:
+    """User described by a token's own claims, None if they are incomplete, inactive or revoked since"""
+    # Tokens minted without these (or by hand) must not default to a role or status
+    if any(claim not in claims for claim in USER_CLAIMS) or claims["is_active"] is not True:
+        return None
+    if revocation_list.revoked(claims):
+        return None
+    changed = revocation_list.get(claims["sub"]) or {}
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "full_name": changed.get("full_name", claims.get("full_name")),
+        "role": claims["role"],
+        "is_superuser": claims["is_superuser"],
+        "is_active": claims["is_active"]
+    }
+
+
+async def user_for_token(supabase: DatabaseClient, claims: dict) -> Optional[dict]:
+    """User a verified token belongs to, read from its claims or looked up per AUTH_MODE"""
+    if settings.AUTH_MODE == "claims":
+        return user_from_claims(claims)
+    return await load_user(supabase, claims["sub"])
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    supabase: Client = Depends(get_supabase)
+    supabase: DatabaseClient = Depends(get_supabase)
 ):
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -70,13 +138,12 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
+    # Get user from the token or the database
     try:
-        response = supabase.table('users').select('*').eq('id', user_id).execute()
-        if not response.data:
+        user = await user_for_token(supabase, payload)
+        if not user:
             raise credentials_exception
         
-        user = response.data[0]
         return user
         
     except Exception as e:
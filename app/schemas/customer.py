@@ -42,3 +42,13 @@ class Customer(CustomerBase):
 
     class Config:
         from_attributes = True
+
+
+# Columns to select per use, instead of select('*')
+CUSTOMER_COLUMNS = {
+    "name": "id, name",
+    "list": "id, name, email, phone, address, city, state, country, postal_code, tax_number, "
+            "created_by, created_at, updated_at",
+    "index": "id, name, email, phone, address, city, state, country, postal_code, created_at, updated_at",
+    "detail": "*",
+}
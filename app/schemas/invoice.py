@@ -54,3 +54,12 @@ class Invoice(InvoiceBase):
 
     class Config:
         from_attributes = True
+
+
+# Columns to select per use, instead of select('*') which also drags the
+# items JSON, notes and terms along
+INVOICE_COLUMNS = {
+    "list": "id, customer_id, quote_id, invoice_number, issue_date, due_date, total_amount, tax_amount, "
+            "discount_amount, status, created_by, created_at, updated_at",
+    "detail": "*",
+}
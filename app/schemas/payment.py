@@ -39,3 +39,11 @@ class Payment(PaymentBase):
 
     class Config:
         from_attributes = True
+
+
+# Columns to select per use, instead of select('*')
+PAYMENT_COLUMNS = {
+    "list": "id, customer_id, invoice_id, amount, payment_method, payment_date, reference_number, "
+            "status, created_by, created_at, updated_at",
+    "detail": "*",
+}
@@ -45,3 +45,12 @@ class Quote(QuoteBase):
 
     class Config:
         from_attributes = True
+
+
+# Columns to select per use, instead of select('*') which also drags the
+# items JSON, notes and terms along
+QUOTE_COLUMNS = {
+    "list": "id, customer_id, quote_number, issue_date, expiry_date, total_amount, tax_amount, "
+            "discount_amount, status, created_by, created_at, updated_at",
+    "detail": "*",
+}
@@ -31,3 +31,12 @@ class User(UserBase):
 
     class Config:
         from_attributes = True
+
+
+# Columns to select per use, only credentials ever loads the password hash
+USER_COLUMNS = {
+    # Everything /users/me returns, so it is served from the authenticated user
+    "auth": "id, email, full_name, role, is_superuser, is_active, created_at, updated_at",
+    "credentials": "id, email, full_name, hashed_password, role, is_superuser, is_active",
+    "detail": "id, email, full_name, role, is_superuser, is_active, created_at, updated_at",
+}
@@ -0,0 +1,50 @@
+"""
+Accounts-receivable aging.
+
+Balances are maintained per invoice by triggers (``invoice_balances`` in
+database_summary_functions.sql); the buckets depend on the reporting date so
+``receivables_aging`` sums the open balances into them, with customer names,
+in one grouped query.
+"""
+from datetime import date
+from typing import Optional
+
+from app.core.database import DatabaseClient
+
+# Days past due_date, in report order
+AGING_BUCKETS = ["current", "days_1_30", "days_31_60", "days_61_90", "days_over_90"]
+
+
+async def aging_report(supabase: DatabaseClient, as_of: Optional[date] = None,
+                       customer_id: Optional[int] = None) -> dict:
+    """Open balances bucketed by days past due, per customer (largest first) and overall"""
+    as_of = as_of or date.today()
+    response = await supabase.rpc('receivables_aging', {
+        'as_of': as_of.isoformat(),
+        'aging_customer_id': customer_id
+    }).execute()
+
+    per_customer = []
+    overall = {bucket: 0.0 for bucket in AGING_BUCKETS}
+    overall.update(total=0.0, invoices=0)
+    for row in response.data or []:
+        entry = {
+            "customer_id": row['customer_id'],
+            "customer_name": row.get('customer_name') or 'Unknown Client',
+            "invoices": int(row['invoices']),
+            "total": round(float(row['total'] or 0), 2)
+        }
+        for bucket in AGING_BUCKETS:
+            entry[bucket] = round(float(row[bucket] or 0), 2)
+            overall[bucket] += entry[bucket]
+        overall['total'] += entry['total']
+        overall['invoices'] += entry['invoices']
+        per_customer.append(entry)
+
+    per_customer.sort(key=lambda entry: entry['total'], reverse=True)
+    return {
+        "as_of": as_of.isoformat(),
+        "buckets": AGING_BUCKETS,
+        "overall": {key: round(value, 2) if isinstance(value, float) else value for key, value in overall.items()},
+        "customers": per_customer
+    }
@@ -0,0 +1,127 @@
+"""
+Time series of business metrics over arbitrary date ranges.
+
+Series are read from the daily rollups (see database_summary_functions.sql)
+by one grouped ``rollup_timeseries`` call per period, so a year of daily
+buckets costs a single round trip however large the base tables are.
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import List, Optional
+
+from app.core.database import DatabaseClient
+
+# metric -> rollup table it is read from
+METRICS = {
+    "invoiced": "invoice_daily",
+    "collected": "payment_daily",
+    "quoted": "quote_daily",
+    "new_customers": "customer_daily",
+}
+
+GRANULARITIES = ("day", "week", "month")
+
+# Longest series one request may ask for
+MAX_BUCKETS = 1000
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Start of the day, week (Monday) or month bucket containing a day"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def buckets(start: date, end: date, granularity: str) -> List[date]:
+    """Start of every bucket overlapping [start, end]"""
+    periods = []
+    period = period_start(start, granularity)
+    while period <= end:
+        periods.append(period)
+        if len(periods) > MAX_BUCKETS:
+            raise ValueError(f"Range too large: more than {MAX_BUCKETS} {granularity} buckets")
+        period = next_period(period, granularity)
+    return periods
+
+
+async def series(supabase: DatabaseClient, metric: str, start: date, end: date, granularity: str,
+                 status: Optional[str] = None) -> dict:
+    """Bucketed count and amount of a metric, with empty buckets as zeros"""
+    periods = buckets(start, end, granularity)
+    response = await supabase.rpc('rollup_timeseries', {
+        'rollup': METRICS[metric],
+        'since': start.isoformat(),
+        'until': end.isoformat(),
+        'granularity': granularity,
+        'status_filter': status
+    }).execute()
+    by_period = {str(row['period'])[:10]: row for row in response.data or []}
+
+    points = []
+    for period in periods:
+        row = by_period.get(period.isoformat(), {})
+        points.append({
+            "period": period.isoformat(),
+            "count": int(row.get('count') or 0),
+            "total": float(row.get('total') or 0)
+        })
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "series": points,
+        "count": sum(point['count'] for point in points),
+        "total": sum(point['total'] for point in points)
+    }
+
+
+def change(current: float, previous: float) -> Optional[float]:
+    """Percentage change, None when there is nothing to compare with"""
+    if not previous:
+        return None
+    return round((current - previous) / previous * 100, 1)
+
+
+async def timeseries(supabase: DatabaseClient, metric: str, start: date, end: date, granularity: str = "day",
+                     status: Optional[str] = None, compare: bool = False) -> dict:
+    """Series of a metric between two dates, optionally against the period just before"""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric}, expected one of {', '.join(METRICS)}")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity}, expected one of {', '.join(GRANULARITIES)}")
+    if end < start:
+        raise ValueError("'to' must not be before 'from'")
+    if status and metric == "new_customers":
+        raise ValueError("Customers have no status to filter on")
+
+    if not compare:
+        current = await series(supabase, metric, start, end, granularity, status)
+        return {"metric": metric, "granularity": granularity, "status": status, **current}
+
+    # The previous period has the same length and ends the day before this one starts
+    previous_end = start - timedelta(days=1)
+    previous_start = previous_end - (end - start)
+    current, previous = await asyncio.gather(
+        series(supabase, metric, start, end, granularity, status),
+        series(supabase, metric, previous_start, previous_end, granularity, status)
+    )
+    return {
+        "metric": metric,
+        "granularity": granularity,
+        "status": status,
+        **current,
+        "previous": previous,
+        "change": {
+            "count": change(current['count'], previous['count']),
+            "total": change(current['total'], previous['total'])
+        }
+    }
@@ -0,0 +1,62 @@
+"""
+Password login, shared by the API and the frontend login form.
+
+Both call ``login()`` directly, so signing in costs one user lookup and one
+bcrypt verify (on the password pool), with no HTTP round trip to ourselves.
+"""
+from datetime import timedelta
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.database import DatabaseClient
+from app.core.security import create_access_token, verify_password_async
+from app.schemas.user import USER_COLUMNS
+
+
+async def authenticate(supabase: DatabaseClient, email: str, password: str) -> dict:
+    """The active user with this email and password, or an HTTPException"""
+    response = await supabase.table('users').select(USER_COLUMNS['credentials']).eq('email', email).execute()
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+
+    user = response.data[0]
+    if not await verify_password_async(password, user['hashed_password']):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+
+    if not user.get('is_active', True):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return user
+
+
+def issue_token(user: dict) -> str:
+    """Access token carrying the claims AUTH_MODE=claims trusts"""
+    return create_access_token(
+        data={
+            "sub": str(user['id']),
+            "email": user['email'],
+            "full_name": user.get('full_name'),
+            "role": user.get('role', 'user'),
+            "is_superuser": user.get('is_superuser'),
+            "is_active": bool(user.get('is_active', True))
+        },
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+
+async def login(supabase: DatabaseClient, email: str, password: str) -> dict:
+    """Check a password and return a bearer token for the user"""
+    user = await authenticate(supabase, email, password)
+    return {
+        "access_token": issue_token(user),
+        "token_type": "bearer"
+    }
@@ -0,0 +1,382 @@
+"""
+Typeahead search over customers.
+
+Every worker keeps an in-memory index of the customers' name, email, phone
+and city: a sorted word list answers prefix matches and a trigram index
+answers matches inside words and small typos, so a keystroke never reaches
+the database. Customer writes from any worker change the summary cache's
+``customers`` generation; the next search then fetches only the rows updated
+since the last sync. Everything is reloaded when the row count disagrees, and
+every CUSTOMER_SEARCH_FULL_SYNC_INTERVAL for edits that didn't touch updated_at.
+"""
+import asyncio
+import bisect
+import heapq
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.database import DatabaseClient, get_supabase_service
+from app.schemas.customer import CUSTOMER_COLUMNS
+from app.services.summary_cache import summary_cache
+
+# Field -> weight of a match in it
+SEARCH_FIELDS = {"name": 3.0, "email": 2.0, "phone": 2.0, "city": 1.0}
+
+# A word that only starts with the query, and a trigram match, weigh less than a whole word
+PREFIX_WEIGHT = 0.8
+TRIGRAM_WEIGHT = 0.5
+
+# Share of a query word's trigrams a customer must have to match it
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+# Trigrams found in more customers than this share (e.g. "com") only find
+# candidates for a word that has no rarer trigram
+COMMON_TRIGRAM_SHARE = 0.05
+
+# Typos (insertions, deletions, substitutions, swaps) tolerated in a word of up to 5 letters, and longer
+SHORT_WORD_TYPOS = 1
+LONG_WORD_TYPOS = 2
+
+# Fields also indexed by trigram, for matches inside words and typos
+TRIGRAM_FIELDS = ("name", "city")
+
+# Most customers a common query word is checked against when other words narrow it down
+MAX_CANDIDATES = 1000
+
+MAX_LIMIT = 100
+PAGE_SIZE = 1000
+
+WORD_PATTERN = re.compile(r"\w+")
+PHONE_PATTERN = re.compile(r"[\d\s()+.-]*\d[\d\s()+.-]*")
+
+
+def field_words(field: str, value) -> Set[str]:
+    """Searchable words of one customer field"""
+    value = str(value or "").lower()
+    if field == "phone":
+        digits = re.sub(r"\D", "", value)
+        return {digits} if digits else set()
+    words = set(WORD_PATTERN.findall(value))
+    if field == "email" and value:
+        words.add(value)
+    return words
+
+
+def query_words(q: str) -> List[str]:
+    q = (q or "").strip().lower()
+    if PHONE_PATTERN.fullmatch(q):
+        return [re.sub(r"\D", "", q)]
+    return WORD_PATTERN.findall(q)
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f" {word}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def typo_distance(a: str, b: str, limit: int) -> int:
+    """Edits (with swaps of neighbouring letters) turning a into b, limit + 1 once it is over limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def as_client(customer: dict) -> dict:
+    """A customer in the shape the frontend client pages expect"""
+    return {
+        "_id": str(customer.get('id', '')),
+        "id": customer.get('id'),
+        "name": customer.get('name', ''),
+        "email": customer.get('email', ''),
+        "phone": customer.get('phone', ''),
+        "city": customer.get('city', ''),
+        "country": customer.get('country', ''),
+        "address": customer.get('address', ''),
+        "state": customer.get('state', ''),
+        "zipCode": customer.get('postal_code', ''),
+        "created_at": customer.get('created_at'),
+        **({"score": customer['score']} if 'score' in customer else {})
+    }
+
+
+class CustomerIndex:
+    """Prefix and trigram index of every customer, refreshed on customer writes"""
+    def __init__(self):
+        self._customers: Dict[int, dict] = {}
+        # field -> (sorted words, id of the customer each word belongs to)
+        self._words: Dict[str, Tuple[List[str], List[int]]] = {field: ([], []) for field in SEARCH_FIELDS}
+        self._trigrams: Dict[str, List[int]] = {}
+        self._synced: Optional[str] = None
+        self._generation = None
+        self._loaded_at: Optional[float] = None
+        self._full_loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._warming: Optional[asyncio.Task] = None
+        self.searches = 0
+        self.refreshes = 0
+        self.full_loads = 0
+
+    @staticmethod
+    def _customer_trigrams(customer: dict) -> Set[str]:
+        return {
+            trigram
+            for field in TRIGRAM_FIELDS
+            for word in field_words(field, customer.get(field))
+            for trigram in trigrams(word)
+        }
+
+    def _build(self, rows: List[dict]) -> tuple:
+        """Customers, word lists and trigram postings for a full set of rows"""
+        customers = {}
+        entries = {field: [] for field in SEARCH_FIELDS}
+        postings = defaultdict(list)
+        for customer in rows:
+            customer_id = customer['id']
+            customers[customer_id] = customer
+            for field in SEARCH_FIELDS:
+                entries[field].extend((word, customer_id) for word in field_words(field, customer.get(field)))
+            for trigram in self._customer_trigrams(customer):
+                postings[trigram].append(customer_id)
+        words = {}
+        for field, pairs in entries.items():
+            pairs.sort()
+            words[field] = ([word for word, _ in pairs], [customer_id for _, customer_id in pairs])
+        return customers, words, dict(postings)
+
+    def _add(self, customer: dict):
+        customer_id = customer['id']
+        self._customers[customer_id] = customer
+        for field, (words, ids) in self._words.items():
+            for word in field_words(field, customer.get(field)):
+                position = bisect.bisect_right(words, word)
+                words.insert(position, word)
+                ids.insert(position, customer_id)
+        for trigram in self._customer_trigrams(customer):
+            self._trigrams.setdefault(trigram, []).append(customer_id)
+
+    def _remove(self, customer_id: int):
+        customer = self._customers.pop(customer_id, None)
+        if customer is None:
+            return
+        for field, (words, ids) in self._words.items():
+            for word in field_words(field, customer.get(field)):
+                start = bisect.bisect_left(words, word)
+                for position in range(start, bisect.bisect_right(words, word, start)):
+                    if ids[position] == customer_id:
+                        del words[position]
+                        del ids[position]
+                        break
+        for trigram in self._customer_trigrams(customer):
+            postings = self._trigrams.get(trigram)
+            if postings and customer_id in postings:
+                postings.remove(customer_id)
+                if not postings:
+                    del self._trigrams[trigram]
+
+    def _stale(self, generation) -> bool:
+        return (
+            self._loaded_at is None
+            or generation != self._generation
+            or time.monotonic() - self._loaded_at > settings.CUSTOMER_SEARCH_MAX_AGE
+            or time.monotonic() - self._full_loaded_at > settings.CUSTOMER_SEARCH_FULL_SYNC_INTERVAL
+        )
+
+    def _track_sync(self, rows: List[dict]):
+        stamps = [str(row['updated_at']) for row in rows if row.get('updated_at')]
+        if stamps:
+            self._synced = max([self._synced or "", *stamps])
+
+    async def _load_all(self, supabase: DatabaseClient):
+        rows, last_id = [], None
+        while True:
+            query = supabase.table('customers').select(CUSTOMER_COLUMNS['index']).order('id').limit(PAGE_SIZE)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page = (await query.execute()).data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            last_id = page[-1]['id']
+        # Seconds of CPU for a large tenant, kept off the event loop
+        self._customers, self._words, self._trigrams = await asyncio.to_thread(self._build, rows)
+        self._synced = None
+        self._track_sync(rows)
+        self._full_loaded_at = time.monotonic()
+        self.full_loads += 1
+
+    async def _load_changes(self, supabase: DatabaseClient):
+        changed, total = await asyncio.gather(
+            supabase.table('customers').select(CUSTOMER_COLUMNS['index']).gte('updated_at', self._synced).execute(),
+            supabase.count('customers')
+        )
+        for customer in changed.data or []:
+            self._remove(customer['id'])
+            self._add(customer)
+        self._track_sync(changed.data or [])
+        # Deleted rows don't show up as changes, only in the count
+        if total is not None and total != len(self._customers):
+            await self._load_all(supabase)
+
+    async def refresh(self, supabase: DatabaseClient):
+        """Catch up with customer writes, once for every concurrent caller"""
+        async with self._lock:
+            # Taken before reading, so a write during the refresh triggers another one
+            generation = summary_cache.generation('customers')
+            if not self._stale(generation):
+                return
+            if (self._synced is None
+                    or time.monotonic() - self._full_loaded_at > settings.CUSTOMER_SEARCH_FULL_SYNC_INTERVAL):
+                await self._load_all(supabase)
+            else:
+                await self._load_changes(supabase)
+            self._generation = generation
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+
+    async def _ensure_fresh(self, supabase: DatabaseClient):
+        if self._stale(summary_cache.generation('customers')):
+            await self.refresh(supabase)
+
+    def warm(self):
+        """Build the index in the background so the first search doesn't wait for it"""
+        async def build():
+            try:
+                await self.refresh(get_supabase_service())
+                print(f"🔎 Customer search index ready ({len(self._customers)} customers)")
+            except Exception as e:
+                print(f"⚠️  Customer search index warm-up failed: {e}")
+        self._warming = asyncio.create_task(build())
+
+    def _tiers(self, word: str) -> List[Tuple[float, List[int], int, int]]:
+        """Index ranges matching a word as (score, ids, start, end), best score first"""
+        tiers = []
+        for field, weight in SEARCH_FIELDS.items():
+            words, ids = self._words[field]
+            start = bisect.bisect_left(words, word)
+            exact = bisect.bisect_right(words, word, start)
+            end = bisect.bisect_left(words, word + "\uffff", exact)
+            tiers.append((weight, ids, start, exact))
+            tiers.append((weight * PREFIX_WEIGHT, ids, exact, end))
+        return sorted((tier for tier in tiers if tier[3] > tier[2]), key=lambda tier: -tier[0])
+
+    def _trigram_matches(self, word: str, scores: Dict[int, float], wanted: int):
+        """Add customers sharing most of a word's trigrams or a word a typo away, e.g. "smith" in "Blacksmith" or "jonh" for "John"""
+        grams = trigrams(word)
+        common = max(50, len(self._customers) * COMMON_TRIGRAM_SHARE)
+        rare = {gram for gram in grams if len(self._trigrams.get(gram, ())) <= common}
+        checked = set(scores)
+        # Rare trigrams find candidates cheaply; common ones (" jo" among many Johns)
+        # only when those weren't enough, and then the customers sharing most of them
+        for selected in (rare, grams - rare):
+            if not selected or len(scores) >= wanted:
+                break
+            shared = Counter()
+            for gram in selected:
+                shared.update(self._trigrams.get(gram, ()))
+            for customer_id, _ in shared.most_common(MAX_CANDIDATES):
+                if customer_id not in checked:
+                    checked.add(customer_id)
+                    score = self._trigram_score(word, grams, self._customers[customer_id])
+                    if score:
+                        scores[customer_id] = score
+
+    def _trigram_score(self, word: str, grams: Set[str], customer: dict) -> float:
+        """Score of a customer sharing most of a word's trigrams, or with a word a typo away, 0 otherwise"""
+        similarity = len(grams & self._customer_trigrams(customer)) / len(grams)
+        if similarity >= MIN_TRIGRAM_SIMILARITY:
+            return TRIGRAM_WEIGHT * similarity
+        # A whole word, or the start of one (weighing less) for a query still being typed
+        typos = SHORT_WORD_TYPOS if len(word) <= 5 else LONG_WORD_TYPOS
+        best = 0.0
+        for field in TRIGRAM_FIELDS:
+            for indexed in field_words(field, customer.get(field)):
+                for candidate, weight in ((indexed, 1.0), (indexed[:len(word)], PREFIX_WEIGHT)):
+                    distance = typo_distance(word, candidate, typos)
+                    if distance <= typos:
+                        best = max(best, TRIGRAM_WEIGHT * weight * (1 - distance / len(word)))
+        return best
+
+    def _match(self, word: str, tiers: list, enough: Optional[int], wanted: int) -> Dict[int, float]:
+        """customer_id -> score for one query word, the best `enough` only if given"""
+        scores: Dict[int, float] = {}
+        for score, ids, start, end in tiers:
+            for position in range(start, end):
+                # Tiers come best first, so the first score seen for a customer is its best
+                scores.setdefault(ids[position], score)
+                if enough is not None and len(scores) >= enough:
+                    return scores
+        if len(word) >= 3 and len(scores) < wanted:
+            self._trigram_matches(word, scores, wanted)
+        return scores
+
+    def _word_score(self, customer_id: int, word: str) -> float:
+        """Score of one query word against one customer, 0 if it doesn't match"""
+        customer = self._customers[customer_id]
+        best = 0.0
+        for field, weight in SEARCH_FIELDS.items():
+            for indexed in field_words(field, customer.get(field)):
+                if indexed.startswith(word):
+                    best = max(best, weight * (1.0 if indexed == word else PREFIX_WEIGHT))
+        return best
+
+    async def search(self, supabase: DatabaseClient, q: str, limit: int = 20) -> List[dict]:
+        """Customers matching every word of q, best first"""
+        await self._ensure_fresh(supabase)
+        self.searches += 1
+        limit = min(limit, MAX_LIMIT)
+        tiers = {word: self._tiers(word) for word in query_words(q)}
+        if not tiers:
+            return []
+
+        # Start from the rarest word, the others only have to be checked against its matches
+        sizes = {word: sum(end - start for _, _, start, end in word_tiers) for word, word_tiers in tiers.items()}
+        words = sorted(tiers, key=sizes.get)
+        scores = self._match(words[0], tiers[words[0]], limit if len(words) == 1 else MAX_CANDIDATES, limit)
+        for word in words[1:]:
+            if sizes[word] <= MAX_CANDIDATES:
+                other = self._match(word, tiers[word], None, limit)
+                scores = {customer_id: score + other[customer_id] for customer_id, score in scores.items() if customer_id in other}
+            else:
+                scores = {customer_id: score + extra for customer_id, score in scores.items()
+                          if (extra := self._word_score(customer_id, word))}
+
+        best = heapq.nsmallest(
+            limit, scores.items(),
+            key=lambda item: (-item[1], (self._customers[item[0]].get('name') or '').lower())
+        )
+        return [{**self._customers[customer_id], "score": round(score, 3)} for customer_id, score in best]
+
+    async def customers(self, supabase: DatabaseClient, limit: Optional[int] = None) -> List[dict]:
+        """Indexed customers by id, without a query"""
+        await self._ensure_fresh(supabase)
+        return [self._customers[customer_id] for customer_id in sorted(self._customers)[:limit]]
+
+    def stats(self) -> dict:
+        return {
+            "customers": len(self._customers),
+            "words": sum(len(words) for words, _ in self._words.values()),
+            "trigrams": len(self._trigrams),
+            "synced": self._synced,
+            "searches": self.searches,
+            "refreshes": self.refreshes,
+            "full_loads": self.full_loads
+        }
+
+
+customer_index = CustomerIndex()
@@ -0,0 +1,142 @@
+"""
+Dashboard summaries.
+
+Each summary is one database round trip (two concurrent ones for invoices).
+``dashboard_summary`` runs the ones asked for concurrently with a timeout per
+branch, so the whole dashboard costs about as much as its slowest summary and
+one slow or failing branch only blanks its own card. Results go through the
+summary cache, so most dashboard loads don't reach the database at all.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from app.core.config import settings
+from app.core.database import DatabaseClient
+from app.services.summary_cache import summary_cache
+
+INVOICE_STATUSES = ['draft', 'pending', 'sent', 'paid', 'overdue', 'partially']
+QUOTE_STATUSES = ['draft', 'pending', 'sent', 'accepted', 'declined', 'expired']
+
+SUMMARY_TYPES = ['week', 'month', 'year']
+
+
+def summary_type(type: str) -> str:
+    """Summary window for ?type=, unknown values fall back to month"""
+    return type if type in SUMMARY_TYPES else "month"
+
+
+def period_start(type: str) -> datetime:
+    """Start of a summary window: week, month (default) or year"""
+    now = datetime.now()
+    if type == "week":
+        return now - timedelta(weeks=1)
+    elif type == "year":
+        return now - timedelta(days=365)
+    return now - timedelta(days=30)
+
+
+def status_performance(by_status: Dict[str, dict], statuses: list) -> list:
+    """Share of each status in percent"""
+    total = sum(row['count'] for row in by_status.values()) or 1
+    return [
+        {"status": status, "percentage": round(by_status.get(status, {}).get('count', 0) / total * 100)}
+        for status in statuses
+    ]
+
+
+async def customers_summary(supabase: DatabaseClient, type: str = "month") -> dict:
+    """Total, new and active customers"""
+    response = await supabase.rpc('customer_summary', {'since': period_start(type).isoformat()}).execute()
+    summary = response.data[0] if response.data else {}
+    total_customers = summary.get('total', 0)
+
+    # Customers with an invoice, quote or payment in the period
+    active_customers = summary.get('active', 0)
+    return {
+        "total": total_customers,
+        "new": summary.get('new', 0),
+        "active": active_customers,
+        "active_percentage": round((active_customers / total_customers * 100) if total_customers > 0 else 0)
+    }
+
+
+async def invoices_summary(supabase: DatabaseClient, type: str = "month") -> dict:
+    """Invoiced and still unpaid amounts, and the status breakdown"""
+    since = period_start(type).isoformat()
+    response, receivable = await asyncio.gather(
+        supabase.rpc('invoice_status_summary', {'since': since}).execute(),
+        supabase.rpc('receivable_summary', {'since': since}).execute()
+    )
+    by_status = {row['status']: row for row in response.data or []}
+    return {
+        "total": sum(float(row['total'] or 0) for row in by_status.values()),
+        # Open balances net of payments, not the full total of unpaid invoices
+        "total_undue": float(receivable.data[0]['total'] or 0) if receivable.data else 0,
+        "type": type,
+        "performance": status_performance(by_status, INVOICE_STATUSES)
+    }
+
+
+async def quotes_summary(supabase: DatabaseClient, type: str = "month") -> dict:
+    """Quoted amount and the status breakdown"""
+    response = await supabase.rpc('quote_status_summary', {'since': period_start(type).isoformat()}).execute()
+    by_status = {row['status']: row for row in response.data or []}
+    return {
+        "total": sum(float(row['total'] or 0) for row in by_status.values()),
+        "type": type,
+        "performance": status_performance(by_status, QUOTE_STATUSES)
+    }
+
+
+async def payments_summary(supabase: DatabaseClient, type: str = "month") -> dict:
+    """Number and amount of payments"""
+    response = await supabase.rpc('payment_summary', {'since': period_start(type).isoformat()}).execute()
+    summary = response.data[0] if response.data else {}
+    return {
+        "count": summary.get('count', 0),
+        "total": float(summary.get('total') or 0)
+    }
+
+
+SUMMARIES = {
+    "customers": customers_summary,
+    "invoices": invoices_summary,
+    "quotes": quotes_summary,
+    "payments": payments_summary,
+}
+
+# What a card shows when its summary failed
+EMPTY_SUMMARIES = {
+    "customers": {"new": 0, "active": 0},
+    "invoices": {"total": 0, "total_undue": 0, "performance": []},
+    "quotes": {"total": 0, "performance": []},
+    "payments": {"count": 0, "total": 0},
+}
+
+
+async def dashboard_summary(supabase: DatabaseClient, type: str = "month", kinds: Iterable[str] = None) -> dict:
+    """Compute summaries concurrently, as {"result": {kind: summary}, "errors": {kind: message}}"""
+    # A branch that fails or exceeds DASHBOARD_BRANCH_TIMEOUT gets its empty summary, not the whole dashboard
+    kinds = list(kinds or SUMMARIES)
+    # Unknown windows must not become cache keys of their own
+    type = summary_type(type)
+
+    async def branch(kind: str):
+        try:
+            summary = summary_cache.get(kind, type, lambda: SUMMARIES[kind](supabase, type))
+            return await asyncio.wait_for(summary, settings.DASHBOARD_BRANCH_TIMEOUT), None
+        except asyncio.TimeoutError:
+            return EMPTY_SUMMARIES[kind], f"timed out after {settings.DASHBOARD_BRANCH_TIMEOUT}s"
+        except Exception as e:
+            return EMPTY_SUMMARIES[kind], str(e)
+
+    outcomes = await asyncio.gather(*[branch(kind) for kind in kinds])
+
+    result, errors = {}, {}
+    for kind, (summary, error) in zip(kinds, outcomes):
+        result[kind] = summary
+        if error:
+            print(f"⚠️  Dashboard {kind} summary failed: {error}")
+            errors[kind] = error
+    return {"result": result, "errors": errors}
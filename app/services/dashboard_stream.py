@@ -0,0 +1,123 @@
+"""
+Live dashboard updates.
+
+One ``DashboardBroadcaster`` per process keeps the connected dashboards. When
+tables change (``publish_changes()`` from this worker, or a summary cache
+invalidation by another worker, noticed every DASHBOARD_STREAM_POLL_INTERVAL)
+it recomputes the affected summaries once per summary type and pushes only
+the ones whose numbers moved to every dashboard showing that type.
+"""
+import asyncio
+import contextvars
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.database import get_supabase_service
+from app.core.events import subscribe
+from app.services.dashboard import SUMMARIES, dashboard_summary
+from app.services.summary_cache import summary_cache, summaries_reading
+
+# Pause after the first change so a burst of writes is pushed once
+DEBOUNCE_SECONDS = 0.2
+
+# Updates a slow viewer may have pending before the oldest are dropped
+VIEWER_QUEUE_SIZE = 16
+
+
+class DashboardBroadcaster:
+    """Fan summary changes out to every connected dashboard"""
+    def __init__(self):
+        self._viewers: Dict[asyncio.Queue, str] = {}
+        self._last: Dict[str, dict] = {}
+        self._changes: Set[str] = set()
+        # Summary cache generations this broadcaster last saw, apart from the
+        # cache's own so a read through the cache can't hide a change from it
+        self._generations: Dict[str, tuple] = {}
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.broadcasts = 0
+
+    def on_changes(self, tables: Set[str]):
+        kinds = summaries_reading(tables) & set(SUMMARIES)
+        if kinds and self._changed is not None:
+            self._changes |= kinds
+            self._changed.set()
+
+    def connect(self, type: str, snapshot: dict) -> asyncio.Queue:
+        """Register a dashboard showing summaries of this type"""
+        queue = asyncio.Queue(maxsize=VIEWER_QUEUE_SIZE)
+        self._viewers[queue] = type
+        self._last.setdefault(type, dict(snapshot))
+        if self._task is None or self._task.done():
+            self._changed = asyncio.Event()
+            self._invalidated_elsewhere()
+            # Outlives the request that connected first, so it must not inherit its
+            # context (query log, DataLoaders)
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        return queue
+
+    def disconnect(self, queue: asyncio.Queue):
+        self._viewers.pop(queue, None)
+        if not self._viewers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._changed = None
+            self._last.clear()
+            self._generations.clear()
+
+    def _invalidated_elsewhere(self) -> Set[str]:
+        """Kinds whose summaries any worker invalidated since the last look"""
+        changed = set()
+        for kind in SUMMARIES:
+            generation = summary_cache.summary_generation(kind)
+            if kind in self._generations and self._generations[kind] != generation:
+                changed.add(kind)
+            self._generations[kind] = generation
+        return changed
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), settings.DASHBOARD_STREAM_POLL_INTERVAL)
+                await asyncio.sleep(DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            kinds = self._changes | self._invalidated_elsewhere()
+            self._changes = set()
+            if kinds:
+                try:
+                    await self._broadcast(kinds)
+                except Exception as e:
+                    print(f"⚠️  Dashboard stream update failed: {e}")
+
+    async def _broadcast(self, kinds: Set[str]):
+        supabase = get_supabase_service()
+        for type in set(self._viewers.values()):
+            # Computed once for all viewers of this type, through the summary cache
+            summary = await dashboard_summary(supabase, type, sorted(kinds))
+            last = self._last.setdefault(type, {})
+            delta = {
+                kind: value for kind, value in summary["result"].items()
+                if kind not in summary["errors"] and last.get(kind) != value
+            }
+            if not delta:
+                continue
+            last.update(delta)
+            self.broadcasts += 1
+            for queue, viewer_type in list(self._viewers.items()):
+                if viewer_type == type:
+                    self._push(queue, {"type": type, "result": delta})
+
+    @staticmethod
+    def _push(queue: asyncio.Queue, message: dict):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    def stats(self) -> dict:
+        return {"viewers": len(self._viewers), "broadcasts": self.broadcasts}
+
+
+dashboard_broadcaster = DashboardBroadcaster()
+subscribe(dashboard_broadcaster.on_changes)
@@ -0,0 +1,27 @@
+"""
+Invoices with their balance.
+
+Paid amounts come from ``invoice_balances``, kept up to date by triggers on
+invoices and payments, for just the invoices being shown (one query per page).
+"""
+from typing import Dict, Iterable, List
+
+from app.core.database import DatabaseClient
+
+
+async def paid_amounts(supabase: DatabaseClient, invoice_ids: Iterable[int]) -> Dict[int, float]:
+    """invoice_id -> total paid, for these invoices only"""
+    invoice_ids = sorted({invoice_id for invoice_id in invoice_ids if invoice_id is not None})
+    if not invoice_ids:
+        return {}
+    response = await supabase.table('invoice_balances').select('invoice_id, paid').in_('invoice_id', invoice_ids).execute()
+    return {row['invoice_id']: float(row['paid'] or 0) for row in response.data or []}
+
+
+async def with_balances(supabase: DatabaseClient, invoices: List[dict]) -> List[dict]:
+    """Add paid_amount and balance_due to each invoice"""
+    paid = await paid_amounts(supabase, [invoice.get('id') for invoice in invoices or []])
+    for invoice in invoices or []:
+        invoice['paid_amount'] = paid.get(invoice.get('id'), 0)
+        invoice['balance_due'] = round(float(invoice.get('total_amount') or 0) - invoice['paid_amount'], 2)
+    return invoices or []
@@ -0,0 +1,61 @@
+"""
+Global search across customers, invoices, quotes and payments.
+
+Every searchable table has a GIN index on a weighted tsvector expression
+(database_summary_functions.sql), and ``search_<table>()`` returns one ranked
+page of its matches together with the total match count. A search is one of
+those calls per requested entity type, run concurrently.
+"""
+import asyncio
+import re
+from typing import List, Optional, Sequence
+
+from app.core.database import DatabaseClient
+
+# Entity types, in the order their groups are returned
+SEARCH_ENTITIES = ["customers", "invoices", "quotes", "payments"]
+
+MAX_LIMIT = 50
+
+
+def prefix_query(q: str) -> Optional[str]:
+    """Search text as a to_tsquery of prefix terms that must all match ('inv-20' -> 'inv:* & 20:*')"""
+    terms = re.findall(r"[^\W_]+", q.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+async def global_search(supabase: DatabaseClient, q: str, types: Optional[Sequence[str]] = None,
+                        limit: int = 10, skip: int = 0) -> dict:
+    """Ranked hits grouped by entity type, one page of each with its total"""
+    types = list(types or SEARCH_ENTITIES)
+    unknown = [entity for entity in types if entity not in SEARCH_ENTITIES]
+    if unknown:
+        raise ValueError(f"Unknown search types: {', '.join(unknown)}")
+    types = [entity for entity in SEARCH_ENTITIES if entity in types]
+
+    query = prefix_query(q)
+    if query is None:
+        raise ValueError("Search text must contain at least one letter or digit")
+
+    limit = min(limit, MAX_LIMIT)
+    responses = await asyncio.gather(*[
+        supabase.rpc(f"search_{entity}", {"query": query, "max_results": limit, "skip": skip}).execute()
+        for entity in types
+    ])
+
+    groups = {}
+    for entity, response in zip(types, responses):
+        rows: List[dict] = response.data or []
+        groups[entity] = {
+            # A page past the end has no rows to carry the total
+            "total": int(rows[0]["total"]) if rows else None if skip else 0,
+            "skip": skip,
+            "limit": limit,
+            "hits": [
+                {**{key: value for key, value in row.items() if key != "total"}, "type": entity}
+                for row in rows
+            ]
+        }
+    return {"q": q, "groups": groups}
@@ -0,0 +1,182 @@
+"""
+Cache of dashboard summaries with stale-while-revalidate.
+
+Summaries are cached per ``(kind, type)``. A fresh entry (younger than
+SUMMARY_CACHE_TTL) is served as is; an older one is still served, up to
+SUMMARY_CACHE_MAX_STALE, while a single background task recomputes it.
+
+``publish_changes()`` from the write handlers invalidates every summary that
+reads the written tables (SUMMARY_TABLES). Invalidations reach every uvicorn
+worker through one generation file per table in SUMMARY_CACHE_DIR, which is
+replaced atomically; a worker drops a kind's entries once any of its tables'
+files changed.
+"""
+import asyncio
+import contextvars
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.events import subscribe
+
+# Tables each summary reads, so a write to any of them invalidates it
+SUMMARY_TABLES = {
+    # "active" counts customers with an invoice, quote or payment in the period
+    "customers": ("customers", "invoices", "quotes", "payments"),
+    # Open balances are net of payments
+    "invoices": ("invoices", "payments"),
+    "quotes": ("quotes",),
+    "payments": ("payments",),
+}
+
+
+def summary_tables(kind: str) -> Tuple[str, ...]:
+    return SUMMARY_TABLES.get(kind, (kind,))
+
+
+def summaries_reading(tables: Iterable[str]) -> Set[str]:
+    """Summary kinds that read any of these tables"""
+    tables = set(tables)
+    return {kind for kind in SUMMARY_TABLES if tables.intersection(summary_tables(kind))} | (tables - SUMMARY_TABLES.keys())
+
+
+class SummaryCache:
+    """Stale-while-revalidate cache, invalidated across worker processes"""
+    def __init__(self, directory: str = None):
+        self.directory = directory or settings.SUMMARY_CACHE_DIR or os.path.join(
+            tempfile.gettempdir(), "erp_summary_cache"
+        )
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._generations: Dict[str, Tuple[Optional[Tuple[int, int]], ...]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _generation_path(self, table: str) -> str:
+        return os.path.join(self.directory, f"{table}.generation")
+
+    def _generation(self, table: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._generation_path(table))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def generation(self, table: str) -> Optional[Tuple[int, int]]:
+        """Token that changes whenever any worker publishes a write to a table"""
+        return self._generation(table)
+
+    def summary_generation(self, kind: str) -> Tuple[Optional[Tuple[int, int]], ...]:
+        """Token that changes whenever any worker invalidates a summary kind"""
+        return tuple(self._generation(table) for table in summary_tables(kind))
+
+    def _check_generation(self, kind: str):
+        """Drop a kind's entries if another worker (or we) invalidated it"""
+        generation = self.summary_generation(kind)
+        if kind in self._generations and self._generations[kind] == generation:
+            return
+        self._generations[kind] = generation
+        self._forget(kind)
+
+    def _forget(self, kind: str):
+        """Drop a kind's entries, and computations that started before the invalidation"""
+        for key in [key for key in self._entries if key[0] == kind]:
+            del self._entries[key]
+        for key in [key for key in self._inflight if key[0] == kind]:
+            del self._inflight[key]
+
+    async def get(self, kind: str, type: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached summary, computing it when missing, invalidated or too stale"""
+        if settings.SUMMARY_CACHE_TTL <= 0:
+            return await compute()
+
+        self._check_generation(kind)
+        key = (kind, type)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < settings.SUMMARY_CACHE_TTL:
+                self.hits += 1
+                return entry[1]
+            if age < settings.SUMMARY_CACHE_MAX_STALE:
+                self.stale_hits += 1
+                self._refresh_in_background(key, compute)
+                return entry[1]
+
+        self.misses += 1
+        return await self._compute(key, compute)
+
+    async def _compute(self, key: Tuple[str, str], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Compute once for every concurrent caller of the same key"""
+        task = self._inflight.get(key) or self._start(key, compute)
+        # A caller giving up (timeout, disconnect) doesn't cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _refresh_in_background(self, key: Tuple[str, str], compute: Callable[[], Awaitable[Any]]):
+        if key not in self._inflight:
+            self._start(key, compute, background=True)
+
+    def _start(self, key: Tuple[str, str], compute: Callable[[], Awaitable[Any]], background: bool = False) -> asyncio.Task:
+        generation = self._generations.get(key[0])
+
+        async def compute_and_store():
+            value = await compute()
+            # An invalidation while computing means the value may already be outdated
+            if self.summary_generation(key[0]) == generation:
+                self._entries[key] = (time.monotonic(), value)
+            return value
+
+        def done(task: asyncio.Task):
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            error = None if task.cancelled() else task.exception()
+            if error is not None and background:
+                print(f"⚠️  Background refresh of {key[0]} summary failed: {error}")
+
+        # A background refresh outlives the request that triggered it, so it
+        # doesn't inherit its context (query log, DataLoaders)
+        context = contextvars.Context() if background else None
+        task = asyncio.create_task(compute_and_store(), context=context)
+        task.add_done_callback(done)
+        self._inflight[key] = task
+        return task
+
+    def invalidate(self, *tables: str):
+        """Forget summaries reading these tables in every worker"""
+        for table in tables:
+            path = self._generation_path(table)
+            temporary = f"{path}.{uuid.uuid4().hex}"
+            try:
+                # Created on the first write, not when the module is imported
+                os.makedirs(self.directory, exist_ok=True)
+                with open(temporary, "w") as f:
+                    f.write(uuid.uuid4().hex)
+                os.replace(temporary, path)
+            except OSError as e:
+                print(f"⚠️  Could not publish {table} summary invalidation: {e}")
+        for kind in summaries_reading(tables):
+            self._generations[kind] = self.summary_generation(kind)
+            self._forget(kind)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "ttl": settings.SUMMARY_CACHE_TTL,
+            "max_stale": settings.SUMMARY_CACHE_MAX_STALE
+        }
+
+
+summary_cache = SummaryCache()
+
+
+@subscribe
+def invalidate_summaries(tables: set):
+    """Forget the summaries of tables that were written to"""
+    summary_cache.invalidate(*tables)
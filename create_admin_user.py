@@ -21,7 +21,7 @@ async def create_admin_user():
         print(f"Name: {full_name}")
         
         # Check if user already exists
-        existing_user = supabase.table('users').select('*').eq('email', email).execute()
+        existing_user = await supabase.table('users').select('*').eq('email', email).execute()
         
         if existing_user.data:
             print(f"❌ Admin user with email {email} already exists!")
@@ -45,7 +45,7 @@ async def create_admin_user():
         }
         
         # Insert user into database
-        response = supabase.table('users').insert(user_data).execute()
+        response = await supabase.table('users').insert(user_data).execute()
         
         if response.data:
             user = response.data[0]
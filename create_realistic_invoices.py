@@ -23,7 +23,7 @@ async def create_realistic_invoices():
         ]
         
         # Insert customers
-        customers_response = supabase.table('customers').insert(customers_to_create).execute()
+        customers_response = await supabase.table('customers').insert(customers_to_create).execute()
         
         if not customers_response.data:
             print("❌ Failed to create customers")
@@ -33,8 +33,8 @@ async def create_realistic_invoices():
         print(f"✅ Created {len(customers)} customers")
         
         # Clear existing invoices and payments
-        supabase.table('payments').delete().neq('id', 0).execute()
-        supabase.table('invoices').delete().neq('id', 0).execute()
+        await supabase.table('payments').delete().neq('id', 0).execute()
+        await supabase.table('invoices').delete().neq('id', 0).execute()
         
         # Create realistic invoices matching the design
         realistic_invoices = [
@@ -141,7 +141,7 @@ async def create_realistic_invoices():
         ]
         
         # Insert invoices
-        invoices_response = supabase.table('invoices').insert(realistic_invoices).execute()
+        invoices_response = await supabase.table('invoices').insert(realistic_invoices).execute()
         
         if not invoices_response.data:
             print("❌ Failed to create invoices")
@@ -191,7 +191,7 @@ async def create_realistic_invoices():
         ]
         
         # Insert payments
-        payments_response = supabase.table('payments').insert(payments_to_create).execute()
+        payments_response = await supabase.table('payments').insert(payments_to_create).execute()
         
         if payments_response.data:
             print(f"✅ Created {len(payments_response.data)} payments")
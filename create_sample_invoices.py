@@ -12,7 +12,7 @@ async def create_sample_invoices():
         supabase = get_supabase_service()
         
         # Check if invoices already exist
-        existing_invoices = supabase.table('invoices').select('*').limit(1).execute()
+        existing_invoices = await supabase.table('invoices').select('*').limit(1).execute()
         
         if existing_invoices.data:
             print("✅ Sample invoices already exist!")
@@ -20,7 +20,7 @@ async def create_sample_invoices():
             return
         
         # Get existing customers to link invoices to
-        customers = supabase.table('customers').select('*').limit(5).execute()
+        customers = await supabase.table('customers').select('*').limit(5).execute()
         
         if not customers.data:
             print("❌ No customers found. Please create customers first.")
@@ -131,7 +131,7 @@ async def create_sample_invoices():
         ]
         
         # Insert sample invoices
-        response = supabase.table('invoices').insert(sample_invoices).execute()
+        response = await supabase.table('invoices').insert(sample_invoices).execute()
         
         if response.data:
             print("✅ Sample invoices created successfully!")
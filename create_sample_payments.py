@@ -12,7 +12,7 @@ async def create_sample_payments():
         supabase = get_supabase_service()
         
         # Check if payments already exist
-        existing_payments = supabase.table('payments').select('*').limit(1).execute()
+        existing_payments = await supabase.table('payments').select('*').limit(1).execute()
         
         if existing_payments.data:
             print("✅ Sample payments already exist!")
@@ -20,7 +20,7 @@ async def create_sample_payments():
             return
         
         # Get existing invoices to create payments for
-        invoices = supabase.table('invoices').select('*').execute()
+        invoices = await supabase.table('invoices').select('*').execute()
         
         if not invoices.data:
             print("❌ No invoices found. Please create invoices first.")
@@ -70,7 +70,7 @@ async def create_sample_payments():
         
         # Insert sample payments
         if sample_payments:
-            response = supabase.table('payments').insert(sample_payments).execute()
+            response = await supabase.table('payments').insert(sample_payments).execute()
             
             if response.data:
                 print("✅ Sample payments created successfully!")
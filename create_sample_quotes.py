@@ -12,7 +12,7 @@ async def create_sample_quotes():
         supabase = get_supabase_service()
         
         # Get existing customers
-        customers_response = supabase.table('customers').select('*').execute()
+        customers_response = await supabase.table('customers').select('*').execute()
         
         if not customers_response.data:
             print("❌ No customers found. Please create customers first.")
@@ -26,7 +26,7 @@ async def create_sample_quotes():
             customer_map[customer['name']] = customer['id']
         
         # Clear existing quotes
-        supabase.table('quotes').delete().neq('id', 0).execute()
+        await supabase.table('quotes').delete().neq('id', 0).execute()
         
         # Create sample quotes matching the design
         sample_quotes = [
@@ -143,7 +143,7 @@ async def create_sample_quotes():
                 })
         
         if missing_customers:
-            new_customers_response = supabase.table('customers').insert(missing_customers).execute()
+            new_customers_response = await supabase.table('customers').insert(missing_customers).execute()
             if new_customers_response.data:
                 for customer in new_customers_response.data:
                     customer_map[customer['name']] = customer['id']
@@ -161,7 +161,7 @@ async def create_sample_quotes():
                 quote['customer_id'] = customer_map[customer_name]
         
         # Insert sample quotes
-        quotes_response = supabase.table('quotes').insert(sample_quotes).execute()
+        quotes_response = await supabase.table('quotes').insert(sample_quotes).execute()
         
         if quotes_response.data:
             print(f"✅ Created {len(quotes_response.data)} quotes")
@@ -12,7 +12,7 @@ async def create_test_user():
         supabase = get_supabase_service()
         
         # Check if user already exists
-        existing_user = supabase.table('users').select('*').eq('email', 'admin@admin.com').execute()
+        existing_user = await supabase.table('users').select('*').eq('email', 'admin@admin.com').execute()
         
         if existing_user.data:
             print("✅ Test user already exists!")
@@ -34,7 +34,7 @@ async def create_test_user():
             "role": "admin"
         }
         
-        response = supabase.table('users').insert(user_data).execute()
+        response = await supabase.table('users').insert(user_data).execute()
         
         if response.data:
             user = response.data[0]
@@ -23,7 +23,7 @@ async def create_user_direct():
         print(f"Admin: {is_admin}")
         
         # Check if user already exists
-        existing_user = supabase.table('users').select('*').eq('email', email).execute()
+        existing_user = await supabase.table('users').select('*').eq('email', email).execute()
         
         if existing_user.data:
             print(f"❌ User with email {email} already exists!")
@@ -46,7 +46,7 @@ async def create_user_direct():
         }
         
         # Insert user into database
-        response = supabase.table('users').insert(user_data).execute()
+        response = await supabase.table('users').insert(user_data).execute()
         
         if response.data:
             user = response.data[0]
@@ -0,0 +1,563 @@
+-- Dashboard summary functions
+-- Run after database_setup.sql in your Supabase SQL editor
+-- The summary endpoints call these through .rpc() so the aggregation runs in
+-- Postgres and only a handful of rows come back instead of every row in the period
+
+-- Period scans on created_at
+CREATE INDEX IF NOT EXISTS idx_customers_created_at ON customers(created_at);
+CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices(created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_created_at ON quotes(created_at);
+CREATE INDEX IF NOT EXISTS idx_payments_created_at ON payments(created_at);
+
+-- Daily rollups
+-- Count and amount per day (of created_at) and status, kept up to date by
+-- triggers on every insert, update and delete, so a summary over any window
+-- reads at most one row per day and status instead of scanning the base tables.
+-- A window starting partway through a day takes that first day from the base
+-- table (one day of an indexed created_at range), the whole days after it
+-- from the rollup
+CREATE TABLE IF NOT EXISTS invoice_daily (
+    day DATE NOT NULL,
+    status VARCHAR NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    total NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status)
+);
+
+CREATE TABLE IF NOT EXISTS quote_daily (
+    day DATE NOT NULL,
+    status VARCHAR NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    total NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status)
+);
+
+CREATE TABLE IF NOT EXISTS payment_daily (
+    day DATE NOT NULL,
+    status VARCHAR NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    total NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status)
+);
+
+CREATE TABLE IF NOT EXISTS customer_daily (
+    day DATE PRIMARY KEY,
+    count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Add (or with a negative count, remove) rows to a day/status rollup
+CREATE OR REPLACE FUNCTION rollup_add(rollup TEXT, rollup_day DATE, rollup_status VARCHAR, delta_count BIGINT, delta_total NUMERIC)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format(
+        'INSERT INTO %I (day, status, count, total) VALUES ($1, $2, $3, $4)
+         ON CONFLICT (day, status) DO UPDATE
+         SET count = %I.count + EXCLUDED.count, total = %I.total + EXCLUDED.total',
+        rollup, rollup, rollup
+    ) USING rollup_day, COALESCE(rollup_status, 'draft'), delta_count, COALESCE(delta_total, 0);
+    EXECUTE format('DELETE FROM %I WHERE day = $1 AND status = $2 AND count = 0', rollup)
+        USING rollup_day, COALESCE(rollup_status, 'draft');
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger keeping a day/status rollup in step with its table
+-- TG_ARGV[0] is the rollup table, TG_ARGV[1] the amount column
+CREATE OR REPLACE FUNCTION maintain_status_rollup()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_amount NUMERIC;
+    new_amount NUMERIC;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_amount := (to_jsonb(OLD) ->> TG_ARGV[1])::NUMERIC;
+        PERFORM rollup_add(TG_ARGV[0], OLD.created_at::DATE, OLD.status, -1, -old_amount);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_amount := (to_jsonb(NEW) ->> TG_ARGV[1])::NUMERIC;
+        PERFORM rollup_add(TG_ARGV[0], NEW.created_at::DATE, NEW.status, 1, new_amount);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_customer_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE customer_daily SET count = count - 1 WHERE day = OLD.created_at::DATE;
+        DELETE FROM customer_daily WHERE day = OLD.created_at::DATE AND count = 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO customer_daily (day, count) VALUES (NEW.created_at::DATE, 1)
+        ON CONFLICT (day) DO UPDATE SET count = customer_daily.count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invoices_daily_rollup ON invoices;
+CREATE TRIGGER invoices_daily_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF status, total_amount, created_at ON invoices
+    FOR EACH ROW EXECUTE FUNCTION maintain_status_rollup('invoice_daily', 'total_amount');
+
+DROP TRIGGER IF EXISTS quotes_daily_rollup ON quotes;
+CREATE TRIGGER quotes_daily_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF status, total_amount, created_at ON quotes
+    FOR EACH ROW EXECUTE FUNCTION maintain_status_rollup('quote_daily', 'total_amount');
+
+DROP TRIGGER IF EXISTS payments_daily_rollup ON payments;
+CREATE TRIGGER payments_daily_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF status, amount, created_at ON payments
+    FOR EACH ROW EXECUTE FUNCTION maintain_status_rollup('payment_daily', 'amount');
+
+DROP TRIGGER IF EXISTS customers_daily_rollup ON customers;
+CREATE TRIGGER customers_daily_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF created_at ON customers
+    FOR EACH ROW EXECUTE FUNCTION maintain_customer_rollup();
+
+-- Recompute every rollup from the base tables (backfill, or repair after bulk loads)
+CREATE OR REPLACE FUNCTION rebuild_daily_rollups()
+RETURNS TABLE (rollup TEXT, rows BIGINT) AS $$
+BEGIN
+    LOCK TABLE invoices, quotes, payments, customers IN SHARE MODE;
+    DELETE FROM invoice_daily;
+    DELETE FROM quote_daily;
+    DELETE FROM payment_daily;
+    DELETE FROM customer_daily;
+
+    INSERT INTO invoice_daily (day, status, count, total)
+    SELECT created_at::DATE, COALESCE(status, 'draft'), COUNT(*), COALESCE(SUM(total_amount), 0)
+    FROM invoices GROUP BY 1, 2;
+
+    INSERT INTO quote_daily (day, status, count, total)
+    SELECT created_at::DATE, COALESCE(status, 'draft'), COUNT(*), COALESCE(SUM(total_amount), 0)
+    FROM quotes GROUP BY 1, 2;
+
+    INSERT INTO payment_daily (day, status, count, total)
+    SELECT created_at::DATE, COALESCE(status, 'draft'), COUNT(*), COALESCE(SUM(amount), 0)
+    FROM payments GROUP BY 1, 2;
+
+    INSERT INTO customer_daily (day, count)
+    SELECT created_at::DATE, COUNT(*) FROM customers GROUP BY 1;
+
+    RETURN QUERY
+        SELECT 'invoice_daily', (SELECT COUNT(*) FROM invoice_daily)
+        UNION ALL SELECT 'quote_daily', (SELECT COUNT(*) FROM quote_daily)
+        UNION ALL SELECT 'payment_daily', (SELECT COUNT(*) FROM payment_daily)
+        UNION ALL SELECT 'customer_daily', (SELECT COUNT(*) FROM customer_daily);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Invoice count and amount per status since a date
+CREATE OR REPLACE FUNCTION invoice_status_summary(since TIMESTAMP)
+RETURNS TABLE (status VARCHAR, count BIGINT, total NUMERIC) AS $$
+    SELECT s.status, SUM(s.count)::BIGINT, SUM(s.total)
+    FROM (
+        SELECT d.status, d.count, d.total
+        FROM invoice_daily d
+        WHERE d.day > since::DATE
+        UNION ALL
+        SELECT COALESCE(i.status, 'draft'), COUNT(*), COALESCE(SUM(i.total_amount), 0)
+        FROM invoices i
+        WHERE i.created_at >= since AND i.created_at < since::DATE + 1
+        GROUP BY 1
+    ) s
+    GROUP BY s.status;
+$$ LANGUAGE sql STABLE;
+
+-- Quote count and amount per status since a date
+CREATE OR REPLACE FUNCTION quote_status_summary(since TIMESTAMP)
+RETURNS TABLE (status VARCHAR, count BIGINT, total NUMERIC) AS $$
+    SELECT s.status, SUM(s.count)::BIGINT, SUM(s.total)
+    FROM (
+        SELECT d.status, d.count, d.total
+        FROM quote_daily d
+        WHERE d.day > since::DATE
+        UNION ALL
+        SELECT COALESCE(q.status, 'draft'), COUNT(*), COALESCE(SUM(q.total_amount), 0)
+        FROM quotes q
+        WHERE q.created_at >= since AND q.created_at < since::DATE + 1
+        GROUP BY 1
+    ) s
+    GROUP BY s.status;
+$$ LANGUAGE sql STABLE;
+
+-- Payment count and amount since a date
+CREATE OR REPLACE FUNCTION payment_summary(since TIMESTAMP)
+RETURNS TABLE (count BIGINT, total NUMERIC) AS $$
+    SELECT
+        (COALESCE(SUM(d.count), 0) + (SELECT COUNT(*) FROM payments p
+                                      WHERE p.created_at >= since AND p.created_at < since::DATE + 1))::BIGINT,
+        COALESCE(SUM(d.total), 0) + (SELECT COALESCE(SUM(p.amount), 0) FROM payments p
+                                     WHERE p.created_at >= since AND p.created_at < since::DATE + 1)
+    FROM payment_daily d
+    WHERE d.day > since::DATE;
+$$ LANGUAGE sql STABLE;
+
+-- Customer activity
+-- Last invoice, quote and payment and lifetime amounts of every customer, kept
+-- up to date by triggers, so "active since" is an index range count and
+-- customer lists can be sorted by recent activity
+CREATE TABLE IF NOT EXISTS customer_activity (
+    customer_id INTEGER PRIMARY KEY REFERENCES customers(id) ON DELETE CASCADE,
+    last_invoice_at TIMESTAMP,
+    last_quote_at TIMESTAMP,
+    last_payment_at TIMESTAMP,
+    last_activity_at TIMESTAMP,
+    lifetime_billed NUMERIC NOT NULL DEFAULT 0,
+    lifetime_paid NUMERIC NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_customer_activity_last_activity ON customer_activity(last_activity_at);
+CREATE INDEX IF NOT EXISTS idx_customer_activity_lifetime_billed ON customer_activity(lifetime_billed);
+
+-- Recompute the activity row of one customer from its indexed invoices, quotes and payments
+CREATE OR REPLACE FUNCTION refresh_customer_activity(activity_customer_id INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF activity_customer_id IS NULL OR NOT EXISTS (SELECT 1 FROM customers WHERE id = activity_customer_id) THEN
+        RETURN;
+    END IF;
+    INSERT INTO customer_activity AS a (
+        customer_id, last_invoice_at, last_quote_at, last_payment_at, lifetime_billed, lifetime_paid
+    )
+    SELECT
+        activity_customer_id,
+        (SELECT MAX(created_at) FROM invoices WHERE customer_id = activity_customer_id),
+        (SELECT MAX(created_at) FROM quotes WHERE customer_id = activity_customer_id),
+        (SELECT MAX(created_at) FROM payments WHERE customer_id = activity_customer_id),
+        COALESCE((SELECT SUM(total_amount) FROM invoices WHERE customer_id = activity_customer_id AND status <> 'draft'), 0),
+        COALESCE((SELECT SUM(amount) FROM payments WHERE customer_id = activity_customer_id), 0)
+    ON CONFLICT (customer_id) DO UPDATE SET
+        last_invoice_at = EXCLUDED.last_invoice_at,
+        last_quote_at = EXCLUDED.last_quote_at,
+        last_payment_at = EXCLUDED.last_payment_at,
+        lifetime_billed = EXCLUDED.lifetime_billed,
+        lifetime_paid = EXCLUDED.lifetime_paid;
+    UPDATE customer_activity
+    SET last_activity_at = GREATEST(last_invoice_at, last_quote_at, last_payment_at)
+    WHERE customer_id = activity_customer_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_customer_activity()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'customers' THEN
+        PERFORM refresh_customer_activity(NEW.id);
+    ELSIF TG_OP = 'INSERT' THEN
+        PERFORM refresh_customer_activity(NEW.customer_id);
+    ELSE
+        PERFORM refresh_customer_activity(OLD.customer_id);
+        IF TG_OP = 'UPDATE' AND NEW.customer_id IS DISTINCT FROM OLD.customer_id THEN
+            PERFORM refresh_customer_activity(NEW.customer_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS customers_activity ON customers;
+CREATE TRIGGER customers_activity
+    AFTER INSERT ON customers
+    FOR EACH ROW EXECUTE FUNCTION maintain_customer_activity();
+
+DROP TRIGGER IF EXISTS invoices_activity ON invoices;
+CREATE TRIGGER invoices_activity
+    AFTER INSERT OR DELETE OR UPDATE OF customer_id, status, total_amount, created_at ON invoices
+    FOR EACH ROW EXECUTE FUNCTION maintain_customer_activity();
+
+DROP TRIGGER IF EXISTS quotes_activity ON quotes;
+CREATE TRIGGER quotes_activity
+    AFTER INSERT OR DELETE OR UPDATE OF customer_id, created_at ON quotes
+    FOR EACH ROW EXECUTE FUNCTION maintain_customer_activity();
+
+DROP TRIGGER IF EXISTS payments_activity ON payments;
+CREATE TRIGGER payments_activity
+    AFTER INSERT OR DELETE OR UPDATE OF customer_id, amount, created_at ON payments
+    FOR EACH ROW EXECUTE FUNCTION maintain_customer_activity();
+
+-- Recompute the activity of every customer in bulk
+CREATE OR REPLACE FUNCTION rebuild_customer_activity()
+RETURNS TABLE (rollup TEXT, rows BIGINT) AS $$
+BEGIN
+    LOCK TABLE customers, invoices, quotes, payments IN SHARE MODE;
+    DELETE FROM customer_activity;
+    INSERT INTO customer_activity (
+        customer_id, last_invoice_at, last_quote_at, last_payment_at, last_activity_at, lifetime_billed, lifetime_paid
+    )
+    SELECT c.id, i.last_at, q.last_at, p.last_at, GREATEST(i.last_at, q.last_at, p.last_at),
+           COALESCE(i.billed, 0), COALESCE(p.paid, 0)
+    FROM customers c
+    LEFT JOIN (
+        SELECT customer_id, MAX(created_at) AS last_at, SUM(total_amount) FILTER (WHERE status <> 'draft') AS billed
+        FROM invoices GROUP BY customer_id
+    ) i ON i.customer_id = c.id
+    LEFT JOIN (SELECT customer_id, MAX(created_at) AS last_at FROM quotes GROUP BY customer_id) q ON q.customer_id = c.id
+    LEFT JOIN (
+        SELECT customer_id, MAX(created_at) AS last_at, SUM(amount) AS paid FROM payments GROUP BY customer_id
+    ) p ON p.customer_id = c.id;
+
+    RETURN QUERY SELECT 'customer_activity', (SELECT COUNT(*) FROM customer_activity);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Total customers, customers created since a date and customers active since it
+DROP FUNCTION IF EXISTS customer_summary(TIMESTAMP);
+CREATE OR REPLACE FUNCTION customer_summary(since TIMESTAMP)
+RETURNS TABLE (total BIGINT, new BIGINT, active BIGINT) AS $$
+    SELECT
+        COALESCE(SUM(d.count), 0)::BIGINT,
+        (COALESCE(SUM(d.count) FILTER (WHERE d.day > since::DATE), 0)
+         + (SELECT COUNT(*) FROM customers c WHERE c.created_at >= since AND c.created_at < since::DATE + 1))::BIGINT,
+        (SELECT COUNT(*) FROM customer_activity a WHERE a.last_activity_at >= since)
+    FROM customer_daily d;
+$$ LANGUAGE sql STABLE;
+
+-- Count and amount of a rollup per day, week or month between two dates
+-- Feeds /api/v1/analytics/timeseries; customer_daily has no status or amount
+CREATE OR REPLACE FUNCTION rollup_timeseries(rollup TEXT, since DATE, until DATE, granularity TEXT, status_filter VARCHAR DEFAULT NULL)
+RETURNS TABLE (period DATE, count BIGINT, total NUMERIC) AS $$
+BEGIN
+    IF rollup NOT IN ('invoice_daily', 'quote_daily', 'payment_daily', 'customer_daily') THEN
+        RAISE EXCEPTION 'Unknown rollup %', rollup;
+    END IF;
+    IF granularity NOT IN ('day', 'week', 'month') THEN
+        RAISE EXCEPTION 'Unknown granularity %', granularity;
+    END IF;
+    RETURN QUERY EXECUTE format(
+        'SELECT date_trunc($1, d.day)::DATE, SUM(d.count)::BIGINT, %s
+         FROM %I d
+         WHERE d.day BETWEEN $2 AND $3 %s
+         GROUP BY 1 ORDER BY 1',
+        CASE WHEN rollup = 'customer_daily' THEN '0::NUMERIC' ELSE 'SUM(d.total)' END,
+        rollup,
+        CASE WHEN status_filter IS NULL OR rollup = 'customer_daily' THEN '' ELSE 'AND d.status = $4' END
+    ) USING granularity, since, until, status_filter;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Receivables
+-- Amount paid and still owed on every invoice, kept up to date by triggers on
+-- invoices and payments. Aging buckets depend on today's date so they are
+-- computed when read, from the open rows only (issued, not marked paid, balance left)
+CREATE TABLE IF NOT EXISTS invoice_balances (
+    invoice_id INTEGER PRIMARY KEY REFERENCES invoices(id) ON DELETE CASCADE,
+    customer_id INTEGER,
+    status VARCHAR,
+    due_date DATE,
+    created_at TIMESTAMP,
+    total_amount NUMERIC NOT NULL DEFAULT 0,
+    paid NUMERIC NOT NULL DEFAULT 0,
+    balance NUMERIC GENERATED ALWAYS AS (total_amount - paid) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_invoice_balances_open ON invoice_balances(due_date)
+    WHERE balance > 0 AND status NOT IN ('draft', 'paid');
+
+-- Recompute the balance row of one invoice
+CREATE OR REPLACE FUNCTION refresh_invoice_balance(balance_invoice_id INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF balance_invoice_id IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO invoice_balances (invoice_id, customer_id, status, due_date, created_at, total_amount, paid)
+    SELECT i.id, i.customer_id, i.status, i.due_date, i.created_at, COALESCE(i.total_amount, 0),
+           COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.invoice_id = i.id), 0)
+    FROM invoices i
+    WHERE i.id = balance_invoice_id
+    ON CONFLICT (invoice_id) DO UPDATE SET
+        customer_id = EXCLUDED.customer_id,
+        status = EXCLUDED.status,
+        due_date = EXCLUDED.due_date,
+        created_at = EXCLUDED.created_at,
+        total_amount = EXCLUDED.total_amount,
+        paid = EXCLUDED.paid;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_invoice_balance()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'invoices' THEN
+        PERFORM refresh_invoice_balance(NEW.id);
+    ELSIF TG_OP = 'INSERT' THEN
+        PERFORM refresh_invoice_balance(NEW.invoice_id);
+    ELSE
+        PERFORM refresh_invoice_balance(OLD.invoice_id);
+        IF TG_OP = 'UPDATE' AND NEW.invoice_id IS DISTINCT FROM OLD.invoice_id THEN
+            PERFORM refresh_invoice_balance(NEW.invoice_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invoices_balance ON invoices;
+CREATE TRIGGER invoices_balance
+    AFTER INSERT OR UPDATE OF customer_id, status, due_date, total_amount, created_at ON invoices
+    FOR EACH ROW EXECUTE FUNCTION maintain_invoice_balance();
+
+DROP TRIGGER IF EXISTS payments_balance ON payments;
+CREATE TRIGGER payments_balance
+    AFTER INSERT OR DELETE OR UPDATE OF invoice_id, amount ON payments
+    FOR EACH ROW EXECUTE FUNCTION maintain_invoice_balance();
+
+-- Recompute every balance from invoices and payments
+CREATE OR REPLACE FUNCTION rebuild_invoice_balances()
+RETURNS TABLE (rollup TEXT, rows BIGINT) AS $$
+BEGIN
+    LOCK TABLE invoices, payments IN SHARE MODE;
+    DELETE FROM invoice_balances;
+    INSERT INTO invoice_balances (invoice_id, customer_id, status, due_date, created_at, total_amount, paid)
+    SELECT i.id, i.customer_id, i.status, i.due_date, i.created_at, COALESCE(i.total_amount, 0), COALESCE(p.paid, 0)
+    FROM invoices i
+    LEFT JOIN (SELECT invoice_id, SUM(amount) AS paid FROM payments GROUP BY invoice_id) p ON p.invoice_id = i.id;
+
+    RETURN QUERY SELECT 'invoice_balances', (SELECT COUNT(*) FROM invoice_balances);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Amount still owed on issued invoices created since a date
+CREATE OR REPLACE FUNCTION receivable_summary(since TIMESTAMP)
+RETURNS TABLE (count BIGINT, total NUMERIC) AS $$
+    SELECT COUNT(*), COALESCE(SUM(b.balance), 0)
+    FROM invoice_balances b
+    WHERE b.balance > 0 AND b.status NOT IN ('draft', 'paid') AND b.created_at >= since;
+$$ LANGUAGE sql STABLE;
+
+-- Open balances per customer, bucketed by days past due on a date
+CREATE OR REPLACE FUNCTION receivables_aging(as_of DATE DEFAULT CURRENT_DATE, aging_customer_id INTEGER DEFAULT NULL)
+RETURNS TABLE (
+    customer_id INTEGER, customer_name VARCHAR, invoices BIGINT, current NUMERIC, days_1_30 NUMERIC,
+    days_31_60 NUMERIC, days_61_90 NUMERIC, days_over_90 NUMERIC, total NUMERIC
+) AS $$
+    SELECT
+        b.customer_id,
+        c.name,
+        COUNT(*),
+        COALESCE(SUM(b.balance) FILTER (WHERE b.due_date IS NULL OR as_of - b.due_date <= 0), 0),
+        COALESCE(SUM(b.balance) FILTER (WHERE as_of - b.due_date BETWEEN 1 AND 30), 0),
+        COALESCE(SUM(b.balance) FILTER (WHERE as_of - b.due_date BETWEEN 31 AND 60), 0),
+        COALESCE(SUM(b.balance) FILTER (WHERE as_of - b.due_date BETWEEN 61 AND 90), 0),
+        COALESCE(SUM(b.balance) FILTER (WHERE as_of - b.due_date > 90), 0),
+        SUM(b.balance)
+    FROM invoice_balances b
+    LEFT JOIN customers c ON c.id = b.customer_id
+    WHERE b.balance > 0 AND b.status NOT IN ('draft', 'paid')
+      AND (b.created_at IS NULL OR b.created_at::DATE <= as_of)
+      AND (aging_customer_id IS NULL OR b.customer_id = aging_customer_id)
+    GROUP BY b.customer_id, c.name;
+$$ LANGUAGE sql STABLE;
+
+-- Full-text search
+-- A weighted tsvector per searchable row (A: number or name, B: contact or
+-- reference, C: the rest, D: notes) indexed with GIN on the expression, so
+-- /api/v1/search is one index scan per entity type and rows returned by the
+-- API carry no extra column. The 'simple' config does not stem, which keeps
+-- prefix matches on numbers and references predictable
+ALTER TABLE customers DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE invoices DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE quotes DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE payments DROP COLUMN IF EXISTS search_vector;
+
+CREATE OR REPLACE FUNCTION customer_search_vector(
+    name VARCHAR, email VARCHAR, phone VARCHAR, city VARCHAR, country VARCHAR, tax_number VARCHAR, notes TEXT
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(name, '')), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(email, '') || ' ' || COALESCE(phone, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE(city, '') || ' ' || COALESCE(country, '') || ' ' || COALESCE(tax_number, '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(notes, '')), 'D');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Invoices and quotes: number, status, notes and terms
+CREATE OR REPLACE FUNCTION document_search_vector(number VARCHAR, status VARCHAR, notes TEXT, terms TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(number, '')), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(status, '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(notes, '') || ' ' || COALESCE(terms, '')), 'D');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION payment_search_vector(reference_number VARCHAR, payment_method VARCHAR, status VARCHAR, notes TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(reference_number, '')), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(payment_method, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE(status, '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(notes, '')), 'D');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- The search functions below repeat these expressions exactly, so they use the indexes
+CREATE INDEX IF NOT EXISTS idx_customers_search ON customers
+    USING GIN (customer_search_vector(name, email, phone, city, country, tax_number, notes));
+CREATE INDEX IF NOT EXISTS idx_invoices_search ON invoices
+    USING GIN (document_search_vector(invoice_number, status, notes, terms));
+CREATE INDEX IF NOT EXISTS idx_quotes_search ON quotes
+    USING GIN (document_search_vector(quote_number, status, notes, terms));
+CREATE INDEX IF NOT EXISTS idx_payments_search ON payments
+    USING GIN (payment_search_vector(reference_number, payment_method, status, notes));
+
+-- One page of ranked matches per entity type. query is a to_tsquery string of
+-- prefix terms ('inv:* & 2024:*'); total counts every match, not just the page
+CREATE OR REPLACE FUNCTION search_customers(query TEXT, max_results INTEGER DEFAULT 10, skip INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER, title VARCHAR, detail TEXT, status VARCHAR, amount NUMERIC,
+    customer_id INTEGER, customer_name VARCHAR, created_at TIMESTAMP, rank REAL, total BIGINT
+) AS $$
+    SELECT c.id, c.name, CONCAT_WS(' · ', c.email, c.phone, c.city), NULL::VARCHAR, NULL::NUMERIC,
+           c.id, c.name, c.created_at, ts_rank(customer_search_vector(c.name, c.email, c.phone, c.city, c.country, c.tax_number, c.notes), q), COUNT(*) OVER ()
+    FROM customers c, to_tsquery('simple', query) q
+    WHERE customer_search_vector(c.name, c.email, c.phone, c.city, c.country, c.tax_number, c.notes) @@ q
+    ORDER BY 9 DESC, c.id DESC
+    LIMIT max_results OFFSET skip;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_invoices(query TEXT, max_results INTEGER DEFAULT 10, skip INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER, title VARCHAR, detail TEXT, status VARCHAR, amount NUMERIC,
+    customer_id INTEGER, customer_name VARCHAR, created_at TIMESTAMP, rank REAL, total BIGINT
+) AS $$
+    SELECT i.id, i.invoice_number, i.notes, i.status, i.total_amount,
+           i.customer_id, c.name, i.created_at, ts_rank(document_search_vector(i.invoice_number, i.status, i.notes, i.terms), q), COUNT(*) OVER ()
+    FROM invoices i
+    CROSS JOIN to_tsquery('simple', query) q
+    LEFT JOIN customers c ON c.id = i.customer_id
+    WHERE document_search_vector(i.invoice_number, i.status, i.notes, i.terms) @@ q
+    ORDER BY 9 DESC, i.id DESC
+    LIMIT max_results OFFSET skip;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_quotes(query TEXT, max_results INTEGER DEFAULT 10, skip INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER, title VARCHAR, detail TEXT, status VARCHAR, amount NUMERIC,
+    customer_id INTEGER, customer_name VARCHAR, created_at TIMESTAMP, rank REAL, total BIGINT
+) AS $$
+    SELECT qu.id, qu.quote_number, qu.notes, qu.status, qu.total_amount,
+           qu.customer_id, c.name, qu.created_at, ts_rank(document_search_vector(qu.quote_number, qu.status, qu.notes, qu.terms), q), COUNT(*) OVER ()
+    FROM quotes qu
+    CROSS JOIN to_tsquery('simple', query) q
+    LEFT JOIN customers c ON c.id = qu.customer_id
+    WHERE document_search_vector(qu.quote_number, qu.status, qu.notes, qu.terms) @@ q
+    ORDER BY 9 DESC, qu.id DESC
+    LIMIT max_results OFFSET skip;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_payments(query TEXT, max_results INTEGER DEFAULT 10, skip INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER, title VARCHAR, detail TEXT, status VARCHAR, amount NUMERIC,
+    customer_id INTEGER, customer_name VARCHAR, created_at TIMESTAMP, rank REAL, total BIGINT
+) AS $$
+    SELECT p.id, COALESCE(p.reference_number, p.payment_method), p.notes, p.status, p.amount,
+           p.customer_id, c.name, p.created_at, ts_rank(payment_search_vector(p.reference_number, p.payment_method, p.status, p.notes), q), COUNT(*) OVER ()
+    FROM payments p
+    CROSS JOIN to_tsquery('simple', query) q
+    LEFT JOIN customers c ON c.id = p.customer_id
+    WHERE payment_search_vector(p.reference_number, p.payment_method, p.status, p.notes) @@ q
+    ORDER BY 9 DESC, p.id DESC
+    LIMIT max_results OFFSET skip;
+$$ LANGUAGE sql STABLE;
+
+-- Backfill the rollups, balances and customer activity from existing data
+SELECT * FROM rebuild_daily_rollups();
+SELECT * FROM rebuild_invoice_balances();
+SELECT * FROM rebuild_customer_activity();
@@ -1,40 +1,39 @@
-
+from typing import Optional
 from fastapi import Depends, HTTPException, Request, status
-from app.core.security import verify_token
-from app.core.database import get_supabase
-from supabase import Client
+from app.core.security import verify_token, user_for_token
+from app.core.database import get_supabase, DatabaseClient
+
+
+async def user_from_cookie(request: Request, supabase: DatabaseClient) -> Optional[dict]:
+    """User of the auth_token cookie (None if missing or invalid), verified once per request"""
+    # Resolved from the user cache or the token claims, so a page render needs no database call
+    if hasattr(request.state, "user"):
+        return request.state.user
 
-async def get_current_user_from_cookie(request: Request, supabase: Client = Depends(get_supabase)) -> dict:
+    user = None
     token = request.cookies.get("auth_token")
-    if not token:
+    payload = verify_token(token) if token else None
+    if payload is not None and payload.get("sub") is not None:
+        user = await user_for_token(supabase, payload)
+
+    request.state.user = user
+    return user
+
+
+async def get_current_user_from_cookie(request: Request, supabase: DatabaseClient = Depends(get_supabase)) -> dict:
+    if not request.cookies.get("auth_token"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    payload = verify_token(token)
-    if payload is None:
+    user = await user_from_cookie(request, supabase)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    response = supabase.table("users").select("*").eq("id", user_id).execute()
-    if not response.data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return response.data[0]
+    return user
@@ -1,14 +1,64 @@
 """
 API proxy routes for the ERP system frontend
 """
+from typing import Optional
 from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
+from app.core.config import settings
 
 router = APIRouter()
 
-# Define the backend API base URL
-BACKEND_URL = "http://localhost:8000/api/v1"
+# Backend used when FRONTEND_BACKEND_URL is empty and no app was registered
+DEFAULT_BACKEND_URL = "http://localhost:8000/api/v1"
+
+# Headers that belong to one connection, never forwarded by the proxy
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade"
+}
+
+_backend_app = None
+_client: Optional[httpx.AsyncClient] = None
+
+
+def use_backend_app(app):
+    """Serve proxied calls by calling this ASGI app in-process instead of over the network"""
+    global _backend_app
+    _backend_app = app
+
+
+def get_client() -> httpx.AsyncClient:
+    """The proxy's long-lived client, created on first use.
+
+    In-process, httpx's ASGITransport collects the whole backend response
+    before returning it, so proxied responses are buffered in memory (no
+    network hop, but no streaming either). With FRONTEND_BACKEND_URL the
+    response is streamed through as it arrives.
+    """
+    global _client
+    if _client is None:
+        if _backend_app is not None and not settings.FRONTEND_BACKEND_URL:
+            _client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=_backend_app),
+                base_url="http://backend/api/v1"
+            )
+        else:
+            _client = httpx.AsyncClient(
+                base_url=settings.FRONTEND_BACKEND_URL or DEFAULT_BACKEND_URL,
+                limits=httpx.Limits(max_connections=settings.FRONTEND_PROXY_MAX_CONNECTIONS,
+                                    max_keepalive_connections=settings.FRONTEND_PROXY_MAX_KEEPALIVE)
+            )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 @router.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_api(request: Request, path: str):
@@ -19,28 +69,29 @@ async def proxy_api(request: Request, path: str):
 
     headers = {
         "Authorization": f"Bearer {auth_token}",
-        "Content-Type": "application/json"
+        "Content-Type": request.headers.get("content-type", "application/json"),
+        "Accept": request.headers.get("accept", "application/json")
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # Construct the full backend URL
-            url = f"{BACKEND_URL}/{path}"
-
-            # Read request data
-            data = await request.body()
-
-            # Make the request to the backend API
-            response = await client.request(
-                method=request.method,
-                url=url,
-                headers=headers,
-                content=data,
-                params=request.query_params
-            )
+    client = get_client()
+    try:
+        # Body, status and headers go through as they are, without decoding the JSON
+        # (buffered by the in-process transport, streamed from a remote backend)
+        backend_request = client.build_request(
+            method=request.method,
+            url=path,
+            headers=headers,
+            content=request.stream(),
+            params=request.query_params.multi_items()
+        )
+        response = await client.send(backend_request, stream=True)
 
-            # Return the response from the backend
-            return JSONResponse(content=response.json(), status_code=response.status_code)
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred while contacting the backend API: {e}")
 
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail=f"An error occurred while contacting the backend API: {e}")
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers={name: value for name, value in response.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS},
+        background=BackgroundTask(response.aclose)
+    )
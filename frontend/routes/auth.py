@@ -1,10 +1,11 @@
 """
 Authentication routes for the ERP system frontend
 """
-from fastapi import APIRouter, Request, Form, Depends
+from fastapi import APIRouter, Request, Form, Depends, HTTPException, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-import httpx
+from app.core.database import get_supabase, DatabaseClient
+from app.services.auth import login
 
 router = APIRouter()
 templates = Jinja2Templates(directory="frontend/templates")
@@ -21,39 +22,37 @@ async def login_page(request: Request):
 
 
 @router.post("/login")
-async def login_submit(request: Request, username: str = Form(...), password: str = Form(...)):
+async def login_submit(
+    request: Request,
+    username: str = Form(...),
+    password: str = Form(...),
+    supabase: DatabaseClient = Depends(get_supabase)
+):
     """Handle login form submission"""
     try:
-        # Make request to our own login API
-        async with httpx.AsyncClient() as client:
-            login_response = await client.post(
-                "http://localhost:8000/api/v1/auth/login",
-                data={"username": username, "password": password}
-            )
+        # Same login as the API, called in-process
+        auth_data = await login(supabase, username, password)
+        auth_token = auth_data['access_token']
 
-            if login_response.status_code == 200:
-                # Login successful, set auth token
-                auth_data = login_response.json()
-                auth_token = auth_data.get('access_token', 'authenticated')
-
-                # Create redirect response and set cookie
-                response = RedirectResponse(url="/", status_code=302)
-                response.set_cookie(
-                    key="auth_token",
-                    value=auth_token,
-                    max_age=86400,  # 24 hours
-                    httponly=True,
-                    secure=False  # Set to True in production with HTTPS
-                )
-                return response
-            else:
-                # Login failed
-                return templates.TemplateResponse("login.html", {
-                    "request": request,
-                    "error": "Invalid username or password",
-                    "user": None
-                })
+        # Create redirect response and set cookie
+        response = RedirectResponse(url="/", status_code=302)
+        response.set_cookie(
+            key="auth_token",
+            value=auth_token,
+            max_age=86400,  # 24 hours
+            httponly=True,
+            secure=False  # Set to True in production with HTTPS
+        )
+        return response
 
+    except HTTPException as e:
+        # Login failed
+        return templates.TemplateResponse("login.html", {
+            "request": request,
+            "error": "Too many sign-ins right now. Please try again in a moment."
+            if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE else "Invalid username or password",
+            "user": None
+        })
     except Exception as e:
         print(f"Login error: {e}")
         return templates.TemplateResponse("login.html", {
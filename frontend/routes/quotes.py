@@ -2,7 +2,7 @@ from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
-from .utils import get_mock_user, get_current_user_info, authenticate_user
+from frontend.utils import authenticate_user
 
 router = APIRouter()
 templates = Jinja2Templates(directory="frontend/templates")
@@ -1,8 +1,11 @@
 """
 Utility functions for frontend routes
 """
-from app.core.database import get_supabase_service
+from app.core.database import get_supabase, get_supabase_service
+from app.schemas.customer import CUSTOMER_COLUMNS
+from app.schemas.invoice import INVOICE_COLUMNS
 from fastapi import Request
+from frontend.auth import user_from_cookie
 
 
 async def fetch_customers_summary():
@@ -67,7 +70,7 @@ async def fetch_customers_list():
     """Fetch customers list from the database"""
     try:
         supabase = get_supabase_service()
-        response = supabase.table('customers').select('*').limit(50).execute()
+        response = await supabase.table('customers').select(CUSTOMER_COLUMNS['list']).limit(50).execute()
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching customers list: {e}")
@@ -78,7 +81,7 @@ async def fetch_invoices_list():
     """Fetch invoices list from the database"""
     try:
         supabase = get_supabase_service()
-        response = supabase.table('invoices').select('*').limit(50).execute()
+        response = await supabase.table('invoices').select(INVOICE_COLUMNS['list']).limit(50).execute()
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching invoices list: {e}")
@@ -87,32 +90,23 @@ async def fetch_invoices_list():
 
 async def get_current_user_info(request: Request = None):
     """Get current authenticated user information"""
-    try:
-        # Check for authentication token in cookies
-        if request:
-            auth_token = request.cookies.get('auth_token')
-            if not auth_token:
-                return None  # No authentication token found
-
-        import httpx
-        from app.core.database import get_supabase_service
-        supabase = get_supabase_service()
+    if request is None:
+        return None
 
-        # Get the first active user from the database as current user
-        response = supabase.table('users').select('*').eq('is_active', True).limit(1).execute()
-
-        if response.data and len(response.data) > 0:
-            user = response.data[0]
-            return {
-                "id": user.get('id'),
-                "full_name": user.get('full_name', 'Admin User'),
-                "email": user.get('email', 'admin@admin.com'),
-                "role": user.get('role', 'admin'),
-                "is_active": user.get('is_active', True),
-                "is_authenticated": True
-            }
-        else:
-            return None  # No user found
+    try:
+        # The user the auth_token cookie was issued to
+        user = await user_from_cookie(request, get_supabase())
+        if not user:
+            return None  # No valid authentication token found
+
+        return {
+            "id": user.get('id'),
+            "full_name": user.get('full_name') or 'Admin User',
+            "email": user.get('email'),
+            "role": user.get('role', 'user'),
+            "is_active": user.get('is_active', True),
+            "is_authenticated": True
+        }
 
     except Exception as e:
         print(f"Error getting current user: {e}")
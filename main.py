@@ -1,23 +1,43 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from typing import Optional
 import uvicorn
-from supabase import Client
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import init_db, get_supabase_service
+from app.core.database import init_db, warm_db_pool, close_db, supabase_client, get_supabase_service, DatabaseClient
+from app.core.dataloader import DataLoaderMiddleware
+from app.core.pagination import TOTAL_MODE_PATTERN, execute_paginated
+from app.core.query_log import QueryLogMiddleware, query_stats
+from app.core.cache import user_cache
+from app.core.revocation import revocation_list
+from app.core.passwords import password_pool
+from app.core.security import get_current_admin_user
+from app.services.summary_cache import summary_cache
+from app.services.dashboard_stream import dashboard_broadcaster
+from app.services.invoices import with_balances
+from app.services.customer_search import customer_index, as_client, MAX_LIMIT as MAX_SEARCH_LIMIT
+from app.schemas.invoice import INVOICE_COLUMNS
 from frontend.main import app as frontend_app
+from frontend.routes.api import use_backend_app, close_client as close_proxy_client
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     # Startup
     await init_db()
+    await warm_db_pool()
+    customer_index.warm()
+    if settings.AUTH_MODE == "claims":
+        await revocation_list.start()
     yield
     # Shutdown
-    pass
+    await revocation_list.stop()
+    password_pool.shutdown()
+    await close_proxy_client()
+    await close_db()
 
 
 app = FastAPI(
@@ -38,8 +58,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing"],
 )
 
+# Request-scoped batching of lookups by key
+app.add_middleware(DataLoaderMiddleware)
+
+# Per-request database round-trip accounting (Server-Timing header)
+app.add_middleware(QueryLogMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -59,29 +86,58 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db-pool")
+async def db_pool_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Database connection pool statistics, for sizing DB_POOL_* settings"""
+    return supabase_client.pool_stats()
+
+
+@app.get("/health/db-queries")
+async def db_query_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Database round trips per endpoint, slowest first"""
+    return query_stats.snapshot()
+
+
+@app.get("/health/summary-cache")
+async def summary_cache_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Dashboard summary cache hit rates, and connected live dashboards"""
+    return {**summary_cache.stats(), "stream": dashboard_broadcaster.stats()}
+
+
+@app.get("/health/user-cache")
+async def user_cache_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Authenticated user cache hit rates, and the claims mode revocation list"""
+    return {**user_cache.stats(), "auth_mode": settings.AUTH_MODE, "revocation": revocation_list.stats()}
+
+
+@app.get("/health/customer-search")
+async def customer_search_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Size and freshness of the customer typeahead index"""
+    return customer_index.stats()
+
+
+@app.get("/health/password-pool")
+async def password_pool_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Password hashing cost and saturation, for sizing PASSWORD_POOL_WORKERS"""
+    return password_pool.stats()
+
+
 @app.get("/api/v1/client/search")
-async def client_search_main(supabase: Client = Depends(get_supabase_service)):
-    """Client search endpoint directly in main app - fetches real data"""
+async def client_search_main(
+    q: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Client typeahead search directly in main app - served from the customer index"""
     try:
-        response = supabase.table('customers').select('*').execute()
-        customers = response.data or []
-        
-        # Format data for frontend compatibility
-        formatted_customers = []
-        for customer in customers:
-            formatted_customers.append({
-                "_id": str(customer.get('id', '')),
-                "id": customer.get('id'),
-                "name": customer.get('name', ''),
-                "email": customer.get('email', ''),
-                "phone": customer.get('phone', ''),
-                "city": customer.get('city', ''),
-                "country": customer.get('country', '')
-            })
+        if q:
+            customers = await customer_index.search(supabase, q, limit)
+        else:
+            customers = await customer_index.customers(supabase, limit)
         
         return {
             "success": True,
-            "result": formatted_customers
+            "result": [as_client(customer) for customer in customers]
         }
     except Exception as e:
         print(f"Error fetching customers: {e}")
@@ -98,31 +154,21 @@ async def client_search_main(supabase: Client = Depends(get_supabase_service)):
 
 # Frontend compatibility endpoints
 @app.get("/clients")
-async def clients_endpoint(supabase: Client = Depends(get_supabase_service)):
-    """Frontend compatibility endpoint for /clients - fetches real data"""
+async def clients_endpoint(
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_SEARCH_LIMIT),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
+    """Frontend compatibility endpoint for /clients - every client, or the best matches for q"""
     try:
-        response = supabase.table('customers').select('*').execute()
-        customers = response.data or []
-        
-        # Format data for frontend compatibility
-        formatted_customers = []
-        for customer in customers:
-            formatted_customers.append({
-                "_id": str(customer.get('id', '')),
-                "id": customer.get('id'),
-                "name": customer.get('name', ''),
-                "email": customer.get('email', ''),
-                "phone": customer.get('phone', ''),
-                "city": customer.get('city', ''),
-                "country": customer.get('country', ''),
-                "address": customer.get('address', ''),
-                "state": customer.get('state', ''),
-                "zipCode": customer.get('zip_code', '')
-            })
+        if q:
+            customers = await customer_index.search(supabase, q, limit or MAX_SEARCH_LIMIT)
+        else:
+            customers = await customer_index.customers(supabase, limit)
         
         return {
             "success": True,
-            "result": formatted_customers
+            "result": [as_client(customer) for customer in customers]
         }
     except Exception as e:
         print(f"Error fetching clients: {e}")
@@ -137,28 +183,47 @@ async def clients_endpoint(supabase: Client = Depends(get_supabase_service)):
         }
 
 
+async def invoices_page(supabase: DatabaseClient, response: Response, skip: int, limit: int,
+                        cursor: Optional[str], total: Optional[str]) -> list:
+    """One page of invoices, newest first, with customer and balance"""
+    query = supabase.table('invoices').select(f"{INVOICE_COLUMNS['list']}, customers(name, email)")
+    result = await execute_paginated(supabase, 'invoices', query, response, skip, limit, cursor, total)
+    return await with_balances(supabase, result.data)
+
+
 @app.get("/invoices")
-async def invoices_endpoint(supabase: Client = Depends(get_supabase_service)):
+async def invoices_endpoint(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
     """Frontend compatibility endpoint for /invoices - fetches real data without authentication"""
     try:
-        response = supabase.table('invoices').select('*, customers(name, email)').execute()
-        invoices = response.data or []
+        invoices = await invoices_page(supabase, response, skip, limit, cursor, total)
         
         # Format data for frontend compatibility
         formatted_invoices = []
         for invoice in invoices:
             customer = invoice.get('customers', {})
+            total_amount = float(invoice.get('total_amount') or 0)
+            tax = float(invoice.get('tax_amount') or 0)
+            discount = float(invoice.get('discount_amount') or 0)
             formatted_invoices.append({
                 "_id": str(invoice.get('id', '')),
                 "id": invoice.get('id'),
-                "number": invoice.get('number', ''),
+                "number": invoice.get('invoice_number') or '',
                 "status": invoice.get('status', 'draft'),
-                "total": float(invoice.get('total', 0)),
-                "subtotal": float(invoice.get('subtotal', 0)),
-                "tax": float(invoice.get('tax', 0)),
-                "discount": float(invoice.get('discount', 0)),
-                "date": invoice.get('date', ''),
-                "due_date": invoice.get('due_date', ''),
+                "total": total_amount,
+                "subtotal": round(total_amount - tax + discount, 2),
+                "tax": tax,
+                "discount": discount,
+                "paid_amount": invoice['paid_amount'],
+                "balance_due": invoice['balance_due'],
+                "date": invoice.get('issue_date') or '',
+                "due_date": invoice.get('due_date') or '',
                 "customer_id": invoice.get('customer_id'),
                 "customer_name": customer.get('name', '') if customer else '',
                 "customer_email": customer.get('email', '') if customer else '',
@@ -170,6 +235,9 @@ async def invoices_endpoint(supabase: Client = Depends(get_supabase_service)):
             "success": True,
             "result": formatted_invoices
         }
+    except ValueError as e:
+        # Malformed cursor
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error fetching invoices: {e}")
         # Fallback to mock data if database fails
@@ -184,11 +252,17 @@ async def invoices_endpoint(supabase: Client = Depends(get_supabase_service)):
 
 
 @app.get("/api/v1/invoices-public")
-async def invoices_public_endpoint(supabase: Client = Depends(get_supabase_service)):
+async def invoices_public_endpoint(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
+    supabase: DatabaseClient = Depends(get_supabase_service)
+):
     """Public invoices endpoint without authentication - fetches real data"""
     try:
-        response = supabase.table('invoices').select('*, customers(name, email)').execute()
-        invoices = response.data or []
+        invoices = await invoices_page(supabase, response, skip, limit, cursor, total)
         
         # Format data for frontend compatibility
         formatted_invoices = []
@@ -197,12 +271,14 @@ async def invoices_public_endpoint(supabase: Client = Depends(get_supabase_servi
             formatted_invoices.append({
                 "_id": str(invoice.get('id', '')),
                 "id": invoice.get('id'),
-                "number": invoice.get('number', ''),
+                "number": invoice.get('invoice_number') or '',
                 "status": invoice.get('status', 'draft'),
-                "total": float(invoice.get('total', 0)),
+                "total": float(invoice.get('total_amount') or 0),
+                "paid_amount": invoice['paid_amount'],
+                "balance_due": invoice['balance_due'],
                 "customer_id": invoice.get('customer_id'),
                 "customer_name": customer.get('name', '') if customer else '',
-                "date": invoice.get('date', ''),
+                "date": invoice.get('issue_date') or '',
                 "created_at": invoice.get('created_at', '')
             })
         
@@ -210,6 +286,9 @@ async def invoices_public_endpoint(supabase: Client = Depends(get_supabase_servi
             "success": True,
             "result": formatted_invoices
         }
+    except ValueError as e:
+        # Malformed cursor
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error fetching invoices: {e}")
         return {
@@ -220,3 +299,5 @@ async def invoices_public_endpoint(supabase: Client = Depends(get_supabase_servi
 
 # Mount frontend app last (after all API routes are defined)
 app.mount("/", frontend_app)
+# The frontend's /api proxy calls this app directly
+use_backend_app(app)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily rollup, invoice balance and customer activity tables
+behind the dashboard summaries and the aging report
+
+Triggers keep the rollups current on every write; run this once after
+installing database_summary_functions.sql on an existing database, or after
+bulk loads made with triggers disabled.
+"""
+import asyncio
+from app.core.database import get_supabase_service
+
+async def rebuild_rollups():
+    """Recompute invoice, quote, payment and customer daily rollups, invoice balances and customer activity"""
+    try:
+        supabase = get_supabase_service()
+        rollups = await supabase.rpc('rebuild_daily_rollups', {}).execute()
+        balances = await supabase.rpc('rebuild_invoice_balances', {}).execute()
+        activity = await supabase.rpc('rebuild_customer_activity', {}).execute()
+
+        print("✅ Daily rollups, invoice balances and customer activity rebuilt!")
+        for row in (rollups.data or []) + (balances.data or []) + (activity.data or []):
+            print(f"   - {row['rollup']}: {row['rows']} rows")
+
+    except Exception as e:
+        print(f"❌ Error rebuilding rollups: {e}")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_rollups())
@@ -0,0 +1,82 @@
+"""
+Shared fixtures. Every test runs against the local SQLite stand-in
+(app/core/local_database.py), so no Supabase project or network is needed.
+"""
+import os
+import tempfile
+
+# Settings are read on import, so the environment is set before any app module loads
+os.environ.setdefault("SUPABASE_URL", "http://localhost:9")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DATABASE_BACKEND"] = "local"
+os.environ["LOCAL_DB_PATH"] = ":memory:"
+os.environ["LOCAL_DB_SEED_CUSTOMERS"] = "40"
+os.environ["LOCAL_DB_LATENCY_MS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["SUMMARY_CACHE_DIR"] = tempfile.mkdtemp(prefix="erp_summary_cache_")
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import DatabaseClient
+from app.core.local_database import LOCAL_SUPABASE_URL, LocalDatabase, LocalPostgrestTransport, seed_local_database
+
+
+@pytest.fixture
+def database():
+    """A fresh, seeded SQLite database"""
+    database = LocalDatabase()
+    seed_local_database(database, 40)
+    return database
+
+
+@pytest.fixture
+def transport(database):
+    """PostgREST stand-in over the fresh database, counts round trips in ``requests``"""
+    return LocalPostgrestTransport(database)
+
+
+@pytest.fixture
+def supabase(transport):
+    return DatabaseClient(LOCAL_SUPABASE_URL, "local", transport)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The whole app, with its lifespan, over the shared local database"""
+    import main
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post("/api/v1/auth/login", data={"username": "admin@admin.com", "password": "admin123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def service_client(client):
+    """The service DatabaseClient the app itself uses"""
+    from app.core.database import get_supabase_service
+    return get_supabase_service()
+
+
+@pytest.fixture
+def browser(client):
+    """The app client for page tests, without the cookies they leave behind"""
+    client.cookies.clear()
+    yield client
+    client.cookies.clear()
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    """Fail any outgoing HTTP request, for code that must stay in-process"""
+    async def refuse(self, request, **kwargs):
+        raise AssertionError(f"unexpected HTTP request to {request.url}")
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", refuse)
@@ -0,0 +1,60 @@
+from datetime import date
+
+from app.services.aging import AGING_BUCKETS, aging_report
+
+AS_OF = date(2030, 6, 30)
+
+
+def balance(database, invoice_id):
+    return database.conn.execute("SELECT paid, balance FROM invoice_balances WHERE invoice_id = ?", (invoice_id,)).fetchone()
+
+
+async def test_balances_follow_payments(supabase, database):
+    invoice = (await supabase.table('invoices').insert({'customer_id': 1, 'total_amount': 200, 'status': 'sent'}).execute()).data[0]
+    payment = {'customer_id': 1, 'invoice_id': invoice['id'], 'payment_method': 'cash', 'payment_date': '2030-01-01'}
+
+    first = (await supabase.table('payments').insert({**payment, 'amount': 50}).execute()).data[0]
+    assert tuple(balance(database, invoice['id'])) == (50, 150)
+
+    await supabase.table('payments').update({'amount': 80}).eq('id', first['id']).execute()
+    await supabase.table('payments').insert({**payment, 'amount': 20}).execute()
+    assert tuple(balance(database, invoice['id'])) == (100, 100)
+
+    await supabase.table('payments').delete().eq('id', first['id']).execute()
+    await supabase.table('invoices').update({'total_amount': 250}).eq('id', invoice['id']).execute()
+    assert tuple(balance(database, invoice['id'])) == (20, 230)
+
+
+async def test_open_balances_are_bucketed_by_days_past_due(supabase, database):
+    customer = (await supabase.table('customers').insert({'name': 'Aging Test Co'}).execute()).data[0]
+    for due_date, total, status in [
+        ("2030-07-15", 10, "sent"),     # not due yet
+        ("2030-06-10", 20, "sent"),     # 20 days late
+        ("2030-05-01", 40, "overdue"),  # 60 days late
+        ("2030-01-01", 80, "overdue"),  # 180 days late
+        ("2030-06-01", 160, "paid"),    # marked paid, not open
+        ("2030-06-01", 320, "draft"),   # not issued
+    ]:
+        await supabase.table('invoices').insert({
+            'customer_id': customer['id'], 'total_amount': total, 'status': status,
+            'due_date': due_date, 'created_at': '2029-12-01T00:00:00'
+        }).execute()
+
+    report = await aging_report(supabase, AS_OF, customer['id'])
+    assert report["buckets"] == AGING_BUCKETS
+    (row,) = report["customers"]
+    assert row["customer_name"] == "Aging Test Co" and row["invoices"] == 4
+    assert [row[bucket] for bucket in AGING_BUCKETS] == [10, 20, 40, 0, 80]
+    assert row["total"] == report["overall"]["total"] == 150
+
+
+async def test_report_agrees_with_the_rebuild(supabase):
+    before = await aging_report(supabase, AS_OF)
+    await supabase.rpc('rebuild_invoice_balances', {}).execute()
+    assert await aging_report(supabase, AS_OF) == before
+
+
+def test_aging_endpoint(client, auth_headers):
+    response = client.get("/api/v1/reports/aging", headers=auth_headers, params={"as_of": "2030-06-30"})
+    assert response.status_code == 200
+    assert response.json()["result"]["as_of"] == "2030-06-30"
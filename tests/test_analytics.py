@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from app.services.analytics import buckets, period_start, timeseries
+
+
+def test_buckets_start_on_mondays_and_first_days():
+    assert period_start(date(2026, 10, 15), "week") == date(2026, 10, 12)
+    assert period_start(date(2026, 10, 15), "month") == date(2026, 10, 1)
+    assert buckets(date(2026, 11, 20), date(2027, 2, 3), "month") == [
+        date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1), date(2027, 2, 1)
+    ]
+
+
+def test_ranges_are_limited():
+    with pytest.raises(ValueError):
+        buckets(date(2000, 1, 1), date(2026, 1, 1), "day")
+
+
+async def test_series_match_the_invoices(supabase, database):
+    start, end = date(2025, 10, 1), date(2026, 10, 31)
+    result = await timeseries(supabase, "invoiced", start, end, "month", status="paid")
+
+    expected = dict(database.conn.execute(
+        "SELECT substr(created_at, 1, 7) || '-01', COUNT(*) FROM invoices"
+        " WHERE status = 'paid' AND substr(created_at, 1, 10) BETWEEN ? AND ? GROUP BY 1",
+        (start.isoformat(), end.isoformat())
+    ).fetchall())
+    assert {point["period"]: point["count"] for point in result["series"] if point["count"]} == expected
+    assert expected and result["count"] == sum(expected.values())
+    # Empty months are zeros, not gaps
+    assert len(result["series"]) == 13
+
+
+async def test_comparison_with_the_previous_period(supabase, database):
+    start, end = date(2030, 1, 8), date(2030, 1, 14)
+    payment = {"customer_id": 1, "payment_method": "cash", "payment_date": "2030-01-01"}
+    await supabase.table('payments').insert([
+        {**payment, "amount": 100, "created_at": "2030-01-03T10:00:00"},
+        {**payment, "amount": 150, "created_at": "2030-01-10T10:00:00"},
+    ]).execute()
+
+    result = await timeseries(supabase, "collected", start, end, "week", compare=True)
+    assert result["previous"]["from"] == "2030-01-01" and result["previous"]["to"] == "2030-01-07"
+    assert result["total"] == 150 and result["previous"]["total"] == 100
+    assert result["change"] == {"count": 0.0, "total": 50.0}
+
+
+async def test_series_are_one_round_trip(supabase, transport):
+    requests = transport.requests
+    await timeseries(supabase, "new_customers", date(2026, 1, 1), date(2026, 6, 30), "week")
+    assert transport.requests == requests + 1
+
+
+def test_endpoint_validates_its_parameters(client, auth_headers):
+    ok = client.get("/api/v1/analytics/timeseries", headers=auth_headers, params={"metric": "quoted", "granularity": "week"})
+    assert ok.status_code == 200
+    assert ok.json()["result"]["granularity"] == "week"
+
+    backwards = {"from": "2026-02-01", "to": "2026-01-01"}
+    assert client.get("/api/v1/analytics/timeseries", headers=auth_headers, params=backwards).status_code == 400
+    assert client.get("/api/v1/analytics/timeseries", headers=auth_headers, params={"metric": "profit"}).status_code == 422
+    assert client.get("/api/v1/analytics/timeseries", headers=auth_headers,
+                      params={"metric": "new_customers", "status": "paid"}).status_code == 400
@@ -0,0 +1,82 @@
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.revocation import RevocationList, revocation_list
+from app.services.auth import issue_token
+
+USER_ID = "7f1c6c7e-0000-4000-8000-000000000001"
+CLAIMS = {"sub": USER_ID, "email": "someone@example.com", "full_name": "Some One", "role": "user",
+          "is_superuser": "user", "is_active": True}
+
+
+def queries(response) -> str:
+    return response.headers["server-timing"].split('desc="')[1].split('"')[0]
+
+
+@pytest.fixture
+def claims_mode(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "claims")
+    monkeypatch.setattr(revocation_list, "_users", {})
+    monkeypatch.setattr(revocation_list, "_deleted", {})
+
+
+def test_unknown_users_are_not_revoked():
+    assert not RevocationList().revoked(CLAIMS)
+
+
+@pytest.mark.parametrize("change", [{"role": "admin"}, {"is_superuser": "admin"}, {"is_active": False}])
+def test_role_and_activation_changes_revoke_tokens(change):
+    revocations = RevocationList()
+    revocations.record({"id": USER_ID, "role": "user", "is_superuser": "user", "is_active": True, **change})
+    assert revocations.revoked(CLAIMS)
+
+
+def test_deleted_users_stay_revoked():
+    revocations = RevocationList()
+    revocations.record_deleted(USER_ID)
+    assert revocations.revoked(CLAIMS)
+
+
+def test_claims_user_picks_up_a_new_name(monkeypatch):
+    revocations = RevocationList()
+    revocations.record({"id": USER_ID, "full_name": "Renamed", "role": "user", "is_superuser": "user", "is_active": True})
+    monkeypatch.setattr(security, "revocation_list", revocations)
+
+    user = security.user_from_claims(CLAIMS)
+    assert user["id"] == USER_ID and user["full_name"] == "Renamed" and user["role"] == "user"
+
+
+@pytest.mark.parametrize("claim", ["role", "is_superuser", "is_active"])
+def test_tokens_without_a_trusted_claim_are_rejected(claims_mode, claim):
+    claims = {key: value for key, value in CLAIMS.items() if key != claim}
+    assert security.user_from_claims(claims) is None
+
+
+def test_user_is_built_from_the_claims(claims_mode):
+    admin = security.user_from_claims({**CLAIMS, "is_superuser": "admin"})
+    assert admin["is_superuser"] == "admin" and admin["is_active"] is True
+    assert security.user_from_claims({**CLAIMS, "is_active": False}) is None
+
+
+def test_issued_tokens_carry_every_trusted_claim(client, claims_mode):
+    response = client.post("/api/v1/auth/login", data={"username": "admin@admin.com", "password": "admin123"})
+    claims = security.verify_token(response.json()["access_token"])
+    assert all(claim in claims for claim in security.USER_CLAIMS)
+
+    user = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+    assert user.status_code == 200
+    assert user.json()["email"] == "admin@admin.com"
+
+
+def test_claims_mode_trusts_the_token_until_the_user_changes(client, claims_mode):
+    token = issue_token({"id": USER_ID, **CLAIMS})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Some One"
+    assert queries(response) == "0 queries"
+
+    revocation_list.record({"id": USER_ID, "role": "admin", "is_superuser": "user", "is_active": True})
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
@@ -0,0 +1,23 @@
+import pytest
+
+
+async def test_count_matches_the_rows(supabase, database):
+    assert await supabase.count('customers') == database.conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+    austin = database.conn.execute("SELECT COUNT(*) FROM customers WHERE city = 'Austin'").fetchone()[0]
+    assert await supabase.count('customers', {"city": "eq.Austin"}) == austin
+
+
+async def test_count_of_a_query_ignores_its_shape(supabase):
+    query = supabase.table('customers').select('id, name').eq('city', 'Austin').order('name').limit(1)
+    assert await supabase.count('customers', query.params) == await supabase.count('customers', {"city": "eq.Austin"})
+
+
+async def test_count_is_one_head_request(supabase, transport):
+    requests = transport.requests
+    await supabase.count('invoices', mode="planned")
+    assert transport.requests == requests + 1
+
+
+async def test_unknown_count_modes_are_rejected(supabase):
+    with pytest.raises(ValueError):
+        await supabase.count('customers', mode="approximate")
@@ -0,0 +1,59 @@
+from app.core.events import publish_changes
+from app.services.summary_cache import summaries_reading
+
+
+def customers_summary(client):
+    response = client.get("/api/v1/dashboard/customers/summary")
+    assert response.status_code == 200
+    return response.json()["result"]
+
+
+def activity(database, customer_id):
+    return database.conn.execute(
+        "SELECT last_activity_at, lifetime_billed, lifetime_paid FROM customer_activity WHERE customer_id = ?", (customer_id,)
+    ).fetchone()
+
+
+def test_invoice_write_refreshes_the_active_customer_count(client, auth_headers, service_client):
+    customer = client.post("/api/v1/customers/", headers=auth_headers, json={"name": "Newly Active"}).json()
+    before = customers_summary(client)
+
+    async def invoice_customer():
+        await service_client.table('invoices').insert({'customer_id': customer['id'], 'total_amount': 10}).execute()
+        publish_changes('invoices')
+    client.portal.call(invoice_customer)
+
+    assert customers_summary(client)["active"] == before["active"] + 1
+
+
+def test_writes_invalidate_every_summary_reading_the_table():
+    assert summaries_reading({"payments"}) == {"customers", "invoices", "payments"}
+    assert summaries_reading({"quotes"}) == {"customers", "quotes"}
+    assert summaries_reading({"customers"}) == {"customers"}
+
+
+
+async def test_activity_follows_invoices_quotes_and_payments(supabase, database):
+    customer = (await supabase.table('customers').insert({'name': 'Activity Test Co'}).execute()).data[0]
+    assert tuple(activity(database, customer['id'])) == (None, 0, 0)
+
+    invoice = (await supabase.table('invoices').insert(
+        {'customer_id': customer['id'], 'total_amount': 300, 'status': 'sent', 'created_at': '2030-01-05T10:00:00'}
+    ).execute()).data[0]
+    await supabase.table('quotes').insert(
+        {'customer_id': customer['id'], 'total_amount': 50, 'created_at': '2030-01-09T10:00:00'}
+    ).execute()
+    await supabase.table('payments').insert({
+        'customer_id': customer['id'], 'invoice_id': invoice['id'], 'amount': 120,
+        'payment_method': 'cash', 'payment_date': '2030-01-07', 'created_at': '2030-01-07T10:00:00'
+    }).execute()
+    assert tuple(activity(database, customer['id'])) == ('2030-01-09T10:00:00', 300, 120)
+
+    await supabase.table('quotes').delete().eq('customer_id', customer['id']).execute()
+    assert activity(database, customer['id'])[0] == '2030-01-07T10:00:00'
+
+
+async def test_rebuild_gives_the_trigger_maintained_rows(supabase, database):
+    maintained = [tuple(row) for row in database.conn.execute("SELECT * FROM customer_activity ORDER BY customer_id")]
+    await supabase.rpc('rebuild_customer_activity', {}).execute()
+    assert [tuple(row) for row in database.conn.execute("SELECT * FROM customer_activity ORDER BY customer_id")] == maintained
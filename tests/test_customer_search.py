@@ -0,0 +1,90 @@
+from app.core.config import settings
+from app.core.events import publish_changes
+from app.services.customer_search import CustomerIndex, query_words, typo_distance
+
+
+async def names(index, supabase, q):
+    return [customer['name'] for customer in await index.search(supabase, q)]
+
+
+async def test_prefix_matches_rank_name_above_city(supabase):
+    await supabase.table('customers').insert([
+        {'name': 'Varnholt Trading', 'city': 'Boston'},
+        {'name': 'Harbour Foods', 'city': 'Varnholtsby'},
+    ]).execute()
+    publish_changes('customers')
+    index = CustomerIndex()
+
+    assert await names(index, supabase, "varn") == ["Varnholt Trading", "Harbour Foods"]
+    assert await names(index, supabase, "varnholt trad") == ["Varnholt Trading"]
+
+
+async def test_misspelled_names_still_match(supabase):
+    await supabase.table('customers').insert({'name': 'Quillfeather Stationery'}).execute()
+    publish_changes('customers')
+
+    assert "Quillfeather Stationery" in await names(CustomerIndex(), supabase, "quilfeather")
+
+
+async def test_typos_in_common_names_still_match(supabase):
+    # Every trigram of "jonh" is common among these, so none of them can be skipped
+    await supabase.table('customers').insert(
+        [{'name': f'John Carter {i}'} for i in range(60)] + [{'name': 'Jonathan Pike'}]
+    ).execute()
+    publish_changes('customers')
+
+    found = await names(CustomerIndex(), supabase, "jonh")
+    assert found and all(name.startswith("John") for name in found)
+
+
+def test_typo_distance_counts_swaps_as_one_edit():
+    assert typo_distance("jonh", "john", 1) == 1
+    assert typo_distance("smiht", "smith", 2) == 1
+    assert typo_distance("abc", "xyz", 1) == 2
+
+
+async def test_searches_are_answered_from_memory(supabase, transport):
+    index = CustomerIndex()
+    await index.search(supabase, "a")
+
+    requests = transport.requests
+    for q in ["a", "bo", "chi", "sea"]:
+        await index.search(supabase, q)
+    assert transport.requests == requests
+
+
+async def test_index_catches_up_with_writes(supabase):
+    index = CustomerIndex()
+    await index.search(supabase, "a")
+
+    created = (await supabase.table('customers').insert({'name': 'Ottoline Graves'}).execute()).data[0]
+    publish_changes('customers')
+    assert await names(index, supabase, "ottoline") == ["Ottoline Graves"]
+
+    await supabase.table('customers').update({'name': 'Marguerite Graves'}).eq('id', created['id']).execute()
+    publish_changes('customers')
+    assert await names(index, supabase, "ottoline") == []
+    assert await names(index, supabase, "marguerite") == ["Marguerite Graves"]
+
+    await supabase.table('customers').delete().eq('id', created['id']).execute()
+    publish_changes('customers')
+    assert await names(index, supabase, "marguerite") == []
+
+
+async def test_full_resync_catches_edits_without_an_updated_at_bump(supabase, database, monkeypatch):
+    index = CustomerIndex()
+    created = (await supabase.table('customers').insert({'name': 'Persephone Vale'}).execute()).data[0]
+    publish_changes('customers')
+    assert await names(index, supabase, "persephone") == ["Persephone Vale"]
+
+    # Written straight to the database by another process: no publish, no updated_at bump
+    database.conn.execute("UPDATE customers SET name = 'Theodora Vale' WHERE id = ?", (created['id'],))
+    assert await names(index, supabase, "persephone") == ["Persephone Vale"]
+
+    monkeypatch.setattr(settings, "CUSTOMER_SEARCH_FULL_SYNC_INTERVAL", 0)
+    assert await names(index, supabase, "persephone") == []
+    assert await names(index, supabase, "theodora") == ["Theodora Vale"]
+
+
+def test_query_words_are_lowercased():
+    assert query_words("  Acme  CORP ") == ["acme", "corp"]
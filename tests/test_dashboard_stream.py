@@ -0,0 +1,56 @@
+import asyncio
+
+from app.core import query_log
+from app.core.config import settings
+from app.services.dashboard_stream import DashboardBroadcaster
+from app.services.summary_cache import SummaryCache, summary_cache
+
+
+async def test_dashboard_stream_sees_changes_the_cache_already_consumed():
+    broadcaster = DashboardBroadcaster()
+    broadcaster._invalidated_elsewhere()
+
+    SummaryCache(summary_cache.directory).invalidate("quotes")
+
+    async def compute():
+        return {}
+    # A dashboard read in this worker notices the change first
+    await summary_cache.get("quotes", "month", compute)
+
+    assert broadcaster._invalidated_elsewhere() == {"customers", "quotes"}
+    assert broadcaster._invalidated_elsewhere() == set()
+
+
+async def test_stream_loop_does_not_inherit_the_request_context(monkeypatch):
+    broadcaster = DashboardBroadcaster()
+    seen = []
+
+    async def run():
+        seen.append(query_log.get_query_log())
+    monkeypatch.setattr(broadcaster, "_run", run)
+
+    query_log._query_log.set(query_log.QueryLog())
+    broadcaster.connect("month", {})
+    await broadcaster._task
+    assert seen == [None]
+
+
+async def test_background_refresh_does_not_inherit_the_request_context(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_CACHE_TTL", 0.01)
+    monkeypatch.setattr(settings, "SUMMARY_CACHE_MAX_STALE", 60)
+    cache = SummaryCache(str(tmp_path))
+    logs = []
+
+    async def compute():
+        logs.append(query_log.get_query_log())
+        return len(logs)
+
+    request_log = query_log.QueryLog()
+    query_log._query_log.set(request_log)
+    await cache.get("payments", "month", compute)
+    await asyncio.sleep(0.02)
+    await cache.get("payments", "month", compute)
+    await asyncio.sleep(0)
+
+    # The miss ran for the caller, the refresh for nobody in particular
+    assert logs == [request_log, None]
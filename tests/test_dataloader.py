@@ -0,0 +1,28 @@
+from app.core.dataloader import DataLoader
+
+
+async def test_loads_in_one_tick_share_one_query(supabase, transport, database):
+    ids = [row[0] for row in database.conn.execute("SELECT id FROM customers ORDER BY id LIMIT 5")]
+    loader = DataLoader(supabase, 'customers', columns='id, name')
+
+    requests = transport.requests
+    customers = await loader.load_many(ids + ids[:2] + [999999])
+    assert transport.requests - requests == 1
+
+    assert [customer['id'] for customer in customers[:5]] == ids
+    assert customers[5:7] == customers[:2]
+    assert customers[7] is None
+
+
+async def test_loaded_rows_are_memoized(supabase, transport, database):
+    customer_id = database.conn.execute("SELECT id FROM customers LIMIT 1").fetchone()[0]
+    loader = DataLoader(supabase, 'customers')
+
+    first = await loader.load(customer_id)
+    requests = transport.requests
+    assert await loader.load(customer_id) is first
+    assert transport.requests == requests
+
+    loader.clear(customer_id)
+    await loader.load(customer_id)
+    assert transport.requests == requests + 1
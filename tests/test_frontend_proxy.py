@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.config import settings
+from frontend.routes import api as proxy
+
+
+@pytest.fixture
+def signed_in(browser, auth_headers):
+    browser.cookies.set("auth_token", auth_headers["Authorization"].split(" ", 1)[1])
+    return browser
+
+
+def test_proxy_needs_the_session_cookie(browser):
+    assert browser.get("/api/customers/").status_code == 401
+
+
+def test_proxied_calls_match_the_api_in_process(signed_in, auth_headers, no_network):
+    proxied = signed_in.get("/api/customers/", params={"limit": 3, "total": "exact"})
+    direct = signed_in.get("/api/v1/customers/", params={"limit": 3, "total": "exact"}, headers=auth_headers)
+
+    assert proxied.status_code == 200
+    assert proxied.json() == direct.json()
+    # Headers such as the page cursor and total come through
+    assert proxied.headers["x-total-count"] == direct.headers["x-total-count"]
+    assert proxied.headers["x-next-cursor"] == direct.headers["x-next-cursor"]
+
+
+def test_bodies_and_errors_pass_through(signed_in, no_network):
+    created = signed_in.post("/api/customers/", json={"name": "Proxy Test Ltd"})
+    assert created.status_code == 200
+    assert created.json()["name"] == "Proxy Test Ltd"
+
+    assert signed_in.get("/api/customers/999999999").status_code in (400, 404)
+
+
+async def test_one_client_is_reused_and_closed(monkeypatch):
+    await proxy.close_client()
+    monkeypatch.setattr(settings, "FRONTEND_BACKEND_URL", "http://erp-backend:8000/api/v1")
+    try:
+        client = proxy.get_client()
+        assert proxy.get_client() is client
+        assert str(client.base_url) == "http://erp-backend:8000/api/v1/"
+    finally:
+        await proxy.close_client()
+    assert proxy._client is None
@@ -0,0 +1,49 @@
+from app.services.invoices import with_balances
+
+
+async def new_invoice(supabase, total, paid=()):
+    invoice = (await supabase.table('invoices').insert(
+        {'customer_id': 1, 'total_amount': total, 'status': 'sent', 'invoice_number': 'INV-BAL'}
+    ).execute()).data[0]
+    for amount in paid:
+        await supabase.table('payments').insert({
+            'customer_id': 1, 'invoice_id': invoice['id'], 'amount': amount,
+            'payment_method': 'cash', 'payment_date': '2026-10-01'
+        }).execute()
+    return invoice
+
+
+async def test_balances_of_a_page_are_one_query(supabase, transport):
+    invoices = [await new_invoice(supabase, 100, [30, 20]), await new_invoice(supabase, 80)]
+
+    requests = transport.requests
+    await with_balances(supabase, invoices)
+    assert transport.requests == requests + 1
+
+    assert (invoices[0]['paid_amount'], invoices[0]['balance_due']) == (50, 50)
+    assert (invoices[1]['paid_amount'], invoices[1]['balance_due']) == (0, 80)
+
+
+async def test_empty_pages_cost_nothing(supabase, transport):
+    requests = transport.requests
+    assert await with_balances(supabase, []) == []
+    assert transport.requests == requests
+
+
+def test_compatibility_lists_are_paged(client, service_client):
+    invoice = client.portal.call(new_invoice, service_client, 250, [100])
+
+    first = client.get("/invoices", params={"limit": 2, "total": "exact"})
+    assert first.status_code == 200
+    assert len(first.json()["result"]) == 2
+    assert int(first.headers["x-total-count"]) > 2
+
+    listed = first.json()["result"][0]
+    assert listed["id"] == invoice["id"]
+    assert (listed["number"], listed["total"], listed["paid_amount"], listed["balance_due"]) == ("INV-BAL", 250, 100, 150)
+
+    second = client.get("/api/v1/invoices-public", params={"limit": 2, "cursor": first.headers["x-next-cursor"]})
+    assert second.status_code == 200
+    assert not {row["id"] for row in second.json()["result"]} & {row["id"] for row in first.json()["result"]}
+
+    assert client.get("/api/v1/invoices-public", params={"cursor": "not-a-cursor"}).status_code == 400
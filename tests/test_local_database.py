@@ -0,0 +1,48 @@
+import pytest
+from postgrest.exceptions import APIError
+
+CITIES = "(city.eq.Austin,city.eq.Denver)"
+
+
+async def customers(supabase, **params) -> list:
+    response = await supabase.postgrest.session.get("/customers", params={"select": "id,city", **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_filters_and_ordering(supabase):
+    rows = (await supabase.table('customers').select('id, city').eq('city', 'Austin').order('id', desc=True).execute()).data
+    assert rows and all(row['city'] == 'Austin' for row in rows)
+    assert [row['id'] for row in rows] == sorted((row['id'] for row in rows), reverse=True)
+
+
+@pytest.mark.parametrize("operator", ["not.or", "not.and"])
+async def test_negated_logical_filters_are_applied(supabase, operator):
+    every = await customers(supabase)
+    either = await customers(supabase, **{"or": CITIES})
+    negated = await customers(supabase, **{operator: CITIES})
+
+    if operator == "not.or":
+        assert {row['id'] for row in negated} == {row['id'] for row in every} - {row['id'] for row in either}
+    else:
+        # No city is both, so nothing is excluded
+        assert len(negated) == len(every)
+
+
+async def test_embedded_resources(supabase):
+    invoice = (await supabase.table('invoices').select('id, customers(name)').limit(1).execute()).data[0]
+    assert set(invoice) == {'id', 'customers'}
+    assert invoice['customers']['name']
+
+
+async def test_unknown_columns_are_postgrest_errors(supabase):
+    with pytest.raises(APIError) as error:
+        await supabase.table('customers').select('id').eq('no_such_column', 1).execute()
+    assert error.value.code == "42703"
+
+
+async def test_each_query_is_one_round_trip(supabase, transport):
+    before = transport.requests
+    await supabase.table('customers').select('id').limit(5).execute()
+    await supabase.rpc('customer_summary', {'since': '2020-01-01T00:00:00'}).execute()
+    assert transport.requests == before + 2
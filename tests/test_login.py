@@ -0,0 +1,30 @@
+from app.core.security import verify_token
+
+
+def test_login_form_sets_the_session_cookie_in_process(browser, no_network):
+    response = browser.post("/login", data={"username": "admin@admin.com", "password": "admin123"}, follow_redirects=False)
+    assert response.status_code == 302 and response.headers["location"] == "/"
+
+    claims = verify_token(browser.cookies["auth_token"])
+    assert claims["email"] == "admin@admin.com"
+    assert browser.get("/api/v1/users/me", headers={"Authorization": f"Bearer {browser.cookies['auth_token']}"}).status_code == 200
+
+
+def test_login_form_and_api_reject_the_same_passwords(browser):
+    form = browser.post("/login", data={"username": "admin@admin.com", "password": "wrong"}, follow_redirects=False)
+    assert form.status_code == 200
+    assert "Invalid username or password" in form.text
+    assert "auth_token" not in browser.cookies
+
+    api = browser.post("/api/v1/auth/login", data={"username": "admin@admin.com", "password": "wrong"})
+    assert api.status_code == 401
+
+
+def test_api_and_form_tokens_carry_the_same_claims(browser):
+    api = browser.post("/api/v1/auth/login", data={"username": "admin@admin.com", "password": "admin123"}).json()
+    browser.post("/login", data={"username": "admin@admin.com", "password": "admin123"}, follow_redirects=False)
+
+    ignored = {"exp"}
+    form_claims = {key: value for key, value in verify_token(browser.cookies["auth_token"]).items() if key not in ignored}
+    api_claims = {key: value for key, value in verify_token(api["access_token"]).items() if key not in ignored}
+    assert form_claims == api_claims
@@ -0,0 +1,46 @@
+import uuid
+
+from app.core.cache import user_cache
+from app.core.config import settings
+
+
+def bearer(headers) -> str:
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+def test_pages_need_a_valid_cookie(browser):
+    assert browser.get("/").status_code == 401
+
+    browser.cookies.set("auth_token", "not-a-token")
+    assert browser.get("/").status_code == 401
+
+
+def test_cached_page_user_costs_no_query(browser, auth_headers):
+    browser.cookies.set("auth_token", bearer(auth_headers))
+    assert browser.get("/").status_code == 200
+
+    response = browser.get("/")
+    assert response.status_code == 200
+    assert 'desc="0 queries"' in response.headers["server-timing"]
+
+
+def test_claims_mode_pages_skip_the_user_lookup(browser, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "claims")
+    user_cache.clear()
+    browser.cookies.set("auth_token", bearer(auth_headers))
+
+    response = browser.get("/")
+    assert response.status_code == 200
+    assert 'desc="0 queries"' in response.headers["server-timing"]
+
+
+def test_deactivated_users_lose_their_pages(client, browser, auth_headers):
+    email = f"page-{uuid.uuid4().hex[:8]}@example.com"
+    user_id = client.post("/api/v1/auth/register", json={"email": email, "full_name": "Page User", "password": "secret123"}).json()["user_id"]
+    token = client.post("/api/v1/auth/login", data={"username": email, "password": "secret123"}).json()["access_token"]
+
+    browser.cookies.set("auth_token", token)
+    assert browser.get("/").status_code == 200
+
+    assert client.put(f"/api/v1/users/{user_id}", headers=auth_headers, json={"is_active": False}).status_code == 200
+    assert browser.get("/").status_code == 401
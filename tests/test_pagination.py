@@ -0,0 +1,84 @@
+import pytest
+from fastapi import Response
+
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, decode_cursor, encode_cursor, execute_paginated
+)
+
+
+def test_cursor_encodes_created_at_and_id():
+    row = {"created_at": "2026-01-02T03:04:05.123456", "id": 42}
+    assert decode_cursor(encode_cursor(row)) == ("2026-01-02T03:04:05.123456", 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor({"created_at": 1, "id": 2})])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+async def walk(supabase, limit):
+    """Every id of the customers table, page by page through X-Next-Cursor"""
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = Response()
+        query = supabase.table('customers').select('id, created_at')
+        result = await execute_paginated(supabase, 'customers', query, response, limit=limit, cursor=cursor)
+        ids += [row['id'] for row in result.data]
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return ids, pages
+
+
+async def test_cursor_pages_cover_every_row_once_newest_first(supabase, database):
+    ids, pages = await walk(supabase, limit=7)
+
+    expected = [row[0] for row in database.conn.execute("SELECT id FROM customers ORDER BY created_at DESC, id DESC")]
+    assert ids == expected
+    assert pages == len(expected) // 7 + 1
+
+
+async def test_rows_inserted_while_paging_do_not_shift_pages(supabase):
+    first = Response()
+    page = await execute_paginated(supabase, 'customers', supabase.table('customers').select('id, created_at'), first, limit=10)
+    seen = [row['id'] for row in page.data]
+
+    # A new customer is the newest row, an offset would now repeat the last row of the first page
+    await supabase.table('customers').insert({'name': 'Inserted Meanwhile'}).execute()
+
+    second = Response()
+    query = supabase.table('customers').select('id, created_at')
+    page = await execute_paginated(supabase, 'customers', query, second, limit=10, cursor=first.headers[NEXT_CURSOR_HEADER])
+    assert not set(seen) & {row['id'] for row in page.data}
+    assert len(page.data) == 10
+
+
+async def test_total_counts_matching_rows_without_reading_them(supabase, database):
+    response = Response()
+    query = supabase.table('customers').select('id, created_at').eq('city', 'Austin')
+    result = await execute_paginated(supabase, 'customers', query, response, limit=2, total='exact')
+
+    expected = database.conn.execute("SELECT COUNT(*) FROM customers WHERE city = 'Austin'").fetchone()[0]
+    assert int(response.headers[TOTAL_COUNT_HEADER]) == expected
+    assert expected > 2 and len(result.data) == 2
+
+
+def test_list_endpoint_round_trip(client, auth_headers):
+    everything = client.get("/api/v1/customers/", headers=auth_headers, params={"limit": 1000}).json()
+
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 9, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/customers/", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        ids += [customer['id'] for customer in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert ids == [customer['id'] for customer in everything]
+
+
+def test_list_endpoint_rejects_a_bad_cursor(client, auth_headers):
+    response = client.get("/api/v1/customers/", headers=auth_headers, params={"cursor": "garbage"})
+    assert response.status_code == 400
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.passwords import PasswordPool, PasswordPoolBusy
+
+
+async def test_pool_rejects_work_beyond_its_queue():
+    pool = PasswordPool(workers=1, queue=1)
+    release = threading.Event()
+    try:
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(PasswordPoolBusy):
+            await pool.run(release.wait)
+        assert pool.stats()["rejected"] == 1
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert pool.stats()["in_flight"] == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+async def test_saturated_pool_is_a_503_with_retry_after(monkeypatch):
+    pool = PasswordPool(workers=1, queue=0)
+    monkeypatch.setattr(security, "password_pool", pool)
+    monkeypatch.setattr(pool, "in_flight", 1)
+
+    with pytest.raises(HTTPException) as error:
+        await security.verify_password_async("secret", security.get_password_hash("secret"))
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "1"
+
+
+def test_login_during_a_burst_gets_503_not_a_wait(client, monkeypatch):
+    pool = PasswordPool(workers=1, queue=0)
+    monkeypatch.setattr(security, "password_pool", pool)
+    monkeypatch.setattr(pool, "in_flight", 1)
+
+    response = client.post("/api/v1/auth/login", data={"username": "admin@admin.com", "password": "admin123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+async def test_hash_and_verify_off_the_event_loop():
+    hashed = await security.get_password_hash_async("correct horse")
+    assert await security.verify_password_async("correct horse", hashed)
+    assert not await security.verify_password_async("wrong horse", hashed)
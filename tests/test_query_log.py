@@ -0,0 +1,39 @@
+from app.core.query_log import UNMATCHED_ENDPOINT, query_stats
+
+
+def endpoint_stats(client, auth_headers, name):
+    stats = {row["endpoint"]: row for row in client.get("/health/db-queries", headers=auth_headers).json()}
+    return stats.get(name)
+
+
+def test_count_queries_record_no_rows(client, auth_headers):
+    query_stats.reset()
+    response = client.get("/api/v1/customers/", headers=auth_headers, params={"limit": 3, "total": "exact"})
+    assert int(response.headers["x-total-count"]) > 3
+
+    stats = endpoint_stats(client, auth_headers, "GET get_customers")
+    # The page's 3 rows, plus the user lookup when the user cache is cold
+    assert stats["rows"] <= 4
+
+
+def test_unmatched_paths_share_one_entry(client, auth_headers):
+    query_stats.reset()
+    for n in range(5):
+        assert client.get(f"/no-such-page-{n}").status_code == 404
+
+    assert endpoint_stats(client, auth_headers, f"GET {UNMATCHED_ENDPOINT}")["requests"] == 5
+    assert not any("no-such-page" in name for name in query_stats.endpoints)
+
+
+def test_stats_endpoints_need_an_admin(client):
+    for path in ["db-pool", "db-queries", "summary-cache", "user-cache", "customer-search", "password-pool"]:
+        assert client.get(f"/health/{path}").status_code == 403
+    assert client.get("/health").status_code == 200
+
+
+def test_round_trips_are_reported_in_server_timing(client):
+    response = client.get("/api/v1/dashboard/invoices", params={"limit": 5})
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    # One page of invoices, then their customers and balances, not one query per row
+    assert 'desc="3 queries"' in timing
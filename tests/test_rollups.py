@@ -0,0 +1,81 @@
+import pytest
+
+from app.core.local_database import STATUS_ROLLUPS
+
+# After every seeded row, so the window holds only what a test inserts
+SINCE = "2030-03-10T12:00:00"
+
+
+def rollup_rows(database, rollup):
+    return sorted(
+        (row[0], row[1], row[2], round(row[3], 2))
+        for row in database.conn.execute(f"SELECT day, status, count, total FROM {rollup}")
+    )
+
+
+def base_rows(database, rollup):
+    table, amount = STATUS_ROLLUPS[rollup]
+    return sorted(
+        (row[0], row[1], row[2], round(row[3], 2))
+        for row in database.conn.execute(
+            f"SELECT substr(created_at, 1, 10), COALESCE(status, 'draft'), COUNT(*), COALESCE(SUM({amount}), 0)"
+            f" FROM {table} GROUP BY 1, 2"
+        )
+    )
+
+
+def invoice(created_at, total, status="sent"):
+    return {"customer_id": 1, "total_amount": total, "status": status, "created_at": created_at}
+
+
+@pytest.mark.parametrize("rollup", list(STATUS_ROLLUPS))
+def test_rollups_match_the_seeded_tables(database, rollup):
+    assert rollup_rows(database, rollup) == base_rows(database, rollup)
+
+
+async def test_triggers_follow_inserts_updates_and_deletes(supabase, database):
+    created = (await supabase.table('invoices').insert(invoice("2030-03-01T09:00:00", 100)).execute()).data[0]
+    await supabase.table('invoices').update({'status': 'paid', 'total_amount': 120}).eq('id', created['id']).execute()
+    await supabase.table('invoices').update({'created_at': "2030-03-02T09:00:00"}).eq('id', created['id']).execute()
+    assert rollup_rows(database, "invoice_daily") == base_rows(database, "invoice_daily")
+
+    await supabase.table('invoices').delete().eq('id', created['id']).execute()
+    assert rollup_rows(database, "invoice_daily") == base_rows(database, "invoice_daily")
+    assert not database.conn.execute("SELECT 1 FROM invoice_daily WHERE day = '2030-03-02'").fetchall()
+
+
+async def test_rebuild_gives_the_trigger_maintained_rows(supabase, database):
+    maintained = rollup_rows(database, "payment_daily")
+    await supabase.rpc('rebuild_daily_rollups', {}).execute()
+    assert rollup_rows(database, "payment_daily") == maintained
+
+
+async def test_only_the_part_of_the_first_day_inside_the_window_counts(supabase, database):
+    await supabase.table('invoices').insert([
+        invoice("2030-03-09T23:00:00", 1),    # the day before
+        invoice("2030-03-10T08:00:00", 10),   # first day, before since
+        invoice("2030-03-10T15:00:00", 100),  # first day, after since
+        invoice("2030-03-11T08:00:00", 1000, status="paid"),
+    ]).execute()
+
+    rows = (await supabase.rpc('invoice_status_summary', {'since': SINCE}).execute()).data
+    by_status = {row['status']: row for row in rows}
+    assert by_status['sent']['count'] == 1 and by_status['sent']['total'] == 100
+    assert by_status['paid']['count'] == 1 and by_status['paid']['total'] == 1000
+
+
+async def test_first_day_window_for_payments_and_customers(supabase, database):
+    payment = {"customer_id": 1, "payment_method": "cash", "payment_date": "2030-03-10"}
+    await supabase.table('payments').insert([
+        {**payment, "amount": 5, "created_at": "2030-03-10T08:00:00"},
+        {**payment, "amount": 50, "created_at": "2030-03-10T13:00:00"},
+    ]).execute()
+    await supabase.table('customers').insert([
+        {"name": "Early Bird", "created_at": "2030-03-10T08:00:00"},
+        {"name": "Late Riser", "created_at": "2030-03-10T13:00:00"},
+    ]).execute()
+
+    payments = (await supabase.rpc('payment_summary', {'since': SINCE}).execute()).data[0]
+    customers = (await supabase.rpc('customer_summary', {'since': SINCE}).execute()).data[0]
+    assert (payments['count'], payments['total']) == (1, 50)
+    assert customers['new'] == 1
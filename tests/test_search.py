@@ -0,0 +1,84 @@
+import pytest
+
+from app.services.search import global_search, prefix_query
+
+
+def test_search_text_becomes_prefix_terms():
+    assert prefix_query("INV-20") == "inv:* & 20:*"
+    assert prefix_query("  Acme_Corp ") == "acme:* & corp:*"
+    assert prefix_query("!!") is None
+
+
+async def test_name_matches_rank_above_notes_matches(supabase):
+    await supabase.table('customers').insert([
+        {'name': 'Quarrytown Supplies', 'notes': 'Wholesale'},
+        {'name': 'Other Supplies', 'notes': 'Referred by Quarrytown'},
+        {'name': 'Unrelated Ltd'},
+    ]).execute()
+
+    result = await global_search(supabase, "quarry", ["customers"])
+
+    group = result["groups"]["customers"]
+    assert group["total"] == 2
+    assert [hit["title"] for hit in group["hits"]] == ["Quarrytown Supplies", "Other Supplies"]
+    assert group["hits"][0]["rank"] > group["hits"][1]["rank"]
+
+
+async def test_hits_are_grouped_by_type_with_one_query_each(supabase, transport):
+    customer = (await supabase.table('customers').insert({'name': 'Zephyrine Ltd'}).execute()).data[0]
+    await supabase.table('invoices').insert(
+        {'customer_id': customer['id'], 'invoice_number': 'INV-7731-ZX', 'total_amount': 50}
+    ).execute()
+    await supabase.table('payments').insert({
+        'customer_id': customer['id'], 'amount': 50, 'payment_method': 'bank',
+        'reference_number': 'ZX-7731', 'notes': 'Zephyrine settlement'
+    }).execute()
+
+    requests = transport.requests
+    result = await global_search(supabase, "7731")
+    assert transport.requests - requests == 4
+
+    groups = result["groups"]
+    assert list(groups) == ["customers", "invoices", "quotes", "payments"]
+    assert [hit["title"] for hit in groups["invoices"]["hits"]] == ["INV-7731-ZX"]
+    assert groups["invoices"]["hits"][0]["customer_name"] == "Zephyrine Ltd"
+    assert [hit["title"] for hit in groups["payments"]["hits"]] == ["ZX-7731"]
+    assert groups["customers"]["total"] == 0
+
+
+async def test_pages_share_one_total(supabase):
+    await supabase.table('customers').insert([{'name': f'Paginata {n}'} for n in range(5)]).execute()
+
+    first = (await global_search(supabase, "paginata", ["customers"], limit=2))["groups"]["customers"]
+    third = (await global_search(supabase, "paginata", ["customers"], limit=2, skip=4))["groups"]["customers"]
+
+    assert first["total"] == third["total"] == 5
+    assert len(first["hits"]) == 2 and len(third["hits"]) == 1
+    assert not {hit["id"] for hit in first["hits"]} & {hit["id"] for hit in third["hits"]}
+
+
+async def test_index_follows_updates_and_deletes(supabase):
+    customer = (await supabase.table('customers').insert({'name': 'Before Rename'}).execute()).data[0]
+    await supabase.table('customers').update({'name': 'Afterwards Inc'}).eq('id', customer['id']).execute()
+
+    assert (await global_search(supabase, "before", ["customers"]))["groups"]["customers"]["total"] == 0
+    assert (await global_search(supabase, "afterwards", ["customers"]))["groups"]["customers"]["total"] == 1
+
+    await supabase.table('customers').delete().eq('id', customer['id']).execute()
+    assert (await global_search(supabase, "afterwards", ["customers"]))["groups"]["customers"]["total"] == 0
+
+
+@pytest.mark.parametrize("types, message", [(["orders"], "Unknown search types"), (None, "at least one letter")])
+async def test_bad_requests_raise(supabase, types, message):
+    with pytest.raises(ValueError, match=message):
+        await global_search(supabase, "orders" if types else "--", types)
+
+
+def test_search_endpoint(client, auth_headers):
+    response = client.get("/api/v1/search/", headers=auth_headers, params={"q": "inv", "types": "invoices", "limit": 3})
+    assert response.status_code == 200
+    group = response.json()["result"]["groups"]["invoices"]
+    assert group["total"] > 3 and len(group["hits"]) == 3
+
+    assert client.get("/api/v1/search/", headers=auth_headers, params={"q": "inv", "types": "orders"}).status_code == 400
+    assert client.get("/api/v1/search/", params={"q": "inv"}).status_code == 403
@@ -0,0 +1,54 @@
+import pytest
+
+from app.services.dashboard import (
+    customers_summary, invoices_summary, payments_summary, period_start, quotes_summary
+)
+
+
+def scalar(database, sql, *args):
+    return database.conn.execute(sql, args).fetchone()[0]
+
+
+@pytest.mark.parametrize("type", ["week", "month", "year"])
+async def test_invoice_summary_matches_the_invoices(supabase, database, type):
+    since = period_start(type).isoformat()
+    summary = await invoices_summary(supabase, type)
+
+    assert summary["total"] == pytest.approx(
+        scalar(database, "SELECT COALESCE(SUM(total_amount), 0) FROM invoices WHERE created_at >= ?", since)
+    )
+    counts = dict(database.conn.execute(
+        "SELECT status, COUNT(*) FROM invoices WHERE created_at >= ? GROUP BY status", (since,)
+    ).fetchall())
+    total = sum(counts.values()) or 1
+    for row in summary["performance"]:
+        assert row["percentage"] == round(counts.get(row["status"], 0) / total * 100)
+
+
+async def test_quote_and_payment_summaries_match_their_tables(supabase, database):
+    since = period_start("year").isoformat()
+    quotes = await quotes_summary(supabase, "year")
+    payments = await payments_summary(supabase, "year")
+
+    assert quotes["total"] == pytest.approx(
+        scalar(database, "SELECT COALESCE(SUM(total_amount), 0) FROM quotes WHERE created_at >= ?", since)
+    )
+    assert payments["count"] == scalar(database, "SELECT COUNT(*) FROM payments WHERE created_at >= ?", since)
+    assert payments["total"] == pytest.approx(
+        scalar(database, "SELECT COALESCE(SUM(amount), 0) FROM payments WHERE created_at >= ?", since)
+    )
+
+
+async def test_customer_summary_counts(supabase, database):
+    since = period_start("month").isoformat()
+    summary = await customers_summary(supabase, "month")
+
+    assert summary["total"] == scalar(database, "SELECT COUNT(*) FROM customers")
+    assert summary["new"] == scalar(database, "SELECT COUNT(*) FROM customers WHERE created_at >= ?", since)
+
+
+async def test_each_summary_is_one_round_trip(supabase, transport):
+    for summary, round_trips in [(customers_summary, 1), (quotes_summary, 1), (payments_summary, 1), (invoices_summary, 2)]:
+        requests = transport.requests
+        await summary(supabase, "year")
+        assert transport.requests - requests == round_trips
@@ -0,0 +1,93 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.summary_cache import SummaryCache, summary_cache
+
+
+def customers_summary(client):
+    response = client.get("/api/v1/dashboard/customers/summary")
+    assert response.status_code == 200
+    return response.json()["result"]
+
+
+def test_summary_is_recomputed_after_a_write(client, auth_headers):
+    before = customers_summary(client)
+    assert customers_summary(client) == before
+
+    response = client.post("/api/v1/customers/", headers=auth_headers, json={"name": "Summary Test Ltd"})
+    assert response.status_code == 200
+
+    after = customers_summary(client)
+    assert after["total"] == before["total"] + 1
+    assert after["new"] == before["new"] + 1
+
+
+def test_unknown_summary_window_falls_back_to_a_month(client):
+    month = client.get("/api/v1/dashboard/summary", params={"type": "month"})
+    entries = summary_cache.stats()["entries"]
+
+    fortnight = client.get("/api/v1/dashboard/summary", params={"type": "fortnight"})
+    assert fortnight.status_code == 200
+    assert fortnight.json()["result"] == month.json()["result"]
+    # Served from the month entries instead of caching a window of its own
+    assert summary_cache.stats()["entries"] == entries
+
+
+def test_cache_directory_is_created_on_first_invalidation(tmp_path):
+    cache = SummaryCache(str(tmp_path / "summaries"))
+    assert not (tmp_path / "summaries").exists()
+
+    cache.invalidate("quotes")
+    assert (tmp_path / "summaries" / "quotes.generation").exists()
+
+
+async def test_invalidation_by_another_worker_reaches_this_one(tmp_path):
+    ours, theirs = SummaryCache(str(tmp_path)), SummaryCache(str(tmp_path))
+    computed = []
+
+    async def compute():
+        computed.append(1)
+        return len(computed)
+
+    assert await ours.get("quotes", "month", compute) == 1
+    assert await ours.get("quotes", "month", compute) == 1
+
+    theirs.invalidate("quotes")
+    assert await ours.get("quotes", "month", compute) == 2
+    assert ours.stats()["misses"] == 2
+
+
+async def test_concurrent_misses_compute_once(tmp_path):
+    cache = SummaryCache(str(tmp_path))
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*[cache.get("payments", "week", compute) for _ in range(5)])
+    assert results == [1] * 5
+    assert calls == 1
+
+
+async def test_stale_entries_are_served_while_one_refresh_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_CACHE_TTL", 0.01)
+    monkeypatch.setattr(settings, "SUMMARY_CACHE_MAX_STALE", 60)
+    cache = SummaryCache(str(tmp_path))
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await cache.get("quotes", "month", compute) == 1
+    await asyncio.sleep(0.02)
+    # Stale: the old value now, the refreshed one once the background task ran
+    assert await cache.get("quotes", "month", compute) == 1
+    assert await cache.get("quotes", "month", compute) == 1
+    await asyncio.sleep(0)
+    assert await cache.get("quotes", "month", compute) == 2
+    assert calls == 2 and cache.stats()["stale_hits"] >= 2
@@ -0,0 +1,63 @@
+import uuid
+
+from app.core.cache import user_cache
+
+
+def queries(response) -> str:
+    return response.headers["server-timing"].split('desc="')[1].split('"')[0]
+
+
+def sign_up(client) -> tuple:
+    """A new user's id and bearer headers"""
+    email = f"user-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post("/api/v1/auth/register", json={"email": email, "full_name": "Cached User", "password": "secret123"})
+    assert response.status_code == 200, response.text
+    token = client.post("/api/v1/auth/login", data={"username": email, "password": "secret123"}).json()["access_token"]
+    return response.json()["user_id"], {"Authorization": f"Bearer {token}"}
+
+
+def test_cached_user_costs_no_query(client, auth_headers):
+    client.get("/api/v1/users/me", headers=auth_headers)
+
+    response = client.get("/api/v1/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "admin@admin.com"
+    assert queries(response) == "0 queries"
+
+
+def test_deactivating_a_user_ends_their_cached_session(client, auth_headers):
+    user_id, headers = sign_up(client)
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    assert user_cache.get(user_id) is not None
+
+    response = client.put(f"/api/v1/users/{user_id}", headers=auth_headers, json={"is_active": False})
+    assert response.status_code == 200
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+def test_demoting_a_user_is_seen_on_the_next_request(client, auth_headers):
+    user_id, headers = sign_up(client)
+    client.put(f"/api/v1/users/{user_id}", headers=auth_headers, json={"role": "admin"})
+    assert client.get("/api/v1/users/", headers=headers).status_code == 200
+
+    client.put(f"/api/v1/users/{user_id}", headers=auth_headers, json={"role": "user"})
+    assert client.get("/api/v1/users/", headers=headers).status_code == 403
+
+
+def test_inactive_cached_rows_are_rejected(client):
+    user_id, headers = sign_up(client)
+    client.get("/api/v1/users/me", headers=headers)
+
+    # A row cached before a deactivation this worker didn't see
+    user_cache.set(user_id, {**user_cache.get(user_id), "is_active": False})
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+def test_only_admins_manage_other_users(client, auth_headers):
+    user_id, headers = sign_up(client)
+    other_id, _ = sign_up(client)
+    assert client.put(f"/api/v1/users/{other_id}", headers=headers, json={"is_active": False}).status_code == 403
+    assert client.delete(f"/api/v1/users/{other_id}", headers=headers).status_code == 403
+
+    assert client.delete(f"/api/v1/users/{other_id}", headers=auth_headers).status_code == 200
+    assert client.delete(f"/api/v1/users/{other_id}", headers=auth_headers).status_code == 404